@@ -0,0 +1,238 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+
+# Clave de la versión global del contenido publicado
+CONTENT_VERSION_KEY = "article:content:version"
+
+DEFAULT_PAGE_CACHE_TIMEOUT = 60 * 5
+
+
+def get_page_cache():
+    """
+    Obtiene el backend de caché configurado para las páginas.
+
+    El alias se define con `PAGE_CACHE_ALIAS` y su backend en `CACHES`, por lo
+    que puede ser memoria local, archivos o un servidor compatible con Redis.
+
+    Returns:
+        BaseCache: El backend de caché.
+    """
+
+    return caches[getattr(settings, "PAGE_CACHE_ALIAS", "default")]
+
+
+def get_shared_cache():
+    """
+    Obtiene el backend de caché compartido por todos los procesos.
+
+    Las versiones que invalidan las cachés locales de cada proceso se guardan
+    aquí, para que un cambio hecho por un worker o por `run_scheduler` llegue
+    a todos los demás.
+
+    Returns:
+        BaseCache: El backend de caché.
+    """
+
+    return caches[getattr(settings, "SHARED_CACHE_ALIAS", "default")]
+
+
+def new_version():
+    """
+    Genera un valor de versión nuevo.
+
+    Returns:
+        str: La versión.
+    """
+
+    return uuid.uuid4().hex
+
+
+def get_version(cache, key):
+    """
+    Obtiene la versión guardada en una clave de caché, inicializándola si no existe.
+
+    Args:
+        cache (BaseCache): El backend de caché.
+        key (str): La clave de la versión.
+
+    Returns:
+        str: La versión actual.
+    """
+
+    return cache.get_or_set(key, new_version, timeout=None)
+
+
+def bump_version(cache, key):
+    """
+    Reemplaza la versión guardada en una clave de caché, invalidando todas las
+    entradas que la incluyen en su clave.
+
+    Se guarda un valor nuevo en lugar de incrementar el anterior porque no
+    todos los backends incrementan de forma atómica; dos cambios simultáneos
+    pueden dejar cualquiera de los dos valores, pero nunca el anterior.
+
+    Args:
+        cache (BaseCache): El backend de caché.
+        key (str): La clave de la versión.
+    """
+
+    cache.set(key, new_version(), timeout=None)
+
+
+def get_content_version():
+    """
+    Obtiene la versión global del contenido publicado.
+
+    Returns:
+        str: La versión actual.
+    """
+
+    return get_version(get_shared_cache(), CONTENT_VERSION_KEY)
+
+
+def bump_content_version():
+    """
+    Invalida las páginas en caché de todos los procesos al cambiar el
+    contenido publicado.
+
+    La versión se reemplaza de inmediato y otra vez al confirmar la
+    transacción, para que no quede en caché una página generada con datos
+    anteriores a la confirmación.
+    """
+
+    bump_version(get_shared_cache(), CONTENT_VERSION_KEY)
+    transaction.on_commit(
+        lambda: bump_version(get_shared_cache(), CONTENT_VERSION_KEY)
+    )
+
+
+def skip_page_cache(response):
+    """
+    Marca una respuesta para que `cache_anonymous_page` no la guarde, por
+    ejemplo la de un artículo que no está publicado.
+
+    Args:
+        response (HttpResponse): La respuesta.
+
+    Returns:
+        HttpResponse: La misma respuesta.
+    """
+
+    response.skip_page_cache = True
+    return response
+
+
+def is_page_cacheable(request, response):
+    """
+    Indica si una respuesta para un usuario anónimo se puede guardar en caché.
+
+    No se guardan las respuestas marcadas con `skip_page_cache` ni las que
+    usaron el token CSRF: el token quedaría compartido entre todos los
+    visitantes y la cookie que lo acompaña no se envía desde la caché.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        response (HttpResponse): La respuesta de la vista.
+
+    Returns:
+        bool: Si se puede guardar.
+    """
+
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not getattr(response, "skip_page_cache", False)
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    )
+
+
+def page_cache_key(request, view_name, kwargs):
+    """
+    Construye la clave de caché de una página.
+
+    Los parámetros de la query string se normalizan (orden y valores vacíos)
+    para que variantes equivalentes de la misma URL compartan la entrada.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        view_name (str): Nombre de la vista.
+        kwargs (dict): Argumentos de la URL.
+
+    Returns:
+        str: La clave de caché.
+    """
+
+    params = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if value != ""
+    )
+    raw = repr((sorted(kwargs.items()), params))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+
+    return f"article:page:{view_name}:{get_content_version()}:{digest}"
+
+
+def cache_anonymous_page(on_hit=None):
+    """
+    Decorador que guarda en caché la respuesta de una vista para usuarios anónimos.
+
+    Solo se guardan las respuestas 200 de solicitudes GET que cumplen
+    `is_page_cacheable`. Las entradas se invalidan al reemplazar la versión
+    global del contenido.
+
+    Args:
+        on_hit (callable, optional): Función llamada con los mismos argumentos
+            de la vista cuando la respuesta sale de la caché, por ejemplo para
+            contar visualizaciones.
+
+    Returns:
+        callable: El decorador.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            cache = get_page_cache()
+            key = page_cache_key(request, view.__name__, kwargs)
+
+            cached = cache.get(key)
+            if cached is not None:
+                if on_hit is not None:
+                    on_hit(request, *args, **kwargs)
+
+                response = HttpResponse(
+                    cached["content"], content_type=cached["content_type"]
+                )
+                response["X-Page-Cache"] = "hit"
+                return response
+
+            response = view(request, *args, **kwargs)
+
+            if is_page_cacheable(request, response):
+                cache.set(
+                    key,
+                    {
+                        "content": response.content,
+                        "content_type": response["Content-Type"],
+                    },
+                    getattr(settings, "PAGE_CACHE_TIMEOUT", DEFAULT_PAGE_CACHE_TIMEOUT),
+                )
+                response["X-Page-Cache"] = "miss"
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,283 @@
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from article.models import Article, ArticleStates
+
+
+logger = logging.getLogger(__name__)
+
+# Contadores del artículo que se acumulan en memoria antes de guardarse
+COUNTER_FIELDS = ("views_number", "shares_number")
+
+DEFAULT_COUNTER_SETTINGS = {
+    # Segundos entre escrituras a la base de datos
+    "FLUSH_INTERVAL": 5,
+    # Incrementos pendientes que fuerzan una escritura; es también la cantidad
+    # máxima de incrementos que se pierden si el proceso termina abruptamente
+    "MAX_PENDING": 500,
+    # Escribe los incrementos pendientes al terminar el proceso
+    "DRAIN_ON_SHUTDOWN": True,
+}
+
+
+def get_counter_settings():
+    """
+    Obtiene la configuración de los contadores, combinando `ARTICLE_COUNTERS`
+    con los valores por defecto.
+
+    Returns:
+        dict: La configuración.
+    """
+
+    return {**DEFAULT_COUNTER_SETTINGS, **getattr(settings, "ARTICLE_COUNTERS", {})}
+
+
+class CounterBuffer:
+    """
+    Acumula en memoria los incrementos de visualizaciones y compartidos y los
+    escribe en lote.
+
+    Cada escritura es una única consulta
+    `UPDATE ... SET views_number = views_number + CASE id WHEN ... END`, por lo
+    que no se pierden incrementos concurrentes ni se reescribe la fila entera.
+    La escritura ocurre en el mismo hilo que registra un incremento, cuando
+    pasó el intervalo configurado o se alcanzó el máximo de pendientes, y en
+    el hilo iniciado por `start_flusher`, para que los incrementos no queden
+    pendientes cuando el proceso deja de recibir solicitudes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {field: defaultdict(int) for field in COUNTER_FIELDS}
+        self._pending_total = 0
+        self._last_flush = 0.0
+        self._shutdown_registered = False
+        self._flusher = None
+        self._stop_flusher = threading.Event()
+
+    def increment(self, article_id, field, amount=1, published_only=False):
+        """
+        Registra un incremento de un contador.
+
+        Args:
+            article_id (int): ID del artículo.
+            field (str): Nombre del contador, uno de `COUNTER_FIELDS`.
+            amount (int, optional): Cantidad a sumar.
+            published_only (bool, optional): Si el incremento solo se aplica
+                cuando el artículo está publicado al momento de escribirlo.
+        """
+
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Contador desconocido: {field}")
+
+        config = get_counter_settings()
+        self._register_shutdown(config)
+
+        with self._lock:
+            self._pending[field][article_id, published_only] += amount
+            self._pending_total += amount
+            should_flush = (
+                self._pending_total >= config["MAX_PENDING"]
+                or time.monotonic() - self._last_flush >= config["FLUSH_INTERVAL"]
+            )
+
+        if should_flush:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("No se pudieron guardar los contadores")
+
+    def pending(self, article_id, field):
+        """
+        Obtiene los incrementos de un contador que todavía no se escribieron.
+
+        Args:
+            article_id (int): ID del artículo.
+            field (str): Nombre del contador.
+
+        Returns:
+            int: Cantidad pendiente.
+        """
+
+        with self._lock:
+            return sum(
+                self._pending[field].get((article_id, published_only), 0)
+                for published_only in (False, True)
+            )
+
+    def flush(self):
+        """
+        Escribe los incrementos pendientes en la base de datos.
+
+        Returns:
+            int: Cantidad de artículos actualizados.
+        """
+
+        with self._lock:
+            pending = self._pending
+            self._pending = {field: defaultdict(int) for field in COUNTER_FIELDS}
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+
+        article_ids = set()
+        updates = {}
+
+        for field, amounts in pending.items():
+            if not amounts:
+                continue
+
+            totals = defaultdict(lambda: [0, 0])
+            for (pk, published_only), amount in amounts.items():
+                totals[pk][published_only] += amount
+
+            # Para cada artículo, la primera condición que se cumple suma
+            # también los incrementos que exigen que esté publicado
+            whens = []
+            for pk, (always, published) in totals.items():
+                if published:
+                    whens.append(
+                        When(
+                            pk=pk,
+                            state=ArticleStates.PUBLISHED.value,
+                            then=Value(always + published),
+                        )
+                    )
+                if always:
+                    whens.append(When(pk=pk, then=Value(always)))
+
+            article_ids.update(totals)
+            updates[field] = F(field) + Case(
+                *whens, default=Value(0), output_field=IntegerField()
+            )
+
+        if not updates:
+            return 0
+
+        try:
+            return Article.objects.filter(pk__in=article_ids).update(**updates)
+        except Exception:
+            # Devuelve los incrementos al buffer para reintentarlos luego
+            with self._lock:
+                for field, amounts in pending.items():
+                    for key, amount in amounts.items():
+                        self._pending[field][key] += amount
+                        self._pending_total += amount
+            raise
+
+    def start_flusher(self):
+        """
+        Inicia un hilo que escribe los incrementos pendientes cada
+        `FLUSH_INTERVAL` segundos. Llamadas posteriores no hacen nada.
+        """
+
+        with self._lock:
+            if self._flusher is not None:
+                return
+
+            flusher = self._flusher = threading.Thread(
+                target=self._run_flusher, name="article-counters", daemon=True
+            )
+
+        flusher.start()
+
+    def stop_flusher(self):
+        """
+        Detiene el hilo iniciado por `start_flusher` y espera a que termine.
+        """
+
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+
+        if flusher is None:
+            return
+
+        self._stop_flusher.set()
+        flusher.join()
+        self._stop_flusher.clear()
+
+    def _run_flusher(self):
+        while not self._stop_flusher.wait(get_counter_settings()["FLUSH_INTERVAL"]):
+            with self._lock:
+                has_pending = self._pending_total > 0
+
+            if not has_pending:
+                continue
+
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("No se pudieron guardar los contadores")
+
+    def drain(self):
+        """
+        Escribe los incrementos pendientes al terminar el proceso.
+        """
+
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudieron guardar los contadores pendientes")
+
+    def _register_shutdown(self, config):
+        if self._shutdown_registered or not config["DRAIN_ON_SHUTDOWN"]:
+            return
+
+        self._shutdown_registered = True
+        atexit.register(self.drain)
+
+
+counter_buffer = CounterBuffer()
+
+
+def increment_views(article_id, published_only=False):
+    """
+    Suma una visualización al artículo.
+
+    Args:
+        article_id (int): ID del artículo.
+        published_only (bool, optional): Si la visualización solo se cuenta
+            cuando el artículo está publicado.
+    """
+
+    counter_buffer.increment(article_id, "views_number", published_only=published_only)
+
+
+def increment_shares(article_id):
+    """
+    Suma un compartido al artículo.
+
+    Args:
+        article_id (int): ID del artículo.
+    """
+
+    counter_buffer.increment(article_id, "shares_number")
+
+
+def flush_counters():
+    """
+    Escribe de inmediato los incrementos pendientes.
+
+    Returns:
+        int: Cantidad de artículos actualizados.
+    """
+
+    return counter_buffer.flush()
+
+
+def start_counter_flusher():
+    """
+    Inicia la escritura periódica de los contadores del proceso.
+
+    La llaman los puntos de entrada WSGI y ASGI, de modo que cada worker
+    escribe sus incrementos aunque deje de recibir solicitudes.
+    """
+
+    counter_buffer.start_flusher()
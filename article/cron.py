@@ -1,25 +1,115 @@
-from article.models import ArticlesToPublish, ArticleStates
+import logging
+
+from django.db import transaction
+from django.db.models import Min
 from django.utils import timezone
 
+from article.cache import bump_content_version
+from article.events import article_event, publish_article_events
+from article.models import Article, ArticlesToPublish, ArticleStates
+from article.search import bump_autocomplete_version
+from notification.utils import send_emails
+
+
+logger = logging.getLogger(__name__)
+
+PUBLISH_BATCH_SIZE = 100
 
-def publish_schedule_articles():
+
+def publish_due_articles(now=None, batch_size=PUBLISH_BATCH_SIZE):
     """
-    Publica los articulos que estan en estado de programados.
+    Publica un lote de artículos cuya fecha de publicación programada ya pasó.
+
+    Las programaciones se bloquean con `SELECT ... FOR UPDATE SKIP LOCKED`,
+    por lo que dos ejecuciones simultáneas no publican el mismo artículo. Los
+    artículos se publican con una única actualización y los avisos a los
+    autores se encolan en la bandeja de salida dentro de la misma transacción.
+
+    Args:
+        now (datetime, optional): Fecha de referencia.
+        batch_size (int, optional): Cantidad máxima de artículos a publicar.
+
+    Returns:
+        int: Cantidad de artículos publicados.
     """
-    print("Iniciando publicación de articulos programados")
 
-    articles_to_publish = ArticlesToPublish.objects.filter(
-        to_publish_at__lte=timezone.now(), published=False
-    )
+    now = now or timezone.now()
 
-    for article_to_publish in articles_to_publish:
-        print(f"Publicando articulo {article_to_publish.article.title}")
-        print(
-            f"Fecha de publicación: {article_to_publish.to_publish_at}, Fecha actual: {timezone.now()}"
+    with transaction.atomic():
+        schedules = list(
+            ArticlesToPublish.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("article__autor", "article__category")
+            .filter(published=False, to_publish_at__lte=now)
+            .order_by("to_publish_at")[:batch_size]
         )
-        article_to_publish.article.change_state(ArticleStates.PUBLISHED.value)
-        article_to_publish.published = True
-        article_to_publish.save()
-        print(f"Articulo {article_to_publish.article.title} publicado")
 
-    print("Finalizando publicación de articulos programados")
+        if not schedules:
+            return 0
+
+        articles = {schedule.article_id: schedule.article for schedule in schedules}
+
+        send_emails(
+            article.state_change_email(ArticleStates.PUBLISHED.value)
+            for article in articles.values()
+        )
+        Article.objects.filter(pk__in=articles).update(
+            state=ArticleStates.PUBLISHED.value, published_at=now
+        )
+        ArticlesToPublish.objects.filter(
+            pk__in=[schedule.pk for schedule in schedules]
+        ).update(published=True)
+
+        events = []
+        for article in articles.values():
+            previous_state = article.state
+            article.state = ArticleStates.PUBLISHED.value
+            article.published_at = now
+            events.append(
+                article_event(article, "updated", previous_state=previous_state)
+            )
+        publish_article_events(events)
+
+        # La actualización masiva no emite post_save
+        bump_content_version()
+        bump_autocomplete_version()
+
+    for article in articles.values():
+        logger.info("Artículo %s publicado: %s", article.pk, article.title)
+
+    return len(articles)
+
+
+def next_publication_at():
+    """
+    Obtiene la fecha de la próxima publicación programada pendiente.
+
+    Returns:
+        datetime | None: La fecha, o None si no hay publicaciones pendientes.
+    """
+
+    return ArticlesToPublish.objects.filter(published=False).aggregate(
+        next_at=Min("to_publish_at")
+    )["next_at"]
+
+
+def publish_schedule_articles(batch_size=PUBLISH_BATCH_SIZE):
+    """
+    Publica todos los articulos programados cuya fecha ya pasó.
+
+    Returns:
+        int: Cantidad de artículos publicados.
+    """
+
+    total = 0
+
+    while True:
+        published = publish_due_articles(batch_size=batch_size)
+        total += published
+
+        if published < batch_size:
+            break
+
+    if total:
+        logger.info("%s artículos programados publicados", total)
+
+    return total
@@ -0,0 +1,147 @@
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q
+
+from article.models import Category, CategoryType, Payment
+
+
+def annotate_entitlements(queryset, user):
+    """
+    Anota un queryset de categorías con el campo `is_accessible`.
+
+    El cálculo se realiza en la misma consulta que obtiene las categorías:
+    las categorías FREE son accesibles para todos, las de SUSCRIPCIÓN para
+    cualquier usuario autenticado y las de PAGO solo si el usuario tiene un
+    pago completado para la categoría.
+
+    Args:
+        queryset (QuerySet): Queryset de `Category`.
+        user (User): El usuario (puede ser anónimo).
+
+    Returns:
+        QuerySet: El queryset anotado con `is_accessible`.
+    """
+
+    if not user.is_authenticated:
+        condition = Q(type=CategoryType.FREE.value)
+    else:
+        purchased = Payment.objects.filter(
+            category=OuterRef("pk"), user=user, status="completed"
+        )
+        condition = Q(
+            type__in=(CategoryType.FREE.value, CategoryType.SUSCRIPTION.value)
+        ) | Q(Exists(purchased))
+
+    return queryset.annotate(
+        is_accessible=ExpressionWrapper(condition, output_field=BooleanField())
+    )
+
+
+def get_accessible_category_ids(user):
+    """
+    Obtiene el conjunto de IDs de categorías a las que el usuario tiene acceso.
+
+    El resultado se resuelve con una única consulta y se guarda en la instancia
+    del usuario, por lo que las siguientes llamadas durante la misma solicitud
+    no vuelven a consultar la base de datos.
+
+    Args:
+        user (User): El usuario (puede ser anónimo).
+
+    Returns:
+        frozenset: IDs de las categorías accesibles.
+    """
+
+    cached = getattr(user, "_accessible_category_ids", None)
+    if cached is not None:
+        return cached
+
+    accessible_ids = frozenset(
+        annotate_entitlements(Category.objects.all(), user)
+        .filter(is_accessible=True)
+        .values_list("id", flat=True)
+    )
+
+    user._accessible_category_ids = accessible_ids
+    return accessible_ids
+
+
+def split_categories(user, categories=None):
+    """
+    Separa las categorías en permitidas y no permitidas para el usuario.
+
+    Args:
+        user (User): El usuario (puede ser anónimo).
+        categories (QuerySet, optional): Queryset de `Category` a separar. Por
+            defecto todas las categorías.
+
+    Returns:
+        tuple: (permited_categories, not_permited_categories), ambas listas de `Category`.
+    """
+
+    all_categories = categories is None
+    if all_categories:
+        categories = Category.objects.all()
+
+    permited_categories = []
+    not_permited_categories = []
+
+    for category in annotate_entitlements(categories, user):
+        if category.is_accessible:
+            permited_categories.append(category)
+        else:
+            not_permited_categories.append(category)
+
+    # Si se resolvieron todas las categorías, el resultado sirve también como
+    # conjunto de accesos para el resto de la solicitud
+    if all_categories:
+        user._accessible_category_ids = frozenset(
+            category.id for category in permited_categories
+        )
+
+    return permited_categories, not_permited_categories
+
+
+def can_access_category(user, category):
+    """
+    Verifica si el usuario puede acceder a una categoría.
+
+    Args:
+        user (User): El usuario (puede ser anónimo).
+        category (Category): La categoría a verificar.
+
+    Returns:
+        bool: True si el usuario puede acceder a la categoría.
+    """
+
+    if category.type == CategoryType.FREE.value:
+        return True
+
+    if category.type == CategoryType.SUSCRIPTION.value:
+        return user.is_authenticated
+
+    return category.id in get_accessible_category_ids(user)
+
+
+def has_purchased_category(user, category):
+    """
+    Verifica si el usuario tiene un pago completado para una categoría.
+
+    Args:
+        user (User): El usuario (puede ser anónimo).
+        category (Category | int): La categoría o su ID.
+
+    Returns:
+        bool: True si el usuario compró la categoría.
+    """
+
+    if not user.is_authenticated:
+        return False
+
+    category_id = getattr(category, "pk", category)
+    category_type = getattr(category, "type", None)
+
+    if category_type == CategoryType.PAY.value:
+        return category_id in get_accessible_category_ids(user)
+
+    return Payment.objects.filter(
+        category_id=category_id, user=user, status="completed"
+    ).exists()
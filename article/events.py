@@ -0,0 +1,441 @@
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EVENT_BACKEND = "article.events.LocalEventBroker"
+
+# Eventos recientes que se reenvían a un cliente que se reconecta
+EVENT_HISTORY_SIZE = 256
+
+# Eventos pendientes por cliente; si un cliente lento supera el límite se
+# cierra su conexión y el navegador se reconecta recuperando el historial
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Mensaje que indica que la suscripción fue cerrada
+CLOSED = object()
+
+# Canal de PostgreSQL por el que se envían los eventos entre procesos
+EVENT_CHANNEL = "article_events"
+
+# Segundos de espera del hilo que escucha el canal entre revisiones y antes
+# de reconectarse tras un error
+LISTEN_POLL_INTERVAL = 5
+
+
+class Subscription:
+    """
+    Suscripción de un cliente a los eventos de un `LocalEventBroker`.
+
+    Los eventos se entregan en una `asyncio.Queue` del event loop del cliente,
+    por lo que cada conexión abierta es una tarea asíncrona y no un hilo. Se
+    pueden publicar eventos desde cualquier hilo.
+    """
+
+    def __init__(self, loop, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, message):
+        """
+        Encola un mensaje desde cualquier hilo.
+
+        Args:
+            message (tuple | object): `(id, evento)` o `CLOSED`.
+        """
+
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # El event loop del cliente ya terminó
+            pass
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            message = CLOSED
+
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """
+        Espera el siguiente mensaje.
+
+        Args:
+            timeout (float): Segundos máximos de espera.
+
+        Returns:
+            tuple | object | None: `(id, evento)`, `CLOSED`, o None si no llegó
+                ningún mensaje a tiempo.
+        """
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalEventBroker:
+    """
+    Distribuye eventos a las conexiones abiertas en el mismo proceso.
+
+    Guarda los últimos eventos para reenviarlos a los clientes que se
+    reconectan con `Last-Event-ID`. Solo alcanza a los clientes del proceso
+    que publica el evento; para distribuirlos entre procesos se usa
+    `PostgresEventBroker`.
+    """
+
+    def __init__(self, history_size=EVENT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)
+        self._last_id = 0
+
+    def publish(self, event):
+        """
+        Envía un evento a todas las suscripciones.
+
+        Args:
+            event (dict): El evento, serializable como JSON.
+
+        Returns:
+            int: El ID asignado al evento.
+        """
+
+        with self._lock:
+            self._last_id += 1
+            message = (self._last_id, event)
+            self._history.append(message)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription.push(message)
+
+        return message[0]
+
+    @property
+    def last_id(self):
+        """
+        ID del último evento publicado.
+        """
+
+        return self._last_id
+
+    def _history_since(self, last_event_id):
+        oldest = self._history[0][0] if self._history else self._last_id + 1
+        missed = [message for message in self._history if message[0] > last_event_id]
+        complete = (
+            oldest - 1 <= last_event_id <= self._last_id
+            and len(missed) <= SUBSCRIBER_QUEUE_SIZE
+        )
+
+        return missed[-SUBSCRIBER_QUEUE_SIZE:], complete
+
+    def history(self, last_event_id):
+        """
+        Obtiene los eventos posteriores a `last_event_id` que siguen en el historial.
+
+        Args:
+            last_event_id (int): Último evento recibido por el cliente.
+
+        Returns:
+            tuple: `(messages, complete)`, donde `complete` es False si parte
+                de los eventos ya no está en el historial.
+        """
+
+        with self._lock:
+            return self._history_since(last_event_id)
+
+    def subscribe(self, last_event_id=None):
+        """
+        Crea una suscripción en el event loop actual.
+
+        Args:
+            last_event_id (int, optional): Último evento recibido por el
+                cliente; los posteriores que sigan en el historial se
+                encolan de inmediato.
+
+        Returns:
+            tuple: `(subscription, complete)`, donde `complete` es False si
+                parte de los eventos posteriores a `last_event_id` ya no está
+                en el historial.
+        """
+
+        subscription = Subscription(asyncio.get_running_loop())
+        complete = True
+
+        with self._lock:
+            if last_event_id is not None:
+                missed, complete = self._history_since(last_event_id)
+                for message in missed:
+                    subscription.queue.put_nowait(message)
+
+            self._subscribers.add(subscription)
+
+        return subscription, complete
+
+    def unsubscribe(self, subscription):
+        """
+        Elimina una suscripción.
+
+        Args:
+            subscription (Subscription): La suscripción.
+        """
+
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class PostgresEventBroker(LocalEventBroker):
+    """
+    Distribuye eventos entre procesos con LISTEN/NOTIFY de PostgreSQL.
+
+    `publish` envía el evento con `pg_notify` desde cualquier proceso (los
+    workers web donde cambian los artículos) y cada proceso con clientes
+    conectados lo recibe en un hilo que escucha el canal con su propia
+    conexión y lo entrega a sus suscripciones como `LocalEventBroker`.
+
+    Los IDs de los eventos los asigna cada proceso al recibirlos, por lo que
+    `Last-Event-ID` solo es válido en el proceso que lo envió: los tableros
+    en vivo deben atenderse desde un único proceso ASGI. Si la conexión que
+    escucha se pierde, o si hay suscripciones antes de la primera conexión,
+    al conectarse se cierran las suscripciones y se descarta el historial,
+    para que los tableros se recarguen.
+
+    Args:
+        using (str, optional): Alias de la base de datos.
+        channel (str, optional): Canal de PostgreSQL.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, channel=EVENT_CHANNEL, **kwargs):
+        super().__init__(**kwargs)
+        self.using = using
+        self.channel = channel
+        self._listener = None
+        self._listening = threading.Event()
+        self._stop = threading.Event()
+        self._wakeup = None
+
+    def publish(self, event):
+        """
+        Envía un evento a las suscripciones de todos los procesos.
+
+        Se usa la conexión de Django, por lo que dentro de una transacción el
+        evento se entrega recién al confirmarla.
+
+        Args:
+            event (dict): El evento, serializable como JSON.
+
+        Returns:
+            None: El ID lo asigna cada proceso al recibir el evento.
+        """
+
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)", [self.channel, json.dumps(event)]
+            )
+
+    def history(self, last_event_id):
+        self.start_listening()
+        return super().history(last_event_id)
+
+    def subscribe(self, last_event_id=None):
+        self.start_listening()
+        return super().subscribe(last_event_id)
+
+    def start_listening(self):
+        """
+        Inicia el hilo que escucha el canal, si no está iniciado.
+
+        No espera a que el hilo se conecte, por lo que se puede llamar desde
+        el event loop. Los procesos ASGI lo inician al arrancar con
+        `start_event_listener`.
+        """
+
+        with self._lock:
+            if self._listener is None:
+                self._stop.clear()
+                self._wakeup = os.pipe()
+                self._listener = threading.Thread(
+                    target=self._listen,
+                    args=(self._wakeup[0],),
+                    name="article-events",
+                    daemon=True,
+                )
+                self._listener.start()
+
+    def wait_listening(self, timeout=LISTEN_POLL_INTERVAL):
+        """
+        Espera a que el hilo esté escuchando el canal. Bloquea el hilo actual,
+        por lo que no se debe llamar desde el event loop.
+
+        Args:
+            timeout (float, optional): Segundos máximos de espera.
+
+        Returns:
+            bool: Si el canal se está escuchando.
+        """
+
+        return self._listening.wait(timeout)
+
+    def close(self):
+        """
+        Detiene el hilo que escucha el canal y cierra su conexión.
+        """
+
+        with self._lock:
+            listener, self._listener = self._listener, None
+
+        if listener is not None:
+            self._stop.set()
+            os.write(self._wakeup[1], b"\0")
+            listener.join()
+            os.close(self._wakeup[1])
+
+    def _connect(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.autocommit = True
+
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+
+        return conn
+
+    def _listen(self, wakeup):
+        conn = None
+        connected_before = False
+
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self._connect()
+                    # Las suscripciones creadas mientras no se escuchaba el
+                    # canal pudieron perder eventos
+                    if connected_before or self._subscribers:
+                        self._reset()
+                    connected_before = True
+                    self._listening.set()
+
+                # `close` escribe en `wakeup` para no esperar el intervalo
+                select.select([conn, wakeup], [], [], LISTEN_POLL_INTERVAL)
+                conn.poll()
+
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    LocalEventBroker.publish(self, json.loads(notify.payload))
+            except Exception:
+                logger.exception("Se perdió la conexión de los eventos del kanban")
+                self._listening.clear()
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                self._stop.wait(LISTEN_POLL_INTERVAL)
+
+        if conn is not None:
+            conn.close()
+        os.close(wakeup)
+        self._listening.clear()
+
+    def _reset(self):
+        # Los eventos enviados mientras no había conexión se perdieron: se
+        # saltea un ID para que los clientes reciban `reset` al reconectarse
+        with self._lock:
+            self._last_id += 1
+            self._history.clear()
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+
+        for subscription in subscribers:
+            subscription.push(CLOSED)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker():
+    """
+    Obtiene el distribuidor de eventos configurado en `ARTICLE_EVENTS_BACKEND`.
+
+    Returns:
+        LocalEventBroker: El distribuidor, compartido por todo el proceso.
+    """
+
+    global _broker
+
+    with _broker_lock:
+        if _broker is None:
+            backend = getattr(
+                settings, "ARTICLE_EVENTS_BACKEND", DEFAULT_EVENT_BACKEND
+            )
+            _broker = import_string(backend)()
+
+    return _broker
+
+
+def start_event_listener():
+    """
+    Inicia la recepción de eventos de otros procesos, si el distribuidor
+    configurado la necesita. La llama el punto de entrada ASGI, para que los
+    tableros no esperen la conexión al suscribirse.
+    """
+
+    start_listening = getattr(get_event_broker(), "start_listening", None)
+    if start_listening is not None:
+        start_listening()
+
+
+def article_event(article, event_type, previous_state=None):
+    """
+    Construye el evento de un artículo que reciben los tableros abiertos.
+
+    Args:
+        article (Article): El artículo, con autor y categoría.
+        event_type (str): `created` o `updated`.
+        previous_state (str, optional): Estado anterior, si cambió.
+
+    Returns:
+        dict: El evento.
+    """
+
+    return {
+        "type": f"article.{event_type}",
+        "id": article.pk,
+        "title": article.title,
+        "state": article.state,
+        "previous_state": previous_state,
+        "autor_id": article.autor_id,
+        "autor": article.autor.username,
+        "category": article.category.name,
+        "is_moderated": article.category.is_moderated,
+    }
+
+
+def publish_article_events(events):
+    """
+    Publica eventos de artículos al confirmarse la transacción actual.
+
+    Args:
+        events (Iterable[dict]): Eventos construidos con `article_event`.
+    """
+
+    events = list(events)
+
+    def publish():
+        broker = get_event_broker()
+        for event in events:
+            broker.publish(event)
+
+    transaction.on_commit(publish)
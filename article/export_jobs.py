@@ -0,0 +1,283 @@
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from article.models import ExportJob, ExportJobStates
+from article.sales import (
+    filter_payments,
+    filter_purchases,
+    parse_sales_range,
+    write_purchases_xlsx,
+    write_sales_xlsx,
+)
+from roles.utils import PermissionEnum
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_JOB_TTL = 60 * 60 * 24
+
+
+def sales_payments(job):
+    """
+    Obtiene los pagos del reporte de categorías vendidas de una exportación.
+    """
+
+    since, until = parse_sales_range(
+        job.params.get("date_range", "all"),
+        job.params.get("start_date"),
+        job.params.get("end_date"),
+    )
+    return filter_payments(
+        since, until, job.params.get("category_name", ""), job.params.get("username", "")
+    )
+
+
+def purchases_payments(job):
+    """
+    Obtiene las compras del suscriptor que solicitó la exportación.
+    """
+
+    since, until = parse_sales_range(
+        "all", job.params.get("start_date"), job.params.get("end_date")
+    )
+    return filter_purchases(job.user, since, until)
+
+
+# Tipos de exportación: filtros aceptados, permiso requerido, pagos y escritor
+EXPORT_KINDS = {
+    "sales": {
+        "params": ["date_range", "start_date", "end_date", "category_name", "username"],
+        "permission": PermissionEnum.VER_CATEGORIAS_PAGO,
+        "payments": sales_payments,
+        "writer": write_sales_xlsx,
+        "filename": "categorias_vendidas.xlsx",
+    },
+    "purchases": {
+        "params": ["start_date", "end_date"],
+        "permission": PermissionEnum.VER_CATEGORIAS,
+        "payments": purchases_payments,
+        "writer": write_purchases_xlsx,
+        "filename": "categorias_compradas.xlsx",
+    },
+}
+
+
+def get_export_job_ttl():
+    """
+    Obtiene cuánto tiempo se conservan los archivos generados.
+
+    Returns:
+        timedelta: El tiempo de vida de los archivos.
+    """
+
+    return timedelta(seconds=getattr(settings, "EXPORT_JOB_TTL", DEFAULT_EXPORT_JOB_TTL))
+
+
+def export_params_hash(user, kind, params):
+    """
+    Calcula el hash que identifica solicitudes de exportación idénticas.
+
+    Args:
+        user (User): El usuario que solicita la exportación.
+        kind (str): Tipo de exportación.
+        params (dict): Filtros del reporte.
+
+    Returns:
+        str: El hash en hexadecimal.
+    """
+
+    raw = json.dumps([user.pk, kind, params], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def request_export_job(user, kind, params):
+    """
+    Crea una exportación o devuelve la que ya está pendiente o en curso con
+    los mismos filtros.
+
+    Args:
+        user (User): El usuario que solicita la exportación.
+        kind (str): Tipo de exportación, una clave de `EXPORT_KINDS`.
+        params (dict): Filtros del reporte.
+
+    Returns:
+        tuple: `(job, created)`.
+    """
+
+    params_hash = export_params_hash(user, kind, params)
+    active = ExportJob.objects.filter(
+        params_hash=params_hash, state__in=ExportJob.ACTIVE_STATES
+    )
+
+    job = active.first()
+    if job is not None:
+        return job, False
+
+    try:
+        with transaction.atomic():
+            job = ExportJob.objects.create(
+                user=user, kind=kind, params=params, params_hash=params_hash
+            )
+    except IntegrityError:
+        # Otra solicitud idéntica creó el trabajo al mismo tiempo
+        return active.get(), False
+
+    return job, True
+
+
+def claim_export_jobs(limit):
+    """
+    Marca como en curso las exportaciones pendientes más antiguas.
+
+    Las filas bloqueadas por otro proceso se saltean, por lo que varios
+    procesos pueden tomar trabajos a la vez sin repetirlos.
+
+    Args:
+        limit (int): Cantidad máxima de trabajos a tomar.
+
+    Returns:
+        list[int]: IDs de los trabajos tomados.
+    """
+
+    with transaction.atomic():
+        job_ids = list(
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(state=ExportJobStates.PENDING.value)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        ExportJob.objects.filter(pk__in=job_ids).update(
+            state=ExportJobStates.RUNNING.value
+        )
+
+    return job_ids
+
+
+def requeue_export_jobs():
+    """
+    Vuelve a encolar las exportaciones que quedaron en curso.
+
+    Solo se debe llamar cuando ningún proceso está generando exportaciones,
+    al iniciar el comando `run_export_jobs`: los trabajos en curso quedaron de
+    un proceso terminado abruptamente y, mientras tanto, impiden solicitar
+    otra vez la misma exportación.
+
+    Returns:
+        int: Cantidad de exportaciones encoladas.
+    """
+
+    return ExportJob.objects.filter(state=ExportJobStates.RUNNING.value).update(
+        state=ExportJobStates.PENDING.value, progress=0, total=0
+    )
+
+
+def fail_export_job(job_id, error):
+    """
+    Marca como fallida una exportación que sigue en curso, por ejemplo si el
+    proceso que la generaba terminó abruptamente.
+
+    Args:
+        job_id (int): ID del trabajo.
+        error (str): Descripción del error.
+    """
+
+    ExportJob.objects.filter(pk=job_id, state=ExportJobStates.RUNNING.value).update(
+        state=ExportJobStates.FAILED.value, error=error, finished_at=timezone.now()
+    )
+
+
+def run_export_job(job_id):
+    """
+    Genera el archivo de una exportación dentro de `MEDIA_ROOT`.
+
+    El progreso se guarda en la base de datos a medida que se escriben las
+    filas, para que la vista de estado pueda informarlo.
+
+    Args:
+        job_id (int): ID del trabajo.
+
+    Returns:
+        str: El estado final del trabajo.
+    """
+
+    job = ExportJob.objects.select_related("user").get(pk=job_id)
+    kind = EXPORT_KINDS[job.kind]
+
+    def progress(count):
+        ExportJob.objects.filter(pk=job.pk).update(progress=count)
+
+    try:
+        payments = kind["payments"](job)
+        job.total = payments.count()
+        ExportJob.objects.filter(pk=job.pk).update(total=job.total)
+
+        with tempfile.TemporaryFile() as file:
+            job.progress = kind["writer"](payments, file, progress)
+            file.seek(0)
+            job.file.save(f"{job.kind}_{job.pk}.xlsx", File(file), save=False)
+
+        job.state = ExportJobStates.DONE.value
+        job.expires_at = timezone.now() + get_export_job_ttl()
+    except Exception as error:
+        logger.exception("No se pudo generar la exportación %s", job.pk)
+        job.state = ExportJobStates.FAILED.value
+        job.error = str(error)
+
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=[
+            "state",
+            "progress",
+            "total",
+            "file",
+            "error",
+            "finished_at",
+            "expires_at",
+        ]
+    )
+    return job.state
+
+
+def expire_export_jobs(now=None):
+    """
+    Elimina los archivos de las exportaciones vencidas.
+
+    También marca como fallidas las exportaciones que siguen en curso después
+    del tiempo de vida, por ejemplo si el proceso que las generaba terminó
+    abruptamente.
+
+    Args:
+        now (datetime, optional): Fecha de referencia.
+
+    Returns:
+        int: Cantidad de exportaciones vencidas.
+    """
+
+    now = now or timezone.now()
+
+    ExportJob.objects.filter(
+        state=ExportJobStates.RUNNING.value, created_at__lt=now - get_export_job_ttl()
+    ).update(
+        state=ExportJobStates.FAILED.value,
+        error="La exportación no terminó a tiempo",
+        finished_at=now,
+    )
+
+    expired = 0
+    for job in ExportJob.objects.filter(
+        state=ExportJobStates.DONE.value, expires_at__lte=now
+    ).iterator():
+        job.file.delete(save=False)
+        job.state = ExportJobStates.EXPIRED.value
+        job.save(update_fields=["file", "state"])
+        expired += 1
+
+    return expired
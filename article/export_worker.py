@@ -0,0 +1,32 @@
+"""
+Funciones ejecutadas en los procesos del comando `run_export_jobs`.
+
+El módulo no importa Django al cargarse para que los procesos creados con
+"spawn" puedan importarlo antes de configurar las aplicaciones.
+"""
+
+
+def setup_worker():
+    """
+    Configura Django en un proceso de exportación.
+    """
+
+    import django
+
+    django.setup()
+
+
+def process_export_job(job_id):
+    """
+    Genera el archivo de una exportación.
+
+    Args:
+        job_id (int): ID del trabajo.
+
+    Returns:
+        str: El estado final del trabajo.
+    """
+
+    from article.export_jobs import run_export_job
+
+    return run_export_job(job_id)
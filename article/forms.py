@@ -2,7 +2,6 @@ from django import forms
 from article.models import Category, Article
 from mdeditor.fields import MDTextFormField
 from taggit.forms import TagWidget
-from taggit.models import Tag
 
 
 class CategoryForm(forms.ModelForm):
@@ -115,11 +114,18 @@ class ArticleFilterForm(forms.Form):
     """
 
     # Filtro de tags
-    tags = forms.ModelChoiceField(
-        queryset=Tag.objects.all(),
+    tags = forms.CharField(
+        max_length=100,
         required=False,
         label="Filtrar por tag",
-        widget=forms.Select(attrs={"class": "form-control"}),
+        widget=forms.TextInput(
+            attrs={
+                "class": "form-control",
+                "list": "tag-suggestions",
+                "autocomplete": "off",
+                "placeholder": "Escribí un tag...",
+            }
+        ),
     )
 
     # Filtro de categorías
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from article.models import Article
+from article.utils import extract_content_metadata
+
+
+class Command(BaseCommand):
+    """
+    Recalcula la imagen de portada, el extracto y la cantidad de palabras de
+    cada artículo a partir de su contenido actual.
+    """
+
+    help = "Recalcula la portada, el extracto y el tiempo de lectura de los artículos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Cantidad de artículos a actualizar por consulta",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fields = ["cover_image_url", "excerpt", "word_count"]
+
+        articles = (
+            Article.objects.filter(current_content__isnull=False)
+            .select_related("current_content")
+            .only("id", *fields, "current_content__body")
+            .order_by("pk")
+        )
+
+        batch = []
+        updated = 0
+
+        for article in articles.iterator(chunk_size=batch_size):
+            for field, value in extract_content_metadata(
+                article.current_content.body
+            ).items():
+                setattr(article, field, value)
+
+            batch.append(article)
+
+            if len(batch) >= batch_size:
+                Article.objects.bulk_update(batch, fields)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            Article.objects.bulk_update(batch, fields)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} artículos actualizados"))
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from article.cron import (
+    PUBLISH_BATCH_SIZE,
+    next_publication_at,
+    publish_schedule_articles,
+)
+
+
+class Command(BaseCommand):
+    """
+    Publica los artículos programados cuya fecha ya pasó.
+
+    Con `--loop` queda en ejecución y duerme hasta la próxima publicación
+    programada, en lugar de revisar una vez por minuto. La espera se limita a
+    `--max-sleep` segundos para tomar las programaciones creadas mientras
+    tanto.
+    """
+
+    help = "Publica los artículos programados cuya fecha ya pasó"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PUBLISH_BATCH_SIZE,
+            help="Cantidad de artículos a publicar por transacción",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Sigue publicando a medida que llegan las fechas programadas",
+        )
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            default=30.0,
+            help="Segundos máximos de espera entre revisiones",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_schedule_articles(options["batch_size"])
+            if published:
+                self.stdout.write(f"{published} artículos publicados")
+
+            if not options["loop"]:
+                break
+
+            delay = options["max_sleep"]
+            next_at = next_publication_at()
+            if next_at is not None:
+                delay = min(delay, (next_at - timezone.now()).total_seconds())
+
+            # Si otra ejecución tiene bloqueadas las publicaciones vencidas no
+            # se revisa continuamente
+            time.sleep(max(delay, 0.5))
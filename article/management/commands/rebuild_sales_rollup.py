@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from article.sales import rebuild_sales_rollup
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye el acumulado diario de ventas a partir de los pagos
+    completados.
+    """
+
+    help = "Reconstruye el acumulado diario de ventas por categoría"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Cantidad de filas a insertar por consulta",
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_sales_rollup(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"{created} días de ventas reconstruidos"))
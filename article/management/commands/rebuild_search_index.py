@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from article.models import Article
+from article.search import update_search_vector
+
+
+class Command(BaseCommand):
+    """
+    Recalcula el vector de búsqueda de texto completo de todos los artículos.
+    """
+
+    help = "Recalcula el índice de búsqueda de los artículos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Cantidad de artículos a actualizar por consulta",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        article_ids = Article.objects.order_by("pk").values_list("pk", flat=True)
+
+        batch = []
+        updated = 0
+
+        for article_id in article_ids.iterator(chunk_size=batch_size):
+            batch.append(article_id)
+
+            if len(batch) >= batch_size:
+                update_search_vector(batch)
+                updated += len(batch)
+                batch = []
+
+        if batch:
+            update_search_vector(batch)
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} artículos indexados"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from article.models import reconcile_rating_aggregates
+
+
+class Command(BaseCommand):
+    """
+    Recalcula la suma, la cantidad y el histograma de calificaciones de los
+    artículos cuyos agregados no coinciden con los votos guardados.
+    """
+
+    help = "Recalcula los agregados de calificación de los artículos"
+
+    def handle(self, *args, **options):
+        updated = reconcile_rating_aggregates()
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} artículos reconciliados"))
@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from article.models import ArticleContent
+from article.rendering import RENDER_PIPELINE_VERSION, render_markdown
+
+
+class Command(BaseCommand):
+    """
+    Vuelve a renderizar el HTML de las revisiones de contenido.
+
+    El renderizado de markdown se reparte entre varios procesos; solo el
+    proceso principal accede a la base de datos.
+    """
+
+    help = "Renderiza el HTML de las revisiones de contenido de los artículos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Cantidad de procesos usados para renderizar",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Cantidad de revisiones a actualizar por consulta",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Renderiza también las revisiones que ya están al día",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        self.workers = max(1, options["workers"])
+
+        contents = ArticleContent.objects.order_by("pk").only("id", "body")
+        if not options["force"]:
+            contents = contents.exclude(rendered_version=RENDER_PIPELINE_VERSION)
+
+        updated = 0
+
+        # "spawn" evita que los procesos hereden la conexión a la base de datos
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            batch = []
+
+            for content in contents.iterator(chunk_size=batch_size):
+                batch.append(content)
+
+                if len(batch) >= batch_size:
+                    updated += self.render_batch(executor, batch)
+                    batch = []
+
+            if batch:
+                updated += self.render_batch(executor, batch)
+
+        self.stdout.write(self.style.SUCCESS(f"{updated} revisiones renderizadas"))
+
+    def render_batch(self, executor, batch):
+        """
+        Renderiza un lote de revisiones en paralelo y las guarda con una
+        única consulta.
+
+        Args:
+            executor (ProcessPoolExecutor): Procesos de renderizado.
+            batch (list): Revisiones a renderizar.
+
+        Returns:
+            int: Cantidad de revisiones actualizadas.
+        """
+
+        bodies = [content.body for content in batch]
+        chunksize = max(1, len(bodies) // (self.workers * 4))
+
+        for content, rendered_body in zip(
+            batch, executor.map(render_markdown, bodies, chunksize=chunksize)
+        ):
+            content.rendered_body = rendered_body
+            content.rendered_version = RENDER_PIPELINE_VERSION
+
+        ArticleContent.objects.bulk_update(batch, ["rendered_body", "rendered_version"])
+        return len(batch)
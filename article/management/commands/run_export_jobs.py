@@ -0,0 +1,118 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from article.export_jobs import (
+    claim_export_jobs,
+    expire_export_jobs,
+    fail_export_job,
+    requeue_export_jobs,
+)
+from article.export_worker import process_export_job, setup_worker
+
+
+class Command(BaseCommand):
+    """
+    Procesa las exportaciones pendientes en un conjunto de procesos.
+
+    El proceso principal toma los trabajos pendientes y elimina los archivos
+    vencidos; cada archivo se genera en uno de los procesos del conjunto. Solo
+    debe ejecutarse una instancia del comando: al iniciar, vuelve a encolar
+    las exportaciones que quedaron en curso.
+    """
+
+    help = "Genera en segundo plano los archivos de las exportaciones pendientes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Cantidad de procesos usados para generar archivos",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Segundos entre búsquedas de trabajos pendientes",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Termina cuando no quedan trabajos pendientes",
+        )
+
+    def create_executor(self, workers):
+        """
+        Crea el conjunto de procesos que generan los archivos.
+
+        Args:
+            workers (int): Cantidad de procesos.
+
+        Returns:
+            ProcessPoolExecutor: El conjunto de procesos.
+        """
+
+        # "spawn" evita que los procesos hereden la conexión a la base de datos
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=setup_worker,
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        poll_interval = options["poll_interval"]
+        running = {}
+
+        requeued = requeue_export_jobs()
+        if requeued:
+            self.stdout.write(f"{requeued} exportaciones interrumpidas reencoladas")
+
+        executor = self.create_executor(workers)
+        try:
+            while True:
+                expired = expire_export_jobs()
+                if expired:
+                    self.stdout.write(f"{expired} exportaciones vencidas eliminadas")
+
+                job_ids = claim_export_jobs(workers - len(running))
+                for job_id in job_ids:
+                    try:
+                        future = executor.submit(process_export_job, job_id)
+                    except BrokenProcessPool:
+                        executor.shutdown(wait=False)
+                        executor = self.create_executor(workers)
+                        future = executor.submit(process_export_job, job_id)
+                    running[future] = job_id
+
+                if not running:
+                    if options["once"]:
+                        break
+
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        state = future.result()
+                    except Exception as error:
+                        # Si un proceso terminó abruptamente el conjunto queda
+                        # inutilizable y fallan todos sus trabajos en curso
+                        broken = broken or isinstance(error, BrokenProcessPool)
+                        fail_export_job(job_id, str(error) or type(error).__name__)
+                        self.stderr.write(f"Exportación {job_id}: {error}")
+                    else:
+                        self.stdout.write(f"Exportación {job_id}: {state}")
+
+                if broken:
+                    executor.shutdown(wait=False)
+                    executor = self.create_executor(workers)
+        finally:
+            executor.shutdown()
@@ -0,0 +1,48 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from article.scheduler import Scheduler, default_jobs
+from notification.utils import smtp_pool
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta las tareas periódicas (publicaciones programadas, bandeja de
+    salida, agregados de calificación y acumulado de ventas) en un proceso
+    que mantiene Django cargado.
+
+    Termina al recibir SIGINT o SIGTERM, después de la tarea en curso, e
+    informa las métricas de duración de cada tarea.
+    """
+
+    help = "Ejecuta las tareas periódicas del CMS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Ejecuta cada tarea una vez y termina",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler(default_jobs())
+
+        if options["once"]:
+            scheduler.run_pending()
+        else:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: scheduler.stop())
+
+            scheduler.run()
+
+        smtp_pool.close_all()
+
+        for name, metrics in scheduler.metrics.items():
+            snapshot = metrics.snapshot()
+            self.stdout.write(
+                f"{name}: {snapshot['runs']} ejecuciones, "
+                f"{snapshot['failures']} fallos, "
+                f"duración promedio {snapshot['avg_ms']} ms, "
+                f"máxima {snapshot['max_ms']} ms"
+            )
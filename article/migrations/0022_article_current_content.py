@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_current_content(apps, schema_editor):
+    Article = apps.get_model("article", "Article")
+    ArticleContent = apps.get_model("article", "ArticleContent")
+
+    latest_content = (
+        ArticleContent.objects.filter(article=OuterRef("pk"))
+        .order_by("-pk")
+        .values("pk")[:1]
+    )
+
+    Article.objects.update(current_content=Subquery(latest_content))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0021_article_is_featured'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='current_content',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='article.articlecontent'),
+        ),
+        migrations.RunPython(backfill_current_content, migrations.RunPython.noop),
+    ]
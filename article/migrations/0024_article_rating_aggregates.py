@@ -0,0 +1,79 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Article = apps.get_model("article", "Article")
+    ArticleVote = apps.get_model("article", "ArticleVote")
+
+    def votes_aggregate(aggregate, **filters):
+        votes = (
+            ArticleVote.objects.filter(
+                article=OuterRef("pk"), rating__isnull=False, **filters
+            )
+            .order_by()
+            .values("article")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+        return Coalesce(Subquery(votes), Value(0))
+
+    expressions = {
+        "rating_sum": votes_aggregate(Sum("rating")),
+        "rating_count": votes_aggregate(Count("pk")),
+    }
+    for stars in range(1, 6):
+        expressions[f"rating_{stars}_count"] = votes_aggregate(
+            Count("pk"), rating=stars
+        )
+
+    Article.objects.update(**expressions)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0023_article_content_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.7 on 2026-10-18 07:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+BACKFILL_SEARCH_VECTOR = """
+UPDATE article_article AS a SET search_vector =
+    setweight(to_tsvector('spanish', coalesce(a.title, '')), 'A')
+    || setweight(to_tsvector('spanish', coalesce((
+        SELECT string_agg(t.name, ' ')
+        FROM taggit_taggeditem ti
+        JOIN taggit_tag t ON t.id = ti.tag_id
+        JOIN django_content_type ct ON ct.id = ti.content_type_id
+        WHERE ct.app_label = 'article' AND ct.model = 'article' AND ti.object_id = a.id
+    ), '')), 'B')
+    || setweight(to_tsvector('spanish', coalesce(a.description, '')), 'C')
+    || setweight(to_tsvector('spanish', coalesce((
+        SELECT c.body FROM article_articlecontent c WHERE c.id = a.current_content_id
+    ), '')), 'D')
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0025_article_feed_indexes'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='article_search_vector_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
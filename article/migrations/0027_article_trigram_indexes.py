@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:02
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0026_article_search_vector'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='article_title_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        # Índice trigram sobre los nombres de etiquetas de taggit (modelo externo)
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS taggit_tag_name_trgm_idx "
+            "ON taggit_tag USING gin (name gin_trgm_ops)",
+            "DROP INDEX IF EXISTS taggit_tag_name_trgm_idx",
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0027_article_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlecontent',
+            name='rendered_body',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='articlecontent',
+            name='rendered_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
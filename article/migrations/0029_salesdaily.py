@@ -0,0 +1,56 @@
+# Generated by Django 5.0.7 on 2026-10-18 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_sales_daily(apps, schema_editor):
+    Payment = apps.get_model("article", "Payment")
+    SalesDaily = apps.get_model("article", "SalesDaily")
+
+    rows = (
+        Payment.objects.filter(status="completed")
+        .annotate(day=TruncDate("date_paid"))
+        .values_list("category_id", "day")
+        .annotate(count=Count("id"), revenue=Sum("price"))
+        .order_by()
+    )
+    SalesDaily.objects.bulk_create(
+        [
+            SalesDaily(
+                category_id=category_id, date=day, count=count, revenue=revenue or 0
+            )
+            for category_id, day, count, revenue in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('article', '0028_articlecontent_rendered_body'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.FloatField(default=0.0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='article.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='article_sal_date_4f8cec_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='salesdaily',
+            constraint=models.UniqueConstraint(fields=('category', 'date'), name='salesdaily_category_date_uniq'),
+        ),
+        migrations.RunPython(backfill_sales_daily, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,22 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q, F, Count, Sum, Subquery, OuterRef, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from enum import Enum
+from collections import defaultdict
 from mdeditor.fields import MDTextField
 from notification.utils import send_email
 from django.utils import timezone
 from taggit.managers import TaggableManager
+from article.rendering import RENDER_PIPELINE_VERSION, render_markdown
+from article.utils import (
+    COVER_IMAGE_MAX_LENGTH,
+    DEFAULT_COVER_IMAGE,
+    extract_content_metadata,
+    reading_time,
+)
 
 User = get_user_model()
 
@@ -86,7 +98,9 @@ class Category(models.Model):
         Returns:
             bool: Retorna True si el usuario ha comprado la categoría, False si no.
         """
-        return UserCategoryPurchase.objects.filter(user=user, category=self).exists()
+        from article.entitlements import has_purchased_category
+
+        return has_purchased_category(user, self)
 
     def __str__(self):
         return self.name
@@ -148,6 +162,14 @@ class Article(models.Model):
         likes_number (int): Número de 'me gusta' que ha recibido el artículo.
         dislikes_number (int): Número de 'no me gusta' que ha recibido el artículo.
         category (ForeignKey): Referencia a la categoría a la que pertenece el artículo.
+        current_content (ForeignKey): Referencia a la última revisión del contenido del artículo.
+        cover_image_url (str): Primera imagen del contenido actual, usada como portada.
+        excerpt (str): Extracto en texto plano del contenido actual.
+        word_count (int): Cantidad de palabras del contenido actual.
+        rating_sum (int): Suma de las calificaciones recibidas.
+        rating_count (int): Cantidad de calificaciones recibidas.
+        rating_1_count ... rating_5_count (int): Histograma de calificaciones por estrellas.
+        search_vector (SearchVectorField): Vector de búsqueda de texto completo.
     """
 
     title = models.CharField(max_length=100)
@@ -175,19 +197,116 @@ class Article(models.Model):
         ],
         default=ArticleStates.DRAFT.value,
     )
+    current_content = models.ForeignKey(
+        "ArticleContent",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    cover_image_url = models.CharField(
+        max_length=COVER_IMAGE_MAX_LENGTH, null=True, blank=True, editable=False
+    )
+    excerpt = models.TextField(blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
 
-    def change_state(self, new_state):
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # Índices para la paginación por cursor del inicio sobre (campo, id)
+        indexes = [
+            # Los artículos sin fecha de publicación se paginan al final
+            models.Index(
+                F("state"),
+                F("published_at").desc(nulls_last=True),
+                F("id").desc(),
+                name="article_feed_published_idx",
+            ),
+            models.Index(
+                fields=["state", "-views_number", "-id"],
+                name="article_feed_views_idx",
+            ),
+            models.Index(
+                fields=["state", "-likes_number", "-id"],
+                name="article_feed_likes_idx",
+            ),
+            models.Index(
+                fields=["state", "-dislikes_number", "-id"],
+                name="article_feed_dislikes_idx",
+            ),
+            models.Index(
+                fields=["state", "-shares_number", "-id"],
+                name="article_feed_shares_idx",
+            ),
+            # Primeras tarjetas de cada columna del kanban
+            models.Index(fields=["state", "-id"], name="article_kanban_idx"),
+            GinIndex(fields=["search_vector"], name="article_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                opclasses=["gin_trgm_ops"],
+                name="article_title_trgm_idx",
+            ),
+        ]
+
+    @property
+    def image_url(self):
         """
-        Cambia el estado del artículo.
+        URL de la imagen de portada o la imagen por defecto si no tiene.
+        """
+
+        return self.cover_image_url or DEFAULT_COVER_IMAGE
+
+    @property
+    def reading_time(self):
+        """
+        Tiempo de lectura estimado en minutos.
+        """
+
+        return reading_time(self.word_count)
+
+    @property
+    def avg_rating(self):
+        """
+        Calificación promedio redondeada a un decimal, o None si no tiene calificaciones.
+        """
+
+        if not self.rating_count:
+            return None
+
+        return round(self.rating_sum / self.rating_count, 1)
+
+    @property
+    def rating_histogram(self):
+        """
+        Cantidad de calificaciones por estrellas, de 1 a 5.
+        """
+
+        return [getattr(self, f"rating_{stars}_count") for stars in range(1, 6)]
+
+    def state_change_email(self, new_state):
+        """
+        Construye el correo que avisa al autor del cambio de estado.
 
         Args:
             new_state (str): El nuevo estado del artículo.
+
+        Returns:
+            dict: Destinatario, asunto y contenido HTML del correo.
         """
 
-        send_email(
-            to=self.autor.email,
-            subject="CMS PY: Cambio de estado de artículo",
-            html=f"""
+        return {
+            "to": self.autor.email,
+            "subject": "CMS PY: Cambio de estado de artículo",
+            "html": f"""
                 <h3>Hola, {self.autor.username}</h3>
                 <p>
                     El esta de tu articulo <strong>{self.title}</strong> ha sido cambiado
@@ -196,13 +315,26 @@ class Article(models.Model):
                     <strong>{get_state_name(self.state)}</strong> → <strong>{get_state_name(new_state)}</strong>
                 </p>
             """,
-        )
+        }
+
+    def change_state(self, new_state):
+        """
+        Cambia el estado del artículo.
+
+        Args:
+            new_state (str): El nuevo estado del artículo.
+        """
+
+        send_email(**self.state_change_email(new_state))
+
+        # Lo usa la señal que avisa del cambio a los tableros abiertos
+        self._previous_state = self.state
 
         if new_state == ArticleStates.PUBLISHED.value:
             self.published_at = timezone.now()
 
         self.state = new_state
-        self.save()
+        self.save(update_fields=["state", "published_at"])
 
 
 class ArticlesToPublish(models.Model):
@@ -227,12 +359,70 @@ class ArticleContent(models.Model):
         body (str): campo que simboliza el contenido del articulo
         autor (str): campo que simboliza el autor que realizo el cambio en el contenido
         article (ForeignKey): Referencia al articulo
+        rendered_body (str): HTML sanitizado generado a partir del contenido
+        rendered_version (int): Versión del renderizado con la que se generó `rendered_body`
     """
 
     body = MDTextField()
     autor = models.ForeignKey(User, on_delete=models.CASCADE)
     article = models.ForeignKey(Article, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    rendered_body = models.TextField(blank=True, default="", editable=False)
+    rendered_version = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    def get_rendered_body(self):
+        """
+        Obtiene el HTML del contenido, renderizándolo y guardándolo solo si
+        todavía no existe para la versión actual del renderizado.
+
+        Returns:
+            str: El HTML sanitizado.
+        """
+
+        if self.rendered_version != RENDER_PIPELINE_VERSION:
+            self.rendered_body = render_markdown(self.body)
+            self.rendered_version = RENDER_PIPELINE_VERSION
+
+            ArticleContent.objects.filter(pk=self.pk).update(
+                rendered_body=self.rendered_body,
+                rendered_version=self.rendered_version,
+            )
+
+        return self.rendered_body
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda la revisión y, si es nueva, la marca como el contenido actual del
+        artículo dentro de la misma transacción.
+        """
+
+        is_new = self._state.adding
+
+        # Las revisiones no cambian, por lo que el HTML se genera una sola vez
+        if is_new:
+            self.rendered_body = render_markdown(self.body)
+            self.rendered_version = RENDER_PIPELINE_VERSION
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if is_new:
+                metadata = extract_content_metadata(self.body)
+
+                # Solo avanza el puntero, nunca lo retrocede a una revisión anterior
+                Article.objects.filter(
+                    Q(current_content__isnull=True) | Q(current_content_id__lt=self.pk),
+                    pk=self.article_id,
+                ).update(current_content=self, **metadata)
+
+                if ArticleContent.article.is_cached(self):
+                    self.article.current_content = self
+                    for field, value in metadata.items():
+                        setattr(self.article, field, value)
+
+                from article.search import update_search_vector
+
+                update_search_vector([self.article_id])
 
 
 class UserCategoryPurchase(models.Model):
@@ -291,12 +481,142 @@ class ArticleVote(models.Model):
     class Meta:
         unique_together = ("user", "article")
 
+    def save(self, *args, **kwargs):
+        """
+        Guarda el voto y actualiza los agregados de calificación del artículo en
+        la misma transacción.
+        """
+
+        with transaction.atomic():
+            previous_rating = None
+            if not self._state.adding:
+                # Bloquea el voto para leer la calificación realmente guardada
+                previous_rating = (
+                    ArticleVote.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("rating", flat=True)
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+            if previous_rating != self.rating:
+                self._apply_rating_change(previous_rating, self.rating)
+
+    def delete(self, *args, **kwargs):
+        """
+        Elimina el voto y descuenta su calificación de los agregados del artículo.
+        """
+
+        with transaction.atomic():
+            rating = (
+                ArticleVote.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("rating", flat=True)
+                .first()
+            )
+            result = super().delete(*args, **kwargs)
+
+            if rating is not None:
+                self._apply_rating_change(rating, None)
+
+        return result
+
+    def _apply_rating_change(self, old_rating, new_rating):
+        """
+        Aplica la diferencia entre dos calificaciones a los agregados del artículo.
+
+        Args:
+            old_rating (int | None): Calificación anterior.
+            new_rating (int | None): Calificación nueva.
+        """
+
+        deltas = defaultdict(int)
+        deltas["rating_sum"] = (new_rating or 0) - (old_rating or 0)
+        deltas["rating_count"] = (new_rating is not None) - (old_rating is not None)
+
+        if old_rating is not None:
+            deltas[f"rating_{old_rating}_count"] -= 1
+        if new_rating is not None:
+            deltas[f"rating_{new_rating}_count"] += 1
+
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+
+        Article.objects.filter(pk=self.article_id).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+        # Mantiene sincronizada la instancia en memoria, si ya fue cargada
+        if ArticleVote.article.is_cached(self):
+            for field, delta in deltas.items():
+                setattr(self.article, field, getattr(self.article, field) + delta)
+
     def __str__(self):
         return (
             f"{self.user.username} rated {self.article.title} with {self.rating} stars"
         )
 
 
+def rating_aggregates():
+    """
+    Expresiones que recalculan los agregados de calificación de cada artículo a
+    partir de sus votos, para usarse en `Article.objects.update()`.
+
+    Returns:
+        dict: Expresiones por nombre de campo.
+    """
+
+    def votes_aggregate(aggregate, **filters):
+        votes = (
+            ArticleVote.objects.filter(
+                article=OuterRef("pk"), rating__isnull=False, **filters
+            )
+            .order_by()
+            .values("article")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+        return Coalesce(Subquery(votes), Value(0))
+
+    expressions = {
+        "rating_sum": votes_aggregate(Sum("rating")),
+        "rating_count": votes_aggregate(Count("pk")),
+    }
+
+    for stars in range(1, 6):
+        expressions[f"rating_{stars}_count"] = votes_aggregate(
+            Count("pk"), rating=stars
+        )
+
+    return expressions
+
+
+def reconcile_rating_aggregates():
+    """
+    Recalcula los agregados de calificación de los artículos cuyos valores
+    guardados no coinciden con sus votos.
+
+    Solo se escriben los artículos desincronizados, para no reescribir la
+    tabla completa ni pisar los votos que se registran mientras tanto.
+
+    Returns:
+        int: Cantidad de artículos corregidos.
+    """
+
+    aggregates = rating_aggregates()
+    stale = Q()
+    for field in aggregates:
+        stale |= ~Q(**{field: F(f"expected_{field}")})
+
+    return (
+        Article.objects.annotate(
+            **{f"expected_{field}": value for field, value in aggregates.items()}
+        )
+        .filter(stale)
+        .update(**aggregates)
+    )
+
+
 class Payment(models.Model):
     """
     Modelo que representa un pago realizado por un usuario.
@@ -316,3 +636,108 @@ class Payment(models.Model):
     date_paid = models.DateTimeField(default=timezone.now)
     stripe_payment_id = models.CharField(max_length=255, null=True, blank=True)
     status = models.CharField(max_length=20, default="pending")  # Agregar este campo
+
+
+class SalesDaily(models.Model):
+    """
+    Modelo que acumula las ventas completadas de una categoría en un día.
+
+    Se actualiza al completarse cada pago de `Payment` y se reconstruye con el
+    comando `rebuild_sales_rollup` a partir de los mismos pagos.
+
+    Attributes:
+        category (ForeignKey): La categoría vendida.
+        date (DateField): El día de los pagos, en la zona horaria del sitio.
+        count (PositiveIntegerField): Cantidad de pagos completados.
+        revenue (FloatField): Suma de los precios de los pagos.
+    """
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    date = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    revenue = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "date"], name="salesdaily_category_date_uniq"
+            )
+        ]
+        indexes = [models.Index(fields=["date"])]
+
+    def __str__(self):
+        return f"{self.category} {self.date}: {self.count}"
+
+
+class ExportJobStates(Enum):
+    """
+    Enumeración que define los estados de una exportación en segundo plano.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    EXPIRED = "expired"
+
+
+class ExportJob(models.Model):
+    """
+    Modelo que representa una exportación de reportes generada en segundo plano.
+
+    Las solicitudes idénticas de un mismo usuario comparten el trabajo mientras
+    está pendiente o en curso, gracias a la restricción única sobre
+    `params_hash`.
+
+    Attributes:
+        user (ForeignKey): El usuario que solicitó la exportación.
+        kind (str): Tipo de exportación.
+        params (dict): Filtros del reporte.
+        params_hash (str): Hash del usuario, el tipo y los filtros.
+        state (str): Estado del trabajo.
+        progress (int): Cantidad de filas escritas.
+        total (int): Cantidad total de filas a escribir.
+        file (FileField): Archivo generado, dentro de `MEDIA_ROOT`.
+        error (str): Mensaje de error si el trabajo falló.
+        created_at (datetime): Fecha de la solicitud.
+        finished_at (datetime): Fecha en que terminó el trabajo.
+        expires_at (datetime): Fecha a partir de la cual se elimina el archivo.
+    """
+
+    ACTIVE_STATES = [ExportJobStates.PENDING.value, ExportJobStates.RUNNING.value]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=30)
+    params = models.JSONField(default=dict)
+    params_hash = models.CharField(max_length=64)
+    state = models.CharField(
+        max_length=10,
+        choices=[
+            (ExportJobStates.PENDING.value, "Pendiente"),
+            (ExportJobStates.RUNNING.value, "En curso"),
+            (ExportJobStates.DONE.value, "Terminado"),
+            (ExportJobStates.FAILED.value, "Fallido"),
+            (ExportJobStates.EXPIRED.value, "Expirado"),
+        ],
+        default=ExportJobStates.PENDING.value,
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["params_hash"],
+                condition=Q(state__in=["pending", "running"]),
+                name="exportjob_active_params_uniq",
+            )
+        ]
+        indexes = [models.Index(fields=["state", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.state})"
@@ -0,0 +1,236 @@
+import base64
+import json
+
+from django.db.models import BooleanField, F, Func, Value
+
+
+DEFAULT_PAGE_SIZE = 12
+
+
+class KeysetPage:
+    """
+    Página de resultados obtenida con paginación por cursor.
+
+    Attributes:
+        object_list (list): Objetos de la página.
+        next_cursor (str | None): Cursor opaco para pedir la siguiente página.
+    """
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def encode_cursor(value, pk):
+    """
+    Codifica la posición de un objeto en un cursor opaco.
+
+    Args:
+        value: Valor del campo de ordenamiento del último objeto de la página.
+        pk (int): ID del último objeto de la página.
+
+    Returns:
+        str: El cursor codificado en base64.
+    """
+
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+
+    payload = json.dumps({"v": value, "id": pk}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model_field):
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Args:
+        cursor (str): El cursor recibido en la query string.
+        model_field (Field): Campo del modelo usado para ordenar.
+
+    Returns:
+        tuple | None: (valor, id) o None si el cursor no es válido.
+    """
+
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        value = payload["v"]
+        pk = int(payload["id"])
+        if value is not None:
+            value = model_field.to_python(value)
+    except (ValueError, TypeError, KeyError, json.JSONDecodeError):
+        return None
+
+    return value, pk
+
+
+def get_order_field(queryset, field_name):
+    """
+    Obtiene el campo usado para ordenar, sea del modelo o una anotación.
+
+    Args:
+        queryset (QuerySet): Queryset a paginar.
+        field_name (str): Nombre del campo o de la anotación.
+
+    Returns:
+        Field: El campo, usado para convertir el valor guardado en el cursor.
+    """
+
+    if field_name in queryset.query.annotations:
+        return queryset.query.annotations[field_name].output_field
+
+    return queryset.model._meta.get_field(field_name)
+
+
+class RowComparison(Func):
+    """
+    Comparación de filas de SQL, por ejemplo `(published_at, id) < (%s, %s)`.
+
+    A diferencia de la condición equivalente escrita con `OR`, PostgreSQL la
+    resuelve como un rango de un índice sobre las mismas columnas.
+    """
+
+    output_field = BooleanField()
+
+    def __init__(self, lhs, operator, rhs):
+        self.operator = operator
+        self.size = len(lhs)
+        super().__init__(*lhs, *rhs)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sqls, params = [], []
+        for expression in self.get_source_expressions():
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+
+        lhs = ", ".join(sqls[: self.size])
+        rhs = ", ".join(sqls[self.size :])
+        return f"({lhs}) {self.operator} ({rhs})", params
+
+
+def keyset_segments(queryset, order_by, position=None):
+    """
+    Obtiene las consultas que recorren un queryset a partir de una posición.
+
+    Si el campo de ordenamiento admite nulos, los objetos con valor y los
+    nulos se recorren en consultas separadas, cada una resuelta con un rango
+    del índice `(campo DESC NULLS LAST, id DESC)`: los nulos van al final en
+    orden descendente y al principio en orden ascendente, igual que al
+    recorrer ese índice en cada sentido.
+
+    Args:
+        queryset (QuerySet): Queryset a paginar.
+        order_by (str): Campo o anotación de ordenamiento, con prefijo "-" para
+            descendente.
+        position (tuple, optional): `(valor, id)` del último objeto entregado.
+
+    Returns:
+        list[QuerySet]: Las consultas, en el orden en que se recorren.
+    """
+
+    descending = order_by.startswith("-")
+    field_name = order_by.lstrip("-")
+    pk_order = "-pk" if descending else "pk"
+    pk_lookup = "pk__lt" if descending else "pk__gt"
+
+    if field_name in ("id", "pk"):
+        queryset = queryset.order_by(pk_order)
+        if position is not None:
+            queryset = queryset.filter(**{pk_lookup: position[1]})
+        return [queryset]
+
+    field = F(field_name)
+    nullable = getattr(get_order_field(queryset, field_name), "null", False)
+
+    values = queryset
+    if nullable:
+        # El orden de los nulos debe coincidir con el del índice aunque se
+        # excluyan, o PostgreSQL vuelve a ordenar las filas
+        values = values.filter(**{f"{field_name}__isnull": False})
+        ordering = (
+            field.desc(nulls_last=True) if descending else field.asc(nulls_first=True)
+        )
+    else:
+        ordering = field.desc() if descending else field.asc()
+    values = values.order_by(ordering, pk_order)
+    if position is not None and position[0] is not None:
+        values = values.filter(
+            RowComparison(
+                [field, F("pk")],
+                "<" if descending else ">",
+                [Value(position[0]), Value(position[1])],
+            )
+        )
+
+    if not nullable:
+        return [values]
+
+    nulls = queryset.filter(**{f"{field_name}__isnull": True}).order_by(pk_order)
+    if position is not None and position[0] is None:
+        nulls = nulls.filter(**{pk_lookup: position[1]})
+
+    segments = [values, nulls] if descending else [nulls, values]
+
+    # Un cursor con valor nulo indica que ya se recorrieron los no nulos en
+    # orden descendente, y uno con valor que ya se recorrieron los nulos en
+    # orden ascendente
+    if position is not None and (position[0] is None) == descending:
+        segments = segments[1:]
+
+    return segments
+
+
+def paginate_keyset(queryset, order_by, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Pagina un queryset por cursor sobre `(order_by, id)`.
+
+    A diferencia de la paginación por offset, cada página se obtiene con una
+    condición sobre la posición del último objeto entregado, por lo que el
+    costo de la consulta no depende de cuántas páginas se hayan recorrido.
+    Los valores nulos del campo de ordenamiento se ubican al final en orden
+    descendente y al principio en orden ascendente.
+
+    Args:
+        queryset (QuerySet): Queryset a paginar.
+        order_by (str): Campo o anotación de ordenamiento, con prefijo "-" para
+            descendente.
+        cursor (str, optional): Cursor de la página anterior.
+        page_size (int, optional): Cantidad de objetos por página.
+
+    Returns:
+        KeysetPage: La página de resultados.
+    """
+
+    field_name = order_by.lstrip("-")
+    model_field = get_order_field(queryset, field_name)
+    position = decode_cursor(cursor, model_field) if cursor else None
+
+    # Se pide un objeto extra para saber si existe una página siguiente
+    object_list = []
+    for segment in keyset_segments(queryset, order_by, position):
+        object_list.extend(segment[: page_size + 1 - len(object_list)])
+        if len(object_list) > page_size:
+            break
+
+    next_cursor = None
+    if len(object_list) > page_size:
+        object_list = object_list[:page_size]
+        last = object_list[-1]
+        next_cursor = encode_cursor(getattr(last, field_name), last.pk)
+
+    return KeysetPage(object_list=object_list, next_cursor=next_cursor)
@@ -0,0 +1,34 @@
+import mistune
+import nh3
+
+
+# Versión del proceso de renderizado de markdown. Incrementarla al cambiar
+# `render_markdown` hace que las revisiones se vuelvan a renderizar.
+RENDER_PIPELINE_VERSION = 1
+
+# Atributos permitidos en el HTML renderizado, además de los de nh3
+RENDERED_ATTRIBUTES = {
+    **{tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()},
+    "code": {"class"},
+}
+
+
+def render_markdown(body):
+    """
+    Convierte el markdown de un contenido a HTML sanitizado.
+
+    Este módulo no depende de Django para que el renderizado pueda ejecutarse
+    en procesos separados.
+
+    params:
+        body -- Contenido en markdown.
+
+    return:
+        HTML seguro para mostrar sin escapar.
+    """
+
+    return nh3.clean(
+        mistune.html(str(body or "")),
+        attributes=RENDERED_ATTRIBUTES,
+        link_rel="noopener noreferrer",
+    )
@@ -0,0 +1,575 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Length, TruncDate
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from article.models import Payment, SalesDaily
+
+
+# Medio de pago mostrado en los reportes (todos los pagos se hacen con Stripe)
+PAYMENT_METHOD = "Tarjeta de crédito"
+
+# Rangos de fechas predefinidos de los reportes
+DATE_RANGES = {
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "365d": timedelta(days=365),
+}
+
+EXPORT_HEADERS = ["Categoría", "Comprador", "Costo", "Fecha y Hora", "Medio de Pago"]
+EXPORT_TOTAL_LABEL = "Total de Ganancias"
+EXPORT_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+EXPORT_CHUNK_SIZE = 2000
+
+PURCHASES_HEADERS = ["Categoría", "Medio de pago", "Precio", "Compradores (Fecha y Hora)"]
+PURCHASES_TOTAL_LABEL = "Total gastado"
+
+
+def format_purchase(purchase):
+    """
+    Describe una compra para la lista de compradores de una categoría.
+
+    Args:
+        purchase (dict): Fila con `user__username`, `price` y `date_paid`.
+
+    Returns:
+        str: La descripción de la compra.
+    """
+
+    return (
+        f"{purchase['user__username']} - Costo: ${purchase['price'] or 0:.2f} "
+        f"(Fecha: {purchase['date_paid'].strftime('%Y-%m-%d')} "
+        f"Hora: {purchase['date_paid'].strftime('%H:%M:%S')})"
+    )
+
+
+def parse_sales_range(date_range, start_date_str=None, end_date_str=None):
+    """
+    Convierte los filtros de fecha de un reporte en un rango de fechas.
+
+    Args:
+        date_range (str): Rango predefinido (`24h`, `7d`, `30d`, `365d` o `all`).
+        start_date_str (str, optional): Primer día, en formato `YYYY-MM-DD`.
+        end_date_str (str, optional): Último día incluido, en formato `YYYY-MM-DD`.
+
+    Returns:
+        tuple: `(since, until)`; `since` es inclusivo, `until` exclusivo y
+            cualquiera puede ser None.
+
+    Raises:
+        ValueError: Si alguna de las fechas no tiene el formato esperado.
+    """
+
+    since = None
+    until = None
+
+    if date_range in DATE_RANGES:
+        since = timezone.now() - DATE_RANGES[date_range]
+
+    if start_date_str and end_date_str:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
+        # El rango incluye el último día completo
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d") + timedelta(days=1)
+        since = timezone.make_aware(start_date)
+        until = timezone.make_aware(end_date)
+
+    return since, until
+
+
+def filter_payments(since=None, until=None, category_name="", username=""):
+    """
+    Obtiene los pagos completados que cumplen los filtros de un reporte.
+
+    Args:
+        since (datetime, optional): Inicio del rango, inclusive.
+        until (datetime, optional): Fin del rango, exclusivo.
+        category_name (str, optional): Nombre de la categoría.
+        username (str, optional): Nombre del comprador.
+
+    Returns:
+        QuerySet: Los pagos filtrados.
+    """
+
+    payments = Payment.objects.filter(status="completed")
+
+    if since is not None:
+        payments = payments.filter(date_paid__gte=since)
+    if until is not None:
+        payments = payments.filter(date_paid__lt=until)
+    if category_name:
+        payments = payments.filter(category__name__iexact=category_name)
+    if username:
+        payments = payments.filter(user__username__iexact=username)
+
+    return payments
+
+
+def filter_purchases(user, since=None, until=None):
+    """
+    Obtiene las compras completadas de un suscriptor en un rango de fechas.
+
+    Args:
+        user (User): El suscriptor.
+        since (datetime, optional): Inicio del rango, inclusive.
+        until (datetime, optional): Fin del rango, exclusivo.
+
+    Returns:
+        QuerySet: Los pagos filtrados.
+    """
+
+    return filter_payments(since, until).filter(user=user)
+
+
+def group_payments(payments):
+    """
+    Agrupa los pagos por categoría y día con una única consulta.
+
+    Args:
+        payments (QuerySet): Pagos completados ya filtrados.
+
+    Returns:
+        QuerySet: Tuplas `(categoría, día, cantidad, ganancias)`.
+    """
+
+    return (
+        payments.annotate(day=TruncDate("date_paid"))
+        .values_list("category__name", "day")
+        .annotate(total_sales=Count("id"), total_earnings=Sum("price"))
+        .order_by()
+    )
+
+
+def start_of_day(date):
+    """
+    Obtiene el inicio de un día en la zona horaria del sitio.
+
+    Args:
+        date (date): El día.
+
+    Returns:
+        datetime: La medianoche de ese día.
+    """
+
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def record_sale(category_id, date_paid, amount):
+    """
+    Suma un pago completado al acumulado diario de su categoría.
+
+    Args:
+        category_id (int): ID de la categoría vendida.
+        date_paid (datetime): Fecha del pago.
+        amount (float): Precio pagado.
+    """
+
+    date = timezone.localdate(date_paid)
+    amount = float(amount or 0)
+
+    # get_or_create resuelve la carrera si otro proceso crea la fila a la vez
+    _, created = SalesDaily.objects.get_or_create(
+        category_id=category_id, date=date, defaults={"count": 1, "revenue": amount}
+    )
+
+    if not created:
+        SalesDaily.objects.filter(category_id=category_id, date=date).update(
+            count=F("count") + 1, revenue=F("revenue") + amount
+        )
+
+
+def complete_payment(payment):
+    """
+    Marca un pago como completado y lo suma al acumulado diario.
+
+    El cambio de estado es condicional, por lo que un pago ya completado (por
+    ejemplo al recargar la página de éxito) no se vuelve a contar.
+
+    Args:
+        payment (Payment): El pago.
+
+    Returns:
+        bool: True si el pago pasó a completado en esta llamada.
+    """
+
+    with transaction.atomic():
+        updated = (
+            Payment.objects.filter(pk=payment.pk)
+            .exclude(status="completed")
+            .update(status="completed")
+        )
+        payment.status = "completed"
+
+        if updated:
+            record_sale(payment.category_id, payment.date_paid, payment.price)
+
+    return bool(updated)
+
+
+def rebuild_sales_rollup(batch_size=1000):
+    """
+    Reconstruye el acumulado diario de ventas a partir de los pagos completados.
+
+    La tabla del acumulado se bloquea contra escrituras durante la
+    reconstrucción, por lo que `record_sale` espera a que termine y suma los
+    pagos nuevos sobre las filas reconstruidas.
+
+    Args:
+        batch_size (int, optional): Cantidad de filas a insertar por consulta.
+
+    Returns:
+        int: Cantidad de filas creadas.
+    """
+
+    rows = (
+        Payment.objects.filter(status="completed")
+        .annotate(day=TruncDate("date_paid"))
+        .values_list("category_id", "day")
+        .annotate(count=Count("id"), revenue=Sum("price"))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        # Los pagos se leen después de tomar el bloqueo, para que no se pierdan
+        # ni se cuenten dos veces los que se completan mientras tanto
+        with connection.cursor() as cursor:
+            table = connection.ops.quote_name(SalesDaily._meta.db_table)
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+
+        SalesDaily.objects.all().delete()
+        created = SalesDaily.objects.bulk_create(
+            [
+                SalesDaily(
+                    category_id=category_id,
+                    date=day,
+                    count=count,
+                    revenue=revenue or 0,
+                )
+                for category_id, day, count, revenue in rows
+            ],
+            batch_size=batch_size,
+        )
+
+    return len(created)
+
+
+def sales_rows(category_name="", since=None, until=None):
+    """
+    Obtiene las ventas por categoría y día de un rango de fechas.
+
+    Los días completos anteriores a hoy se leen del acumulado diario; solo el
+    día de hoy y los días cubiertos parcialmente por el rango se calculan
+    sobre los pagos.
+
+    Args:
+        category_name (str, optional): Nombre de la categoría a filtrar.
+        since (datetime, optional): Inicio del rango, inclusive.
+        until (datetime, optional): Fin del rango, exclusivo.
+
+    Returns:
+        list[tuple]: Tuplas `(categoría, día, cantidad, ganancias)`.
+    """
+
+    # Días completos del rango que ya están en el acumulado: [first_day, last_day)
+    first_day = None
+    if since is not None:
+        first_day = timezone.localdate(since)
+        if since > start_of_day(first_day):
+            first_day += timedelta(days=1)
+
+    last_day = timezone.localdate()
+    if until is not None:
+        last_day = min(last_day, timezone.localdate(until))
+
+    payments = Payment.objects.filter(status="completed")
+    rollup = SalesDaily.objects.filter(date__lt=last_day)
+
+    if since is not None:
+        payments = payments.filter(date_paid__gte=since)
+        rollup = rollup.filter(date__gte=first_day)
+    if until is not None:
+        payments = payments.filter(date_paid__lt=until)
+    if category_name:
+        payments = payments.filter(category__name__iexact=category_name)
+        rollup = rollup.filter(category__name__iexact=category_name)
+
+    if first_day is None or first_day < last_day:
+        covered = {"date_paid__lt": start_of_day(last_day)}
+        if first_day is not None:
+            covered["date_paid__gte"] = start_of_day(first_day)
+        payments = payments.exclude(**covered)
+    else:
+        rollup = rollup.none()
+
+    return list(
+        rollup.values_list("category__name", "date", "count", "revenue")
+    ) + list(group_payments(payments))
+
+
+def build_sales_report(payments, rows=None, include_purchases=True):
+    """
+    Calcula los datos del reporte de categorías vendidas.
+
+    Los totales salen de una única consulta agrupada por categoría y día (o de
+    las filas indicadas) y las compras de una sola consulta; el resto se arma
+    en Python. La cantidad de consultas no depende de la cantidad de
+    categorías ni de días.
+
+    Args:
+        payments (QuerySet): Pagos completados ya filtrados.
+        rows (list[tuple], optional): Tuplas `(categoría, día, cantidad,
+            ganancias)` ya calculadas, por ejemplo con `sales_rows`.
+        include_purchases (bool, optional): Si se consultan las compras
+            individuales para las listas de compradores.
+
+    Returns:
+        dict: Los datos de los gráficos y tablas del reporte.
+    """
+
+    if rows is None:
+        rows = group_payments(payments)
+
+    sales_by_category = defaultdict(int)
+    earnings_by_category = defaultdict(float)
+    earnings_by_date = defaultdict(float)
+    earnings_by_category_date = defaultdict(float)
+
+    for category, date, total_sales, total_earnings in rows:
+        earnings = total_earnings or 0
+
+        sales_by_category[category] += total_sales
+        earnings_by_category[category] += earnings
+        earnings_by_date[date] += earnings
+        earnings_by_category_date[category, date] += earnings
+
+    categories = sorted(
+        sales_by_category, key=lambda name: (-sales_by_category[name], name)
+    )
+    dates = sorted(earnings_by_date)
+    date_labels = [date.strftime("%Y-%m-%d") for date in dates]
+
+    purchases = []
+    if include_purchases:
+        purchases = payments.values(
+            "category__name", "user__username", "price", "date_paid"
+        ).order_by("date_paid", "id")
+
+    purchases_by_category = defaultdict(list)
+    for purchase in purchases:
+        purchases_by_category[purchase["category__name"]].append(purchase)
+
+    buyers_per_category = {
+        category: [
+            format_purchase(purchase) for purchase in purchases_by_category[category]
+        ]
+        for category in categories
+    }
+
+    return {
+        "categories": categories,
+        "sales": [sales_by_category[category] for category in categories],
+        "earnings": [earnings_by_category[category] for category in categories],
+        "dates": date_labels,
+        "total_earnings_by_date": [earnings_by_date[date] for date in dates],
+        "buyers_per_category": buyers_per_category,
+        "category_data": [
+            (
+                category,
+                sales_by_category[category],
+                earnings_by_category[category],
+                buyers_per_category[category],
+                PAYMENT_METHOD,
+            )
+            for category in categories
+        ],
+        "category_sales_by_date": {
+            category: [
+                earnings_by_category_date.get((category, date), 0) for date in dates
+            ]
+            for category in categories
+        },
+        "detailed_category_data": [
+            {
+                "category": category,
+                "buyer": purchase["user__username"],
+                "cost": purchase["price"],
+                "datetime": purchase["date_paid"].strftime("%Y-%m-%d %H:%M:%S"),
+                "medio_pago": PAYMENT_METHOD,
+            }
+            for category in categories
+            for purchase in purchases_by_category[category]
+        ],
+        "total_general": sum(earnings_by_category.values()),
+    }
+
+
+def export_column_widths(payments):
+    """
+    Calcula el ancho de las columnas de la exportación con una única consulta.
+
+    En el modo de solo escritura de openpyxl las columnas se escriben antes
+    que las filas, por lo que los anchos se obtienen de la base de datos en
+    lugar de recorrer las celdas.
+
+    Args:
+        payments (QuerySet): Pagos a exportar.
+
+    Returns:
+        list[int]: El ancho de cada columna.
+    """
+
+    stats = payments.aggregate(
+        max_category=Max(Length("category__name")),
+        max_buyer=Max(Length("user__username")),
+        max_price=Max("price"),
+        total_price=Sum("price"),
+    )
+    costs = (f"${stats['max_price'] or 0:.2f}", f"${stats['total_price'] or 0:.2f}")
+
+    return [
+        max(
+            len(EXPORT_HEADERS[0]), len(EXPORT_TOTAL_LABEL), stats["max_category"] or 0
+        ),
+        max(len(EXPORT_HEADERS[1]), stats["max_buyer"] or 0),
+        max(len(EXPORT_HEADERS[2]), *(len(cost) for cost in costs)),
+        max(len(EXPORT_HEADERS[3]), len(EXPORT_DATETIME_FORMAT) + 2),
+        max(len(EXPORT_HEADERS[4]), len(PAYMENT_METHOD)),
+    ]
+
+
+def write_sales_xlsx(payments, file, progress=None):
+    """
+    Escribe el detalle de ventas en un archivo Excel.
+
+    Los pagos se recorren una sola vez con un cursor y el libro se escribe en
+    modo de solo escritura, por lo que la memoria usada no depende de la
+    cantidad de filas.
+
+    Args:
+        payments (QuerySet): Pagos a exportar.
+        file (file): Archivo binario donde se guarda el libro.
+        progress (callable, optional): Función llamada con la cantidad de
+            pagos escritos después de cada bloque.
+
+    Returns:
+        int: Cantidad de pagos exportados.
+    """
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Ventas por Categoría")
+
+    for index, width in enumerate(export_column_widths(payments), start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+
+    sheet.append(EXPORT_HEADERS)
+
+    rows = payments.order_by("category__name", "date_paid", "id").values_list(
+        "category__name", "user__username", "price", "date_paid"
+    )
+
+    exported = 0
+    total_earnings = 0
+
+    for category, buyer, price, date_paid in rows.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        price = price or 0
+        total_earnings += price
+        exported += 1
+
+        sheet.append(
+            [
+                category,
+                buyer,
+                f"${price:.2f}",
+                timezone.localtime(date_paid).strftime(EXPORT_DATETIME_FORMAT),
+                PAYMENT_METHOD,
+            ]
+        )
+
+        if progress is not None and exported % EXPORT_CHUNK_SIZE == 0:
+            progress(exported)
+
+    sheet.append([])
+    sheet.append([EXPORT_TOTAL_LABEL, "", f"${total_earnings:.2f}"])
+
+    workbook.save(file)
+    return exported
+
+
+def write_purchases_xlsx(payments, file, progress=None):
+    """
+    Escribe en un archivo Excel las compras de un suscriptor.
+
+    Al igual que `write_sales_xlsx`, recorre los pagos una sola vez con un
+    cursor y escribe el libro en modo de solo escritura.
+
+    Args:
+        payments (QuerySet): Pagos del suscriptor a exportar.
+        file (file): Archivo binario donde se guarda el libro.
+        progress (callable, optional): Función llamada con la cantidad de
+            pagos escritos después de cada bloque.
+
+    Returns:
+        int: Cantidad de pagos exportados.
+    """
+
+    stats = payments.aggregate(
+        max_category=Max(Length("category__name")),
+        max_price=Max("price"),
+        total_price=Sum("price"),
+    )
+    costs = (f"${stats['max_price'] or 0:.2f}", f"${stats['total_price'] or 0:.2f}")
+    widths = [
+        max(
+            len(PURCHASES_HEADERS[0]),
+            len(PURCHASES_TOTAL_LABEL),
+            stats["max_category"] or 0,
+        ),
+        max(len(PURCHASES_HEADERS[1]), *(len(cost) for cost in costs)),
+        max(len(PURCHASES_HEADERS[2]), *(len(cost) for cost in costs)),
+        max(len(PURCHASES_HEADERS[3]), len(EXPORT_DATETIME_FORMAT) + 2),
+    ]
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Compras por categoría")
+
+    for index, width in enumerate(widths, start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+
+    sheet.append(PURCHASES_HEADERS)
+
+    rows = payments.order_by("date_paid", "id").values_list(
+        "category__name", "price", "date_paid"
+    )
+
+    exported = 0
+    total_spent = 0
+
+    for category, price, date_paid in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        price = price or 0
+        total_spent += price
+        exported += 1
+
+        sheet.append(
+            [
+                category,
+                "Tarjeta",
+                f"${price:.2f}",
+                timezone.localtime(date_paid).strftime(EXPORT_DATETIME_FORMAT),
+            ]
+        )
+
+        if progress is not None and exported % EXPORT_CHUNK_SIZE == 0:
+            progress(exported)
+
+    sheet.append([])
+    sheet.append([PURCHASES_TOTAL_LABEL, f"${total_spent:.2f}"])
+
+    workbook.save(file)
+    return exported
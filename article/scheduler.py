@@ -0,0 +1,287 @@
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from article.cron import next_publication_at, publish_schedule_articles
+from article.models import reconcile_rating_aggregates
+from article.sales import rebuild_sales_rollup
+from notification.utils import OUTBOX_BATCH_SIZE, drain_outbox
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULER_SETTINGS = {
+    # Espera mínima y máxima entre revisiones de publicaciones programadas;
+    # la espera se duplica mientras no aparecen programaciones nuevas
+    "PUBLISH_MIN_POLL": 1,
+    "PUBLISH_MAX_POLL": 30,
+    # Segundos entre envíos de la bandeja de salida
+    "OUTBOX_INTERVAL": 5,
+    # Segundos entre recálculos de los agregados de calificación
+    "RATINGS_INTERVAL": 60 * 60,
+    # Segundos entre reconstrucciones del acumulado diario de ventas
+    "SALES_ROLLUP_INTERVAL": 60 * 60 * 24,
+}
+
+
+def get_scheduler_settings():
+    """
+    Obtiene la configuración del planificador, combinando `SCHEDULER` con los
+    valores por defecto.
+
+    Returns:
+        dict: La configuración.
+    """
+
+    return {**DEFAULT_SCHEDULER_SETTINGS, **getattr(settings, "SCHEDULER", {})}
+
+
+class ScheduledJob:
+    """
+    Tarea que el planificador ejecuta cada `interval` segundos.
+
+    Args:
+        name (str): Nombre de la tarea, usado en los registros y las métricas.
+        func (callable): Función a ejecutar.
+        interval (float): Segundos entre ejecuciones.
+    """
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+
+    def run(self):
+        return self.func()
+
+    def next_delay(self, result):
+        """
+        Calcula los segundos hasta la próxima ejecución.
+
+        Args:
+            result: Lo que devolvió la última ejecución, o None si falló.
+
+        Returns:
+            float: Los segundos de espera.
+        """
+
+        return self.interval
+
+
+class PublishArticlesJob(ScheduledJob):
+    """
+    Publica los artículos programados y se vuelve a ejecutar justo en la
+    fecha de la próxima publicación.
+
+    Mientras la próxima fecha no cambia, la espera entre revisiones se
+    duplica desde `min_poll` hasta `max_poll` segundos, para tomar las
+    programaciones nuevas sin consultar la base de datos constantemente.
+    """
+
+    def __init__(self, min_poll, max_poll):
+        super().__init__("publish_articles", publish_schedule_articles, min_poll)
+        self.min_poll = min_poll
+        self.max_poll = max_poll
+        self._next_at = None
+
+    def next_delay(self, result):
+        next_at = next_publication_at()
+
+        if result or next_at != self._next_at:
+            self.interval = self.min_poll
+        else:
+            self.interval = min(self.interval * 2, self.max_poll)
+        self._next_at = next_at
+
+        if next_at is None:
+            return self.interval
+
+        # Si la próxima ya venció otro proceso la está publicando
+        delay = (next_at - timezone.now()).total_seconds()
+        return min(self.interval, delay) if delay > 0 else self.interval
+
+
+def drain_all_outbox():
+    """
+    Envía los correos pendientes de la bandeja de salida, lote por lote.
+
+    Returns:
+        int: Cantidad de correos enviados.
+    """
+
+    sent = 0
+
+    while True:
+        result = drain_outbox()
+        sent += result["sent"]
+
+        if sum(result.values()) < OUTBOX_BATCH_SIZE:
+            return sent
+
+
+def default_jobs():
+    """
+    Construye las tareas del planificador según la configuración.
+
+    Returns:
+        list[ScheduledJob]: Las tareas.
+    """
+
+    config = get_scheduler_settings()
+
+    return [
+        PublishArticlesJob(config["PUBLISH_MIN_POLL"], config["PUBLISH_MAX_POLL"]),
+        ScheduledJob("drain_outbox", drain_all_outbox, config["OUTBOX_INTERVAL"]),
+        ScheduledJob(
+            "reconcile_ratings",
+            reconcile_rating_aggregates,
+            config["RATINGS_INTERVAL"],
+        ),
+        ScheduledJob(
+            "rebuild_sales_rollup",
+            rebuild_sales_rollup,
+            config["SALES_ROLLUP_INTERVAL"],
+        ),
+    ]
+
+
+class JobMetrics:
+    """
+    Cantidad de ejecuciones, fallos y duración de una tarea.
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_duration = 0.0
+
+    def record(self, duration, ok=True):
+        self.runs += 1
+        self.failures += 0 if ok else 1
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.last_duration = duration
+
+    def snapshot(self):
+        """
+        Obtiene el estado actual de las métricas.
+
+        Returns:
+            dict: Contadores y duraciones (promedio, máxima y última) en milisegundos.
+        """
+
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "avg_ms": round(self.total_duration / self.runs * 1000, 2)
+            if self.runs
+            else 0.0,
+            "max_ms": round(self.max_duration * 1000, 2),
+            "last_ms": round(self.last_duration * 1000, 2),
+        }
+
+
+class Scheduler:
+    """
+    Ejecuta tareas periódicas dentro de un único proceso.
+
+    Las tareas se guardan en un heap ordenado por la próxima ejecución y el
+    proceso duerme hasta que vence la primera, por lo que Django se carga una
+    sola vez y cada tarea corre en el momento indicado en lugar de esperar al
+    siguiente minuto.
+
+    Args:
+        jobs (list[ScheduledJob]): Las tareas a ejecutar.
+    """
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.metrics = {job.name: JobMetrics() for job in jobs}
+        self._stop = threading.Event()
+
+        now = time.monotonic()
+        self._heap = [(now, index, job) for index, job in enumerate(jobs)]
+        heapq.heapify(self._heap)
+
+    def run_job(self, job):
+        """
+        Ejecuta una tarea y registra su duración.
+
+        Args:
+            job (ScheduledJob): La tarea.
+
+        Returns:
+            El resultado de la tarea, o None si falló.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            result = job.run()
+        except Exception:
+            logger.exception("La tarea %s falló", job.name)
+            self.metrics[job.name].record(time.perf_counter() - start, ok=False)
+            return None
+
+        duration = time.perf_counter() - start
+        self.metrics[job.name].record(duration)
+
+        if result:
+            logger.info("Tarea %s: %s en %.3f s", job.name, result, duration)
+
+        return result
+
+    def run_pending(self):
+        """
+        Ejecuta las tareas vencidas y las vuelve a programar.
+
+        Returns:
+            float | None: Segundos hasta la próxima tarea, o None si no hay tareas.
+        """
+
+        # Solo se ejecutan las tareas vencidas al comenzar, para que una tarea
+        # sin espera no impida volver al ciclo principal
+        now = time.monotonic()
+
+        while self._heap and self._heap[0][0] <= now and not self._stop.is_set():
+            _, index, job = heapq.heappop(self._heap)
+            result = self.run_job(job)
+
+            try:
+                delay = job.next_delay(result)
+            except Exception:
+                logger.exception("No se pudo programar la tarea %s", job.name)
+                delay = job.interval
+
+            heapq.heappush(self._heap, (time.monotonic() + delay, index, job))
+
+        return max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else None
+
+    def run(self):
+        """
+        Ejecuta las tareas hasta que se llame a `stop`.
+        """
+
+        while not self._stop.is_set():
+            # El proceso vive indefinidamente: se descartan las conexiones a
+            # la base de datos caídas o vencidas antes de cada ronda de tareas
+            close_old_connections()
+            delay = self.run_pending()
+            if delay is None:
+                break
+
+            self._stop.wait(delay)
+
+    def stop(self):
+        """
+        Detiene el planificador al terminar la tarea en curso.
+        """
+
+        self._stop.set()
@@ -0,0 +1,277 @@
+import hashlib
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+    TrigramWordSimilarity,
+)
+from django.core.cache import cache
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from taggit.models import Tag, TaggedItem
+
+from article.cache import bump_version, get_shared_cache, get_version
+from article.models import Article, ArticleContent, ArticleStates, CategoryType
+
+
+# Configuración de búsqueda de texto de PostgreSQL (stemming en español)
+SEARCH_CONFIG = "spanish"
+
+# Marcadores usados por ts_headline, reemplazados luego por <mark> ya escapado
+HEADLINE_START = "\ue000"
+HEADLINE_STOP = "\ue001"
+
+# Autocompletado de etiquetas y títulos
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_PREFIX = 50
+AUTOCOMPLETE_TIMEOUT = 60 * 60
+AUTOCOMPLETE_VERSION_KEY = "article:autocomplete:version"
+
+
+def text_or_empty(expression):
+    """
+    Reemplaza los valores nulos de una expresión por un texto vacío.
+    """
+
+    return Coalesce(expression, Value(""), output_field=TextField())
+
+
+def search_vector_expression():
+    """
+    Expresión que calcula el vector de búsqueda de un artículo.
+
+    Los pesos priorizan el título (A), luego las etiquetas (B), la descripción
+    (C) y por último el cuerpo de la revisión actual (D).
+
+    Returns:
+        CombinedExpression: Expresión para usar en `Article.objects.update()`.
+    """
+
+    tags = (
+        TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id=OuterRef("pk"),
+        )
+        .order_by()
+        .values("object_id")
+        .annotate(names=StringAgg("tag__name", delimiter=" "))
+        .values("names")
+    )
+    body = ArticleContent.objects.filter(pk=OuterRef("current_content_id")).values(
+        "body"
+    )
+
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(text_or_empty(Subquery(tags)), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(text_or_empty("description"), weight="C", config=SEARCH_CONFIG)
+        + SearchVector(text_or_empty(Subquery(body)), weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vector(article_ids):
+    """
+    Recalcula el vector de búsqueda de los artículos indicados con una única
+    consulta.
+
+    Args:
+        article_ids (Iterable[int]): IDs de los artículos a actualizar.
+    """
+
+    article_ids = list(article_ids)
+    if not article_ids:
+        return
+
+    Article.objects.filter(pk__in=article_ids).update(
+        search_vector=search_vector_expression()
+    )
+
+
+def search_articles(queryset, query):
+    """
+    Filtra un queryset de artículos por un término de búsqueda.
+
+    Se usa el índice de texto completo junto con la similitud trigram del
+    título, y se anotan `search_rank` y `search_headline`.
+
+    Args:
+        queryset (QuerySet): Queryset de `Article`.
+        query (str): Término de búsqueda ingresado por el usuario.
+
+    Returns:
+        QuerySet: El queryset filtrado y anotado con `search_rank`.
+    """
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+
+    # La similitud trigram del título tolera errores de tipeo que el índice
+    # de texto completo no encuentra. El rango se convierte a double
+    # precision: el real que devuelve PostgreSQL no se recupera exacto desde
+    # el valor guardado en el cursor de la paginación
+    return queryset.filter(
+        Q(search_vector=search_query) | Q(title__trigram_word_similar=query)
+    ).annotate(
+        search_rank=Cast(
+            SearchRank(F("search_vector"), search_query)
+            + TrigramWordSimilarity(query, "title"),
+            FloatField(),
+        ),
+        search_headline=SearchHeadline(
+            "excerpt",
+            search_query,
+            config=SEARCH_CONFIG,
+            start_sel=HEADLINE_START,
+            stop_sel=HEADLINE_STOP,
+            max_words=35,
+            min_words=15,
+        ),
+    )
+
+
+def render_headline(headline):
+    """
+    Escapa un fragmento devuelto por ts_headline y resalta las coincidencias.
+
+    Args:
+        headline (str): Fragmento con los marcadores de inicio y fin.
+
+    Returns:
+        SafeString: El fragmento listo para la plantilla.
+    """
+
+    return mark_safe(
+        escape(headline)
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+def filter_by_tag(queryset, name):
+    """
+    Filtra un queryset de artículos por una etiqueta, tolerando errores de tipeo.
+
+    Si existe una etiqueta con ese nombre se usa solo esa; en caso contrario,
+    se usan las etiquetas con nombre similar por trigramas.
+
+    Args:
+        queryset (QuerySet): Queryset de `Article`.
+        name (str): Nombre de la etiqueta ingresado por el usuario.
+
+    Returns:
+        QuerySet: El queryset filtrado.
+    """
+
+    tags = Tag.objects.filter(name__iexact=name)
+
+    if not tags.exists():
+        tags = Tag.objects.filter(name__trigram_similar=name)
+
+    return queryset.filter(tags__in=tags).distinct()
+
+
+def get_autocomplete_version():
+    """
+    Obtiene la versión actual de los resultados de autocompletado en caché.
+
+    Returns:
+        str: La versión actual.
+    """
+
+    return get_version(get_shared_cache(), AUTOCOMPLETE_VERSION_KEY)
+
+
+def bump_autocomplete_version():
+    """
+    Invalida los resultados de autocompletado en caché de todos los procesos.
+    """
+
+    bump_version(get_shared_cache(), AUTOCOMPLETE_VERSION_KEY)
+
+
+def _prefix_matches(queryset, field_name, prefix, limit, fuzzy_lookup, similarity):
+    """
+    Obtiene los valores que comienzan con el prefijo y, si no alcanzan el
+    límite, los completa con los más similares por trigramas.
+    """
+
+    values = list(
+        queryset.filter(**{f"{field_name}__istartswith": prefix})
+        .order_by(field_name)
+        .values_list(field_name, flat=True)
+        .distinct()[:limit]
+    )
+
+    if len(values) < limit:
+        values += list(
+            queryset.filter(**{f"{field_name}__{fuzzy_lookup}": prefix})
+            .exclude(**{f"{field_name}__in": values})
+            .annotate(similarity=similarity)
+            .order_by("-similarity", field_name)
+            .values_list(field_name, flat=True)
+            .distinct()[: limit - len(values)]
+        )
+
+    return values
+
+
+def autocomplete(prefix, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Sugiere etiquetas y títulos de artículos publicados para un prefijo.
+
+    Solo se sugieren títulos de categorías gratuitas: las sugerencias son las
+    mismas para todos los usuarios y no deben revelar artículos de pago o de
+    suscripción.
+
+    Los resultados se guardan en caché por prefijo y se invalidan cuando
+    cambian las etiquetas o los artículos publicados.
+
+    Args:
+        prefix (str): Texto ingresado por el usuario.
+        limit (int, optional): Cantidad máxima de sugerencias de cada tipo.
+
+    Returns:
+        dict: Sugerencias bajo las claves `tags` y `titles`.
+    """
+
+    prefix = " ".join(prefix.split()).lower()[:AUTOCOMPLETE_MAX_PREFIX]
+    if not prefix:
+        return {"tags": [], "titles": []}
+
+    digest = hashlib.md5(prefix.encode()).hexdigest()
+    cache_key = f"article:autocomplete:{get_autocomplete_version()}:{limit}:{digest}"
+
+    results = cache.get(cache_key)
+    if results is not None:
+        return results
+
+    results = {
+        "tags": _prefix_matches(
+            Tag.objects.all(),
+            "name",
+            prefix,
+            limit,
+            "trigram_similar",
+            TrigramSimilarity("name", prefix),
+        ),
+        "titles": _prefix_matches(
+            Article.objects.filter(
+                state=ArticleStates.PUBLISHED.value,
+                category__type=CategoryType.FREE.value,
+            ),
+            "title",
+            prefix,
+            limit,
+            "trigram_word_similar",
+            TrigramWordSimilarity(prefix, "title"),
+        ),
+    }
+
+    cache.set(cache_key, results, AUTOCOMPLETE_TIMEOUT)
+    return results
@@ -0,0 +1,141 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from article.cache import bump_content_version
+from article.events import article_event, publish_article_events
+from article.models import Article, ArticleContent, Category
+from article.search import bump_autocomplete_version, update_search_vector
+
+
+# Campos del artículo que forman parte del vector de búsqueda
+SEARCH_FIELDS = {"title", "description"}
+
+# Campos del artículo que afectan las sugerencias de autocompletado
+AUTOCOMPLETE_FIELDS = {"title", "state", "category"}
+
+# Campos del artículo que se muestran en las tarjetas del kanban
+BOARD_FIELDS = {"title", "state", "category", "autor"}
+
+# Campos del artículo que se muestran en las páginas en caché
+PAGE_FIELDS = {
+    "title",
+    "description",
+    "state",
+    "published_at",
+    "is_featured",
+    "category",
+    "autor",
+}
+
+
+@receiver(post_save, sender=Article)
+def update_article_search_vector(sender, instance, created, update_fields, **kwargs):
+    """
+    Recalcula el vector de búsqueda cuando cambia el título o la descripción.
+    """
+
+    if created or update_fields is None or SEARCH_FIELDS & set(update_fields):
+        update_search_vector([instance.pk])
+
+    if update_fields is None or AUTOCOMPLETE_FIELDS & set(update_fields):
+        bump_autocomplete_version()
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_autocomplete(sender, **kwargs):
+    """
+    Invalida las sugerencias de autocompletado al cambiar etiquetas, artículos
+    o categorías.
+    """
+
+    bump_autocomplete_version()
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tags_search_vector(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Recalcula el vector de búsqueda e invalida las cachés cuando se agregan o
+    quitan etiquetas.
+    """
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if isinstance(instance, Article):
+        update_search_vector([instance.pk])
+    elif pk_set:
+        update_search_vector(pk_set)
+
+    bump_autocomplete_version()
+    bump_content_version()
+
+
+@receiver(post_save, sender=Article)
+def invalidate_article_pages(sender, instance, created, update_fields, **kwargs):
+    """
+    Invalida las páginas en caché cuando cambia un artículo publicado o su estado.
+    """
+
+    if created or update_fields is None or PAGE_FIELDS & set(update_fields):
+        bump_content_version()
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_pages(sender, **kwargs):
+    """
+    Invalida las páginas en caché al cambiar categorías o eliminar artículos.
+    """
+
+    bump_content_version()
+
+
+@receiver(post_save, sender=ArticleContent)
+def invalidate_content_pages(sender, instance, created, **kwargs):
+    """
+    Invalida las páginas en caché al crear una nueva revisión de contenido.
+    """
+
+    if created:
+        bump_content_version()
+
+
+@receiver(post_save, sender=Article)
+def broadcast_article_change(sender, instance, created, update_fields, **kwargs):
+    """
+    Envía a los tableros abiertos la creación o el cambio de un artículo.
+    """
+
+    previous_state = instance.__dict__.pop("_previous_state", None)
+
+    if created:
+        publish_article_events([article_event(instance, "created")])
+    elif update_fields is None or BOARD_FIELDS & set(update_fields):
+        publish_article_events(
+            [article_event(instance, "updated", previous_state=previous_state)]
+        )
+
+
+@receiver(post_delete, sender=Article)
+def broadcast_article_delete(sender, instance, **kwargs):
+    """
+    Envía a los tableros abiertos la eliminación de un artículo.
+    """
+
+    # En un borrado en cascada el autor o la categoría pueden ya no existir
+    publish_article_events(
+        [
+            {
+                "type": "article.deleted",
+                "id": instance.pk,
+                "state": instance.state,
+                "autor_id": instance.autor_id,
+            }
+        ]
+    )
@@ -1,7 +1,15 @@
-from django.test import TestCase, Client
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    Client,
+    RequestFactory,
+    override_settings,
+)
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from roles.models import Role
+from roles.permissions import get_permissions_cache
+from roles.tests import MEMORY_SHARED_CACHES
 from roles.utils import PermissionEnum
 from roles.models import Permission
 from article.models import (
@@ -12,14 +20,77 @@ from article.models import (
     ArticleVote,
     ArticleStates,
     ArticlesToPublish,
+    Payment,
+    SalesDaily,
+    ExportJob,
+    ExportJobStates,
+    reconcile_rating_aggregates,
+)
+from notification.models import OutboxEmail
+from article.counters import CounterBuffer, counter_buffer, flush_counters
+from article.cron import next_publication_at, publish_due_articles
+from article.entitlements import get_accessible_category_ids, split_categories
+from article.export_jobs import (
+    claim_export_jobs,
+    expire_export_jobs,
+    request_export_job,
+    run_export_job,
 )
 from article.forms import CategoryForm
+from article.scheduler import PublishArticlesJob, ScheduledJob, Scheduler
+from article.events import LocalEventBroker
+from article.transitions import allowed_targets
+from article.sales import (
+    build_sales_report,
+    complete_payment,
+    rebuild_sales_rollup,
+    sales_rows,
+    start_of_day,
+)
+from article.pagination import keyset_segments, paginate_keyset
+from article.search import search_articles
+from article.views import HOME_ORDER_FIELDS, count_article_view, global_permissions
+from django.db import connection, transaction
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from article.cache import cache_anonymous_page
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO, StringIO
+import gzip
+import os
+import tempfile
+import threading
+import time
+import json
+import openpyxl
 import warnings
+from unittest.mock import patch
 
 
 User = get_user_model()
 
 
+def other_process_caches():
+    """
+    Configuración de cachés de otro proceso: memoria local propia y la caché
+    compartida en común.
+    """
+
+    local = "django.core.cache.backends.locmem.LocMemCache"
+    return {
+        **settings.CACHES,
+        "default": {"BACKEND": local, "LOCATION": "otro-proceso"},
+        "pages": {"BACKEND": local, "LOCATION": "otro-proceso-paginas"},
+    }
+
+
 class HomeViewTest(TestCase):
     """
     Casos de prueba para la vista home
@@ -55,6 +126,44 @@ class HomeViewTest(TestCase):
         self.assertTemplateUsed(response, "article/home.html")
         self.assertNotEqual(len(permisos), 0)
 
+    def test_home_paginacion_por_cursor(self):
+        """
+        El inicio entrega páginas de tamaño fijo y un cursor para la siguiente
+
+        Es correcto sí recorriendo los cursores se obtienen todos los artículos
+        publicados una sola vez y en orden
+        """
+
+        category = Category.objects.create(
+            name="Paginada", description="Paginada", type=CategoryType.FREE.value
+        )
+        published_at = timezone.now()
+        articles = [
+            Article.objects.create(
+                title=f"Artículo {i}",
+                autor=self.user,
+                category=category,
+                state=ArticleStates.PUBLISHED.value,
+                published_at=published_at - timedelta(hours=i // 2),
+            )
+            for i in range(5)
+        ]
+
+        seen = []
+        query = "order_by=published_at&order_direction=desc"
+        with self.settings(HOME_PAGE_SIZE=2):
+            while query:
+                response = self.client.get(f"{reverse('home')}?{query}")
+                page = response.context["normal_articles"]
+                self.assertLessEqual(len(page), 2)
+                seen.extend(article.id for article in page)
+                query = response.context["next_page_query"]
+
+        expected = sorted(
+            articles, key=lambda article: (article.published_at, article.id), reverse=True
+        )
+        self.assertEqual(seen, [article.id for article in expected])
+
     # def test_home_usuario_visitante(self):
     #     """
     #     Sí no es un usuario autenticado, no debe tener permisos
@@ -606,6 +715,8 @@ class PruebasGestionArticulo(TestCase):
 
         self.assertEqual(self.article.shares_number, 0)
 
+        # Los contadores se escriben en lote
+        flush_counters()
         self.article.refresh_from_db()
 
         self.assertEqual(response.status_code, 200)
@@ -785,3 +896,1530 @@ class CategoriasCompradas(TestCase):
         self.assertIn('payments_prices', response.context)
         self.assertIn('categories', response.context)
         self.assertIn('total_general', response.context)
+
+
+class EntitlementsTest(TestCase):
+    """
+    Casos de prueba para la resolución de categorías accesibles por usuario
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.user = User.objects.create_user(
+            username="lector", password="testpassword"
+        )
+
+        self.free_category = Category.objects.create(
+            name="Libre", description="Libre", type=CategoryType.FREE.value
+        )
+        self.suscription_category = Category.objects.create(
+            name="Suscripción",
+            description="Suscripción",
+            type=CategoryType.SUSCRIPTION.value,
+        )
+        self.pay_category = Category.objects.create(
+            name="Pago", description="Pago", type=CategoryType.PAY.value, price=5.0
+        )
+
+    def test_usuario_anonimo_solo_accede_a_categorias_free(self):
+        """
+        Un usuario anónimo solo puede acceder a las categorías gratuitas
+        """
+
+        accessible_ids = get_accessible_category_ids(AnonymousUser())
+
+        self.assertIn(self.free_category.id, accessible_ids)
+        self.assertNotIn(self.suscription_category.id, accessible_ids)
+        self.assertNotIn(self.pay_category.id, accessible_ids)
+
+    def test_categoria_de_pago_requiere_pago_completado(self):
+        """
+        Una categoría de pago solo es accesible con un pago completado
+        """
+
+        Payment.objects.create(
+            user=self.user, category=self.pay_category, status="pending"
+        )
+        permited, not_permited = split_categories(self.user)
+
+        self.assertIn(self.suscription_category, permited)
+        self.assertIn(self.pay_category, not_permited)
+
+        Payment.objects.create(
+            user=self.user, category=self.pay_category, status="completed"
+        )
+        user = User.objects.get(pk=self.user.pk)
+
+        self.assertIn(self.pay_category.id, get_accessible_category_ids(user))
+        self.assertTrue(self.pay_category.has_purchased_category(user))
+
+    def test_resolucion_en_una_sola_consulta(self):
+        """
+        Las categorías accesibles se resuelven con una única consulta
+        """
+
+        with self.assertNumQueries(1):
+            get_accessible_category_ids(self.user)
+            get_accessible_category_ids(self.user)
+
+
+class ContenidoActualArticuloTest(TestCase):
+    """
+    Casos de prueba para el puntero a la revisión actual del artículo
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.user = User.objects.create_user(username="autor", password="testpassword")
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        self.article = Article.objects.create(
+            title="Artículo", autor=self.user, category=self.category
+        )
+
+    def test_nueva_revision_actualiza_contenido_actual(self):
+        """
+        Crear una revisión la marca como el contenido actual del artículo
+        """
+
+        first = ArticleContent.objects.create(
+            article=self.article, body="Primera versión", autor=self.user
+        )
+        second = ArticleContent.objects.create(
+            article=self.article, body="Segunda versión", autor=self.user
+        )
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.current_content, second)
+        self.assertNotEqual(self.article.current_content, first)
+
+    def test_restaurar_revision_desde_historial(self):
+        """
+        Restaurar una revisión desde el historial crea una nueva revisión actual
+        """
+
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+        self.client.login(username="autor", password="testpassword")
+
+        first = ArticleContent.objects.create(
+            article=self.article, body="Primera versión", autor=self.user
+        )
+        ArticleContent.objects.create(
+            article=self.article, body="Segunda versión", autor=self.user
+        )
+
+        self.client.post(
+            reverse("article-update-history", args=[self.article.pk]),
+            {"article_id": self.article.pk, "article_content_id": first.pk},
+        )
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.current_content.body, "Primera versión")
+
+    def test_revision_calcula_portada_extracto_y_palabras(self):
+        """
+        Guardar una revisión calcula la portada, el extracto y la cantidad de palabras
+        """
+
+        ArticleContent.objects.create(
+            article=self.article,
+            body="# Título\n\n![portada](https://example.com/portada.png)\n\nUno dos tres.",
+            autor=self.user,
+        )
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.image_url, "https://example.com/portada.png")
+        self.assertEqual(self.article.excerpt, "Título Uno dos tres.")
+        self.assertEqual(self.article.word_count, 4)
+        self.assertEqual(self.article.reading_time, 1)
+
+    def test_portada_con_varias_imagenes_en_una_linea(self):
+        """
+        La portada es la primera imagen aunque la línea tenga otras imágenes
+        o texto con paréntesis
+        """
+
+        ArticleContent.objects.create(
+            article=self.article,
+            body=(
+                '![a](https://example.com/a.png "Título") y '
+                "![b](https://example.com/b.jpg) (ver foto.jpg)"
+            ),
+            autor=self.user,
+        )
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.image_url, "https://example.com/a.png")
+
+    def test_portada_en_linea_larga(self):
+        """
+        Una línea larga después de la imagen no se incluye en la portada, y una
+        URL demasiado larga se descarta en lugar de fallar al guardar
+        """
+
+        prose = " ".join(["texto (ver foto.jpg)"] * 40)
+        ArticleContent.objects.create(
+            article=self.article,
+            body=f"![a](https://example.com/a.png) {prose}",
+            autor=self.user,
+        )
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.image_url, "https://example.com/a.png")
+
+        long_url = f"https://example.com/{'x' * 500}.png"
+        ArticleContent.objects.create(
+            article=self.article, body=f"![a]({long_url})", autor=self.user
+        )
+
+        self.article.refresh_from_db()
+        self.assertIsNone(self.article.cover_image_url)
+
+
+class AgregadosCalificacionTest(TestCase):
+    """
+    Casos de prueba para los agregados de calificación del artículo
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        self.autor = User.objects.create_user(username="autor", password="testpassword")
+        self.article = Article.objects.create(
+            title="Artículo", autor=self.autor, category=self.category
+        )
+        self.users = [
+            User.objects.create_user(username=f"lector{i}", password="testpassword")
+            for i in range(3)
+        ]
+
+    def test_votos_actualizan_suma_cantidad_e_histograma(self):
+        """
+        Crear, cambiar y eliminar votos mantiene los agregados consistentes
+        """
+
+        ArticleVote.objects.create(user=self.users[0], article=self.article, rating=5)
+        vote = ArticleVote.objects.create(
+            user=self.users[1], article=self.article, rating=2
+        )
+        ArticleVote.objects.create(
+            user=self.users[2], article=self.article, vote=ArticleVote.LIKE
+        )
+
+        vote = ArticleVote.objects.get(pk=vote.pk)
+        vote.rating = 4
+        vote.save()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.rating_sum, 9)
+        self.assertEqual(self.article.rating_count, 2)
+        self.assertEqual(self.article.rating_histogram, [0, 0, 0, 1, 1])
+        self.assertEqual(self.article.avg_rating, 4.5)
+
+        vote.delete()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.rating_sum, 5)
+        self.assertEqual(self.article.rating_count, 1)
+        self.assertEqual(self.article.rating_histogram, [0, 0, 0, 0, 1])
+
+    def test_reconciliar_calificaciones(self):
+        """
+        El comando de reconciliación recalcula los agregados a partir de los votos
+        """
+
+        ArticleVote.objects.create(user=self.users[0], article=self.article, rating=3)
+        Article.objects.filter(pk=self.article.pk).update(
+            rating_sum=0, rating_count=0, rating_3_count=0
+        )
+
+        call_command("reconcile_article_ratings", stdout=StringIO())
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.rating_sum, 3)
+        self.assertEqual(self.article.rating_count, 1)
+        self.assertEqual(self.article.rating_histogram, [0, 0, 1, 0, 0])
+
+    def test_reconciliar_solo_los_desincronizados(self):
+        """
+        La reconciliación solo escribe los artículos cuyos agregados no
+        coinciden con sus votos
+        """
+
+        other = Article.objects.create(
+            title="Otro", autor=self.autor, category=self.category
+        )
+        ArticleVote.objects.create(user=self.users[0], article=self.article, rating=3)
+        ArticleVote.objects.create(user=self.users[1], article=other, rating=5)
+        Article.objects.filter(pk=self.article.pk).update(rating_3_count=0)
+
+        stdout = StringIO()
+        call_command("reconcile_article_ratings", stdout=stdout)
+
+        self.assertIn("1 artículos reconciliados", stdout.getvalue())
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.rating_histogram, [0, 0, 1, 0, 0])
+        self.assertEqual(reconcile_rating_aggregates(), 0)
+
+
+class BusquedaArticulosTest(TestCase):
+    """
+    Casos de prueba para la búsqueda de texto completo de artículos
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.user = User.objects.create_user(username="autor", password="testpassword")
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        cache.clear()
+
+    def crear_articulo(self, title, body, tags=()):
+        """
+        Crea un artículo publicado con su contenido
+        """
+
+        article = Article.objects.create(
+            title=title,
+            autor=self.user,
+            category=self.category,
+            state=ArticleStates.PUBLISHED.value,
+            published_at=timezone.now(),
+        )
+        article.tags.add(*tags)
+        ArticleContent.objects.create(article=article, body=body, autor=self.user)
+        return article
+
+    def test_busqueda_ordena_por_relevancia(self):
+        """
+        Un término en el título pesa más que en el cuerpo, y los resultados
+        incluyen un fragmento resaltado
+        """
+
+        en_cuerpo = self.crear_articulo("Recetas", "Una guía sobre programación en Python.")
+        en_titulo = self.crear_articulo("Programación en Python", "Contenido general.")
+        self.crear_articulo("Jardinería", "Cómo cuidar las plantas.")
+
+        response = self.client.get(reverse("home"), {"search": "programación"})
+        results = list(response.context["all_articles"])
+
+        self.assertEqual(
+            [article.id for article in results], [en_titulo.id, en_cuerpo.id]
+        )
+        self.assertIn("<mark>", results[1].search_snippet)
+
+    def test_etiquetas_actualizan_el_indice(self):
+        """
+        Agregar una etiqueta permite encontrar el artículo por ella
+        """
+
+        article = self.crear_articulo("Sin relación", "Contenido general.")
+        article.tags.add("astronomía")
+
+        response = self.client.get(reverse("home"), {"search": "astronomía"})
+
+        self.assertEqual(
+            [result.id for result in response.context["all_articles"]], [article.id]
+        )
+
+    def test_busqueda_tolera_errores_de_tipeo(self):
+        """
+        Un título con un error de tipeo se encuentra por similitud trigram
+        """
+
+        article = self.crear_articulo("Astronomía para principiantes", "Contenido.")
+
+        response = self.client.get(reverse("home"), {"search": "astronomia principiantez"})
+
+        self.assertIn(article.id, [result.id for result in response.context["all_articles"]])
+
+    def test_paginacion_por_relevancia_con_empates(self):
+        """
+        Los resultados con la misma relevancia se recorren completos, sin
+        repetir ni perder artículos entre páginas
+        """
+
+        articles = [
+            self.crear_articulo(f"Artículo {i}", "El gato negro duerme.")
+            for i in range(30)
+        ]
+        queryset = search_articles(Article.objects.all(), "gato negro")
+
+        seen, cursor = [], None
+        while True:
+            page = paginate_keyset(queryset, "-search_rank", cursor, page_size=7)
+            seen += [article.id for article in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(sorted(seen), sorted(article.id for article in articles))
+
+    def test_autocompletado_por_prefijo(self):
+        """
+        El autocompletado sugiere etiquetas y títulos por prefijo y se invalida
+        al agregar etiquetas
+        """
+
+        article = self.crear_articulo("Python avanzado", "Contenido.", tags=["python"])
+
+        response = self.client.get(reverse("article-autocomplete"), {"q": "Pyt"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tags"], ["python"])
+        self.assertEqual(response.json()["titles"], ["Python avanzado"])
+
+        article.tags.add("pytest")
+        response = self.client.get(reverse("article-autocomplete"), {"q": "pyt"})
+
+        self.assertEqual(response.json()["tags"], ["pytest", "python"])
+
+    def test_autocompletado_oculta_titulos_de_pago(self):
+        """
+        El autocompletado no sugiere títulos de categorías de pago o de
+        suscripción
+        """
+
+        self.crear_articulo("Python gratuito", "Contenido.")
+        for category_type in (CategoryType.PAY.value, CategoryType.SUSCRIPTION.value):
+            article = self.crear_articulo(f"Python {category_type}", "Contenido.")
+            article.category = Category.objects.create(
+                name=category_type, description=category_type, type=category_type
+            )
+            article.save()
+
+        response = self.client.get(reverse("article-autocomplete"), {"q": "python"})
+
+        self.assertEqual(response.json()["titles"], ["Python gratuito"])
+
+
+class PaginacionKeysetTest(TestCase):
+    """
+    Casos de prueba para la paginación por cursor
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        user = User.objects.create_user(username="paginador", password="testpassword")
+        self.category = Category.objects.create(
+            name="Cursor", description="Cursor", type=CategoryType.FREE.value
+        )
+        now = timezone.now()
+        self.articles = [
+            Article.objects.create(
+                title=f"Artículo {i}",
+                autor=user,
+                category=self.category,
+                state=ArticleStates.PUBLISHED.value,
+                published_at=None if i % 3 == 0 else now - timedelta(hours=i // 2),
+            )
+            for i in range(7)
+        ]
+
+    def walk(self, order_by):
+        queryset = Article.objects.filter(state=ArticleStates.PUBLISHED.value)
+        seen, cursor = [], None
+
+        while True:
+            page = paginate_keyset(queryset, order_by, cursor=cursor, page_size=2)
+            seen.extend(article.pk for article in page)
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_recorre_los_nulos_en_el_sentido_del_indice(self):
+        """
+        Los artículos sin fecha van al final en orden descendente y al principio
+        en orden ascendente, sin repetir ni saltear ninguno
+        """
+
+        dated = [article for article in self.articles if article.published_at]
+        undated = [article.pk for article in self.articles if not article.published_at]
+        descending = [
+            article.pk
+            for article in sorted(
+                dated, key=lambda article: (article.published_at, article.pk)
+            )
+        ][::-1]
+
+        self.assertEqual(self.walk("-published_at"), descending + undated[::-1])
+        self.assertEqual(self.walk("published_at"), undated + descending[::-1])
+
+    def test_paginas_siguientes_usan_el_indice(self):
+        """
+        Las páginas siguientes se resuelven con un rango del índice, sin
+        ordenar ni recorrer la tabla
+        """
+
+        queryset = Article.objects.filter(
+            state=ArticleStates.PUBLISHED.value, category_id__in=[self.category.pk]
+        )
+        article = self.articles[1]
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+        for field in HOME_ORDER_FIELDS:
+            for order_by in (f"-{field}", field):
+                position = (getattr(article, field), article.pk)
+                segment = keyset_segments(queryset, order_by, position)[0]
+                plan = segment[:13].explain()
+
+                with self.subTest(order_by=order_by):
+                    index_cond = next(
+                        line for line in plan.splitlines() if "Index Cond" in line
+                    )
+                    self.assertIn(f"ROW({field}, id)", index_cond)
+                    self.assertNotIn("Sort", plan)
+
+
+class CachePaginasAnonimasTest(TestCase):
+    """
+    Casos de prueba para la caché de páginas de usuarios anónimos
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        caches["pages"].clear()
+        self.user = User.objects.create_user(username="autor", password="testpassword")
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        self.article = Article.objects.create(
+            title="Artículo",
+            autor=self.user,
+            category=self.category,
+            state=ArticleStates.PUBLISHED.value,
+            published_at=timezone.now(),
+        )
+        ArticleContent.objects.create(
+            article=self.article, body="Contenido.", autor=self.user
+        )
+
+    def test_home_anonimo_se_sirve_desde_cache(self):
+        """
+        La segunda visita anónima al inicio se sirve desde la caché y una
+        edición de categoría la invalida
+        """
+
+        first = self.client.get(reverse("home"), {"time_range": "all", "search": ""})
+        second = self.client.get(reverse("home"), {"search": "", "time_range": "all"})
+
+        self.assertEqual(first["X-Page-Cache"], "miss")
+        self.assertEqual(second["X-Page-Cache"], "hit")
+        self.assertEqual(first.content, second.content)
+
+        self.category.description = "Editada"
+        self.category.save()
+
+        third = self.client.get(reverse("home"), {"time_range": "all"})
+        self.assertEqual(third["X-Page-Cache"], "miss")
+
+    def test_detalle_anonimo_cuenta_visualizaciones_desde_cache(self):
+        """
+        Las visualizaciones se cuentan también cuando la página sale de la caché
+        """
+
+        url = reverse("article-detail", args=[self.article.id])
+
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "miss")
+        self.assertEqual(self.client.get(url)["X-Page-Cache"], "hit")
+
+        flush_counters()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_number, 2)
+
+    def test_cambios_en_otro_proceso_invalidan_la_cache(self):
+        """
+        Un cambio hecho por otro proceso (otro worker o run_scheduler) invalida
+        las páginas en caché de este proceso
+        """
+
+        self.client.get(reverse("home"))
+        self.assertEqual(self.client.get(reverse("home"))["X-Page-Cache"], "hit")
+
+        with self.settings(CACHES=other_process_caches()):
+            self.category.description = "Editada en otro proceso"
+            self.category.save()
+
+        self.assertEqual(self.client.get(reverse("home"))["X-Page-Cache"], "miss")
+
+    def test_no_guarda_articulos_no_publicados(self):
+        """
+        El detalle de un artículo no publicado no se guarda en caché
+        """
+
+        self.article.state = ArticleStates.DRAFT.value
+        self.article.save()
+        url = reverse("article-detail", args=[self.article.id])
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertNotIn("X-Page-Cache", self.client.get(url))
+
+    def test_no_guarda_paginas_con_token_csrf(self):
+        """
+        Las páginas que incluyen el token CSRF no se guardan en caché
+        """
+
+        @cache_anonymous_page()
+        def view(request):
+            return HttpResponse(get_token(request))
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+
+        view(request)
+        self.assertNotIn("X-Page-Cache", view(request))
+
+
+class RenderizadoContenidoTest(TestCase):
+    """
+    Casos de prueba para el HTML renderizado de cada revisión
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.user = User.objects.create_user(username="autor", password="testpassword")
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        self.article = Article.objects.create(
+            title="Artículo", autor=self.user, category=self.category
+        )
+
+    def test_revision_guarda_html_sanitizado(self):
+        """
+        Al crear una revisión se guarda su HTML sin etiquetas peligrosas
+        """
+
+        content = ArticleContent.objects.create(
+            article=self.article,
+            body="# Título\n\n<script>alert(1)</script>",
+            autor=self.user,
+        )
+
+        content.refresh_from_db()
+        self.assertIn("<h1>Título</h1>", content.rendered_body)
+        self.assertNotIn("<script>", content.rendered_body)
+
+    def test_renderizado_perezoso_y_comando(self):
+        """
+        Las revisiones desactualizadas se renderizan al leerlas o con el comando
+        """
+
+        content = ArticleContent.objects.create(
+            article=self.article, body="**negrita**", autor=self.user
+        )
+        ArticleContent.objects.filter(pk=content.pk).update(
+            rendered_body="", rendered_version=0
+        )
+
+        content.refresh_from_db()
+        self.assertIn("<strong>negrita</strong>", content.get_rendered_body())
+
+        ArticleContent.objects.filter(pk=content.pk).update(
+            rendered_body="", rendered_version=0
+        )
+        call_command("render_article_contents", workers=1, stdout=StringIO())
+
+        content.refresh_from_db()
+        self.assertIn("<strong>negrita</strong>", content.rendered_body)
+
+
+class ContadoresArticuloTest(TestCase):
+    """
+    Casos de prueba para los contadores de visualizaciones y compartidos
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        flush_counters()
+        self.user = User.objects.create_user(username="autor", password="testpassword")
+        self.category = Category.objects.create(
+            name="Categoría", description="Categoría", type=CategoryType.FREE.value
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Artículo {i}", autor=self.user, category=self.category
+            )
+            for i in range(2)
+        ]
+
+    @override_settings(ARTICLE_COUNTERS={"FLUSH_INTERVAL": 3600, "MAX_PENDING": 1000})
+    def test_incrementos_se_escriben_en_una_consulta(self):
+        """
+        Los incrementos pendientes de varios artículos se escriben con un solo UPDATE
+        """
+
+        first, second = self.articles
+        for _ in range(3):
+            counter_buffer.increment(first.pk, "views_number")
+        counter_buffer.increment(second.pk, "shares_number")
+
+        self.assertEqual(counter_buffer.pending(first.pk, "views_number"), 3)
+
+        with self.assertNumQueries(1):
+            flush_counters()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.views_number, first.shares_number), (3, 0))
+        self.assertEqual((second.views_number, second.shares_number), (0, 1))
+
+    @override_settings(ARTICLE_COUNTERS={"FLUSH_INTERVAL": 3600, "MAX_PENDING": 2})
+    def test_maximo_de_pendientes_fuerza_la_escritura(self):
+        """
+        Al alcanzar el máximo de incrementos pendientes se escriben de inmediato
+        """
+
+        article = self.articles[0]
+        counter_buffer.increment(article.pk, "views_number")
+        counter_buffer.increment(article.pk, "views_number")
+
+        article.refresh_from_db()
+        self.assertEqual(article.views_number, 2)
+
+    @override_settings(ARTICLE_COUNTERS={"FLUSH_INTERVAL": 3600, "MAX_PENDING": 1000})
+    def test_visualizaciones_desde_cache_solo_de_publicados(self):
+        """
+        Las visualizaciones servidas desde la caché solo se cuentan si el
+        artículo sigue publicado al escribirlas
+        """
+
+        published, draft = self.articles
+        published.state = ArticleStates.PUBLISHED.value
+        published.save()
+
+        for article in self.articles:
+            count_article_view(None, article.pk)
+        counter_buffer.increment(draft.pk, "views_number")
+
+        with self.assertNumQueries(1):
+            flush_counters()
+
+        published.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertEqual(published.views_number, 1)
+        self.assertEqual(draft.views_number, 1)
+
+    @override_settings(ARTICLE_COUNTERS={"FLUSH_INTERVAL": 0.01, "MAX_PENDING": 1000})
+    def test_hilo_escribe_pendientes_sin_solicitudes(self):
+        """
+        El hilo de escritura periódica guarda los incrementos pendientes aunque
+        no lleguen más solicitudes
+        """
+
+        buffer = CounterBuffer()
+        flushed = threading.Event()
+
+        with patch.object(buffer, "flush", side_effect=lambda: flushed.set()):
+            buffer._last_flush = time.monotonic()
+            buffer.increment(self.articles[0].pk, "views_number")
+            buffer.start_flusher()
+
+            self.assertTrue(flushed.wait(timeout=5))
+            buffer.stop_flusher()
+
+
+@override_settings(CACHES=MEMORY_SHARED_CACHES)
+class PermisosGlobalesTest(TestCase):
+    """
+    Casos de prueba para el procesador de contexto de permisos
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        cache.clear()
+        get_permissions_cache().clear()
+        self.user = User.objects.create_user(username="lector", password="testpassword")
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+
+    def test_permisos_se_resuelven_solo_al_usarlos(self):
+        """
+        Los permisos no se consultan hasta que la plantilla los usa, y se
+        reutilizan si la vista ya los resolvió
+        """
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            context = global_permissions(request)
+
+        with self.assertNumQueries(1):
+            self.assertIn(PermissionEnum.VER_INICIO.value, context["permisos"])
+            self.assertTrue(request.user.tiene_permisos([PermissionEnum.VER_INICIO]))
+
+
+class ReporteVentasTest(TestCase):
+    """
+    Casos de prueba para el reporte de categorías vendidas
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        cache.clear()
+        self.user = User.objects.create_user(username="financiero", password="testpassword")
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+        self.client.login(username="financiero", password="testpassword")
+
+        now = timezone.now()
+        self.categories = [
+            Category.objects.create(
+                name=f"Pago {index}",
+                description="Pago",
+                type=CategoryType.PAY.value,
+                price=10.0,
+            )
+            for index in range(3)
+        ]
+
+        for index, category in enumerate(self.categories):
+            for days in range(index + 1):
+                Payment.objects.create(
+                    user=self.user,
+                    category=category,
+                    price=10.0,
+                    status="completed",
+                    date_paid=now - timedelta(days=days),
+                )
+
+        Payment.objects.create(
+            user=self.user, category=self.categories[0], price=10.0, status="pending"
+        )
+
+    def test_reporte_agrupa_por_categoria_y_fecha(self):
+        """
+        Los totales por categoría y por fecha salen de la consulta agrupada
+        """
+
+        report = build_sales_report(Payment.objects.filter(status="completed"))
+
+        self.assertEqual(report["categories"], ["Pago 2", "Pago 1", "Pago 0"])
+        self.assertEqual(report["sales"], [3, 2, 1])
+        self.assertEqual(report["earnings"], [30.0, 20.0, 10.0])
+        self.assertEqual(len(report["dates"]), 3)
+        self.assertEqual(report["total_earnings_by_date"], [10.0, 20.0, 30.0])
+        self.assertEqual(report["category_sales_by_date"]["Pago 0"], [0, 0, 10.0])
+        self.assertEqual(len(report["buyers_per_category"]["Pago 2"]), 3)
+        self.assertEqual(len(report["detailed_category_data"]), 6)
+        self.assertEqual(report["total_general"], 60.0)
+
+    def test_cantidad_de_consultas_constante(self):
+        """
+        El reporte usa dos consultas sin importar las categorías y fechas
+        """
+
+        with self.assertNumQueries(2):
+            build_sales_report(Payment.objects.filter(status="completed"))
+
+    def test_vista_categorias_vendidas(self):
+        """
+        La vista muestra el reporte con los filtros aplicados
+        """
+
+        response = self.client.get(
+            reverse("sold-categories"), {"category_name": "Pago 1", "view_type": "list"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["categories"], ["Pago 1"])
+        self.assertEqual(response.context["total_general"], 20.0)
+
+    def test_descarga_excel_con_filtros(self):
+        """
+        El Excel se genera en el servidor aplicando los filtros del reporte
+        """
+
+        response = self.client.get(
+            reverse("download-sold-categories"), {"category_name": "Pago 2"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("categorias_vendidas.xlsx", response["Content-Disposition"])
+
+        workbook = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content)))
+        sheet = workbook.active
+        rows = list(sheet.values)
+
+        self.assertEqual(rows[0][0], "Categoría")
+        self.assertEqual([row[0] for row in rows[1:4]], ["Pago 2"] * 3)
+        self.assertEqual(rows[-1][:3], ("Total de Ganancias", None, "$30.00"))
+        self.assertEqual(sheet.column_dimensions["A"].width, len("Total de Ganancias"))
+
+    def test_exportacion_csv_y_ndjson(self):
+        """
+        Los pagos se exportan en streaming como CSV o NDJSON con los filtros del reporte
+        """
+
+        response = self.client.get(
+            reverse("export-payments"), {"category_name": "Pago 1"}
+        )
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,category,buyer,price,date_paid,status")
+        self.assertEqual(len(lines), 3)
+
+        response = self.client.get(reverse("export-payments"), {"format": "ndjson"})
+
+        records = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records[0]["status"], "completed")
+
+        response = self.client.get(reverse("export-payments"), {"format": "xml"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_exportacion_comprimida_con_gzip(self):
+        """
+        La exportación se comprime si el cliente acepta gzip
+        """
+
+        response = self.client.get(
+            reverse("export-article-stats"), HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertTrue(content.startswith("id,title,author,category,published_at"))
+
+
+class AcumuladoVentasTest(TestCase):
+    """
+    Casos de prueba para el acumulado diario de ventas
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        cache.clear()
+        self.user = User.objects.create_user(username="financiero", password="testpassword")
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+        self.client.login(username="financiero", password="testpassword")
+
+        self.category = Category.objects.create(
+            name="Pago", description="Pago", type=CategoryType.PAY.value, price=10.0
+        )
+        # Mediodía de ayer, para que los rangos no dependan de la hora actual
+        self.yesterday = start_of_day(
+            timezone.localdate() - timedelta(days=1)
+        ) + timedelta(hours=12)
+
+    def test_pago_completado_se_suma_una_vez(self):
+        """
+        Completar un pago lo suma al acumulado solo la primera vez
+        """
+
+        payment = Payment.objects.create(
+            user=self.user, category=self.category, price=10.0, date_paid=self.yesterday
+        )
+
+        self.assertTrue(complete_payment(payment))
+        self.assertFalse(complete_payment(payment))
+
+        daily = SalesDaily.objects.get(category=self.category)
+        self.assertEqual(daily.date, timezone.localdate(self.yesterday))
+        self.assertEqual(daily.count, 1)
+        self.assertEqual(daily.revenue, 10.0)
+        self.assertEqual(Payment.objects.get(pk=payment.pk).status, "completed")
+
+    def test_dias_anteriores_salen_del_acumulado(self):
+        """
+        Los días anteriores a hoy se leen del acumulado y hoy de los pagos
+        """
+
+        # El pago de ayer no está en el acumulado, por lo que no se cuenta
+        Payment.objects.create(
+            user=self.user,
+            category=self.category,
+            price=10.0,
+            status="completed",
+            date_paid=self.yesterday,
+        )
+        SalesDaily.objects.create(
+            category=self.category,
+            date=timezone.localdate(self.yesterday),
+            count=4,
+            revenue=40.0,
+        )
+        Payment.objects.create(
+            user=self.user, category=self.category, price=10.0, status="completed"
+        )
+
+        with self.assertNumQueries(2):
+            rows = sales_rows()
+
+        self.assertEqual(sorted(count for _, _, count, _ in rows), [1, 4])
+
+        response = self.client.get(reverse("sold-categories"))
+        self.assertEqual(response.context["sales"], [5])
+        self.assertEqual(response.context["total_general"], 50.0)
+
+    def test_rango_parcial_usa_los_pagos(self):
+        """
+        Un día cubierto solo en parte por el rango se calcula sobre los pagos
+        """
+
+        Payment.objects.create(
+            user=self.user,
+            category=self.category,
+            price=10.0,
+            status="completed",
+            date_paid=self.yesterday,
+        )
+        SalesDaily.objects.create(
+            category=self.category,
+            date=timezone.localdate(self.yesterday),
+            count=4,
+            revenue=40.0,
+        )
+
+        rows = sales_rows(since=self.yesterday - timedelta(hours=1))
+
+        self.assertEqual([count for _, _, count, _ in rows], [1])
+
+    def test_comando_reconstruye_acumulado(self):
+        """
+        El comando reconstruye el acumulado a partir de los pagos completados
+        """
+
+        for _ in range(2):
+            Payment.objects.create(
+                user=self.user,
+                category=self.category,
+                price=10.0,
+                status="completed",
+                date_paid=self.yesterday,
+            )
+        Payment.objects.create(
+            user=self.user, category=self.category, price=10.0, status="pending"
+        )
+        SalesDaily.objects.create(
+            category=self.category, date=timezone.localdate(), count=9, revenue=90.0
+        )
+
+        call_command("rebuild_sales_rollup", stdout=StringIO())
+
+        daily = SalesDaily.objects.get()
+        self.assertEqual(daily.date, timezone.localdate(self.yesterday))
+        self.assertEqual(daily.count, 2)
+        self.assertEqual(daily.revenue, 20.0)
+
+
+class AcumuladoVentasConcurrenteTest(TransactionTestCase):
+    """
+    Casos de prueba para la reconstrucción del acumulado de ventas mientras se
+    completan pagos
+    """
+
+    def test_pago_completado_durante_la_reconstruccion(self):
+        """
+        Un pago completado durante la reconstrucción espera a que termine y se
+        suma sobre el acumulado reconstruido
+        """
+
+        user = User.objects.create_user(username="comprador", password="testpassword")
+        category = Category.objects.create(
+            name="Pago", description="Pago", type=CategoryType.PAY.value, price=10.0
+        )
+        yesterday = timezone.now() - timedelta(days=1)
+        Payment.objects.create(
+            user=user,
+            category=category,
+            price=10.0,
+            status="completed",
+            date_paid=yesterday,
+        )
+        payment = Payment.objects.create(user=user, category=category, price=10.0)
+
+        def complete():
+            try:
+                complete_payment(payment)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=complete)
+
+        with transaction.atomic():
+            self.assertEqual(rebuild_sales_rollup(), 1)
+            thread.start()
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+        rollup = dict(SalesDaily.objects.values_list("date", "count"))
+        self.assertEqual(
+            rollup,
+            {
+                timezone.localdate(yesterday): 1,
+                timezone.localdate(payment.date_paid): 1,
+            },
+        )
+
+
+class ExportacionesEnSegundoPlanTest(TestCase):
+    """
+    Casos de prueba para las exportaciones generadas en segundo plano
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        cache.clear()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(username="financiero", password="testpassword")
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+        self.client.login(username="financiero", password="testpassword")
+
+        category = Category.objects.create(
+            name="Pago", description="Pago", type=CategoryType.PAY.value, price=10.0
+        )
+        for _ in range(3):
+            Payment.objects.create(
+                user=self.user, category=category, price=10.0, status="completed"
+            )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.media_root.cleanup()
+
+    def test_solicitudes_identicas_comparten_el_trabajo(self):
+        """
+        Una solicitud igual a otra en curso devuelve el mismo trabajo
+        """
+
+        url = reverse("export-job-create")
+
+        first = self.client.post(url, {"kind": "sales", "date_range": "30d"})
+        second = self.client.post(url, {"kind": "sales", "date_range": "30d"})
+        other = self.client.post(url, {"kind": "sales", "date_range": "7d"})
+
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertNotEqual(first.json()["id"], other.json()["id"])
+        self.assertEqual(first.json()["state"], ExportJobStates.PENDING.value)
+
+        response = self.client.post(url, {"kind": "desconocido"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_trabajo_genera_archivo_y_se_descarga(self):
+        """
+        El trabajo genera el archivo, informa el progreso y permite descargarlo
+        """
+
+        job_id = self.client.post(
+            reverse("export-job-create"), {"kind": "sales"}
+        ).json()["id"]
+
+        self.assertEqual(claim_export_jobs(5), [job_id])
+        self.assertEqual(claim_export_jobs(5), [])
+        self.assertEqual(run_export_job(job_id), ExportJobStates.DONE.value)
+
+        status = self.client.get(reverse("export-job-status", args=[job_id])).json()
+        self.assertEqual(status["progress"], 3)
+        self.assertEqual(status["total"], 3)
+        self.assertEqual(status["download_url"], reverse("export-job-download", args=[job_id]))
+
+        response = self.client.get(status["download_url"])
+        workbook = openpyxl.load_workbook(BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(workbook.active.max_row, 6)
+
+        User.objects.create_user(username="otro", password="testpassword")
+        self.client.login(username="otro", password="testpassword")
+        response = self.client.get(reverse("export-job-status", args=[job_id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_archivos_vencidos_se_eliminan(self):
+        """
+        Los archivos de las exportaciones vencidas se eliminan
+        """
+
+        job_id = self.client.post(
+            reverse("export-job-create"), {"kind": "purchases"}
+        ).json()["id"]
+        run_export_job(job_id)
+        path = ExportJob.objects.get(pk=job_id).file.path
+
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(expire_export_jobs(timezone.now() + timedelta(days=2)), 1)
+
+        job = ExportJob.objects.get(pk=job_id)
+        self.assertEqual(job.state, ExportJobStates.EXPIRED.value)
+        self.assertFalse(job.file)
+        self.assertFalse(os.path.exists(path))
+
+    def test_comando_recupera_trabajos_interrumpidos(self):
+        """
+        El comando vuelve a encolar los trabajos que quedaron en curso y, si un
+        proceso termina abruptamente, marca su trabajo como fallido y sigue con
+        un conjunto de procesos nuevo
+        """
+
+        interrupted, _ = request_export_job(self.user, "sales", {"date_range": "7d"})
+        ExportJob.objects.filter(pk=interrupted.pk).update(
+            state=ExportJobStates.RUNNING.value, progress=2
+        )
+        broken, _ = request_export_job(self.user, "sales", {"date_range": "30d"})
+        pending, _ = request_export_job(self.user, "purchases", {})
+        executors = []
+
+        class FakeExecutor:
+            def __init__(self, **kwargs):
+                executors.append(self)
+                self.broken = len(executors) == 1
+
+            def submit(self, fn, job_id):
+                future = Future()
+                if self.broken and job_id == broken.pk:
+                    future.set_exception(BrokenProcessPool("proceso terminado"))
+                else:
+                    future.set_result(fn(job_id))
+                return future
+
+            def shutdown(self, wait=True):
+                pass
+
+        stdout, stderr = StringIO(), StringIO()
+        with patch(
+            "article.management.commands.run_export_jobs.ProcessPoolExecutor",
+            FakeExecutor,
+        ):
+            call_command(
+                "run_export_jobs", workers=1, once=True, stdout=stdout, stderr=stderr
+            )
+
+        self.assertIn("1 exportaciones interrumpidas", stdout.getvalue())
+        self.assertIn(f"Exportación {broken.pk}: proceso terminado", stderr.getvalue())
+        self.assertEqual(len(executors), 2)
+
+        states = dict(ExportJob.objects.values_list("pk", "state"))
+        self.assertEqual(states[interrupted.pk], ExportJobStates.DONE.value)
+        self.assertEqual(states[broken.pk], ExportJobStates.FAILED.value)
+        self.assertEqual(states[pending.pk], ExportJobStates.DONE.value)
+
+        retry, created = request_export_job(self.user, "sales", {"date_range": "30d"})
+        self.assertTrue(created)
+        self.assertNotEqual(retry.pk, broken.pk)
+
+
+class PublicacionProgramadaTest(TestCase):
+    """
+    Casos de prueba para la publicación de artículos programados
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.user = User.objects.create_user(
+            username="autor", password="testpassword", email="autor@example.com"
+        )
+        category = Category.objects.create(
+            name="Programados", description="Programados", type=CategoryType.FREE.value
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Programado {i}",
+                autor=self.user,
+                category=category,
+                state=ArticleStates.REVISION.value,
+            )
+            for i in range(3)
+        ]
+
+        now = timezone.now()
+        for i, article in enumerate(self.articles):
+            ArticlesToPublish.objects.create(
+                article=article, to_publish_at=now + timedelta(minutes=i - 1)
+            )
+
+    def test_publica_solo_los_vencidos(self):
+        """
+        Se publican los artículos cuya fecha pasó y se avisa a sus autores
+        """
+
+        self.assertEqual(publish_due_articles(), 2)
+        self.assertEqual(publish_due_articles(), 0)
+
+        states = list(
+            Article.objects.order_by("title").values_list("state", flat=True)
+        )
+        self.assertEqual(
+            states,
+            [
+                ArticleStates.PUBLISHED.value,
+                ArticleStates.PUBLISHED.value,
+                ArticleStates.REVISION.value,
+            ],
+        )
+        self.assertEqual(OutboxEmail.objects.filter(to="autor@example.com").count(), 2)
+        self.assertEqual(
+            ArticlesToPublish.objects.filter(published=False).count(), 1
+        )
+        self.assertEqual(
+            next_publication_at(),
+            ArticlesToPublish.objects.get(published=False).to_publish_at,
+        )
+
+    def test_lote_limitado_y_comando(self):
+        """
+        El lote limita cada transacción y el comando publica todos los vencidos
+        """
+
+        self.assertEqual(publish_due_articles(batch_size=1), 1)
+
+        stdout = StringIO()
+        call_command("publish_scheduled_articles", "--batch-size=1", stdout=stdout)
+
+        self.assertIn("1 artículos publicados", stdout.getvalue())
+        self.assertEqual(
+            Article.objects.filter(state=ArticleStates.PUBLISHED.value).count(), 2
+        )
+
+
+class PlanificadorTest(TestCase):
+    """
+    Casos de prueba para el planificador de tareas periódicas
+    """
+
+    def test_ejecuta_tareas_vencidas_y_registra_metricas(self):
+        """
+        Las tareas vencidas se ejecutan, una falla no detiene al resto y se
+        registran sus duraciones
+        """
+
+        calls = []
+
+        def failing():
+            raise RuntimeError("fallo")
+
+        scheduler = Scheduler(
+            [
+                ScheduledJob("rapida", lambda: calls.append("rapida"), 0),
+                ScheduledJob("lenta", lambda: calls.append("lenta"), 3600),
+                ScheduledJob("fallida", failing, 3600),
+            ]
+        )
+
+        with self.assertLogs("article.scheduler", level="ERROR"):
+            delay = scheduler.run_pending()
+        self.assertEqual(calls, ["rapida", "lenta"])
+        self.assertEqual(delay, 0)
+
+        scheduler.run_pending()
+        self.assertEqual(calls, ["rapida", "lenta", "rapida"])
+
+        metrics = {name: m.snapshot() for name, m in scheduler.metrics.items()}
+        self.assertEqual(metrics["lenta"]["runs"], 1)
+        self.assertEqual(metrics["fallida"]["failures"], 1)
+
+    def test_publicacion_espera_hasta_la_proxima_fecha(self):
+        """
+        La espera entre revisiones crece mientras no hay cambios y no pasa de
+        la próxima publicación programada
+        """
+
+        user = User.objects.create_user(username="autor", password="testpassword")
+        category = Category.objects.create(
+            name="Programados", description="Programados", type=CategoryType.FREE.value
+        )
+        article = Article.objects.create(
+            title="Programado", autor=user, category=category
+        )
+        job = PublishArticlesJob(min_poll=1, max_poll=30)
+
+        # Sin programaciones la espera crece
+        self.assertEqual(job.next_delay(0), 2)
+        self.assertEqual(job.next_delay(0), 4)
+
+        ArticlesToPublish.objects.create(
+            article=article, to_publish_at=timezone.now() + timedelta(seconds=3)
+        )
+        self.assertEqual(job.next_delay(0), 1)
+        self.assertEqual(job.next_delay(0), 2)
+        self.assertLess(job.next_delay(0), 3.1)
+
+    def test_comando_una_vez(self):
+        """
+        El comando ejecuta cada tarea una vez e informa sus métricas
+        """
+
+        stdout = StringIO()
+        call_command("run_scheduler", "--once", stdout=stdout)
+
+        self.assertIn("publish_articles: 1 ejecuciones, 0 fallos", stdout.getvalue())
+        self.assertIn("rebuild_sales_rollup: 1 ejecuciones", stdout.getvalue())
+
+
+class TransicionesEstadoTest(TestCase):
+    """
+    Casos de prueba para la tabla de transiciones y el cambio de estado masivo
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        patcher = patch("article.events._broker", LocalEventBroker())
+        self.broker = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.editor = User.objects.create_user(
+            username="editor", password="testpassword", email="editor@example.com"
+        )
+        role = Role.objects.create(name="Editor transiciones")
+        permission, _ = Permission.objects.get_or_create(
+            name=PermissionEnum.EDITAR_ARTICULOS
+        )
+        role.permissions.add(permission)
+        self.editor.roles.add(role)
+
+        self.autor = User.objects.create_user(
+            username="autor", password="testpassword", email="autor@example.com"
+        )
+        category = Category.objects.create(
+            name="Moderada",
+            description="Moderada",
+            type=CategoryType.FREE.value,
+            is_moderated=True,
+        )
+        self.revision = [
+            Article.objects.create(
+                title=f"En revisión {i}",
+                autor=self.autor,
+                category=category,
+                state=ArticleStates.REVISION.value,
+            )
+            for i in range(2)
+        ]
+        self.draft = Article.objects.create(
+            title="Borrador",
+            autor=self.autor,
+            category=category,
+            state=ArticleStates.DRAFT.value,
+        )
+
+        self.client.login(username="editor", password="testpassword")
+
+    def transition(self, ids, state):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("article-transition"),
+                json.dumps({"ids": ids, "state": state}),
+                content_type="application/json",
+            )
+
+    def test_tabla_de_transiciones(self):
+        """
+        Los estados destino dependen del rol, del estado y de la moderación
+        """
+
+        draft = ArticleStates.DRAFT.value
+        revision = ArticleStates.REVISION.value
+        published = ArticleStates.PUBLISHED.value
+
+        self.assertEqual(
+            allowed_targets({"autor"}, draft, is_moderated=True),
+            {revision, ArticleStates.INACTIVE.value},
+        )
+        self.assertNotIn(published, allowed_targets({"autor"}, draft, True))
+        self.assertIn(published, allowed_targets({"autor"}, draft, False))
+        self.assertEqual(
+            allowed_targets({"editor"}, revision, True),
+            {ArticleStates.EDITED.value, draft},
+        )
+        self.assertEqual(allowed_targets(set(), revision, False), set())
+
+    def test_cambio_masivo(self):
+        """
+        Se aplican los cambios permitidos y se informan los rechazados
+        """
+
+        ids = [article.pk for article in self.revision]
+        response = self.transition(ids + [self.draft.pk, 0], ArticleStates.EDITED.value)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["updated"], ids)
+        self.assertEqual(data["forbidden"], [self.draft.pk])
+        self.assertEqual(data["not_found"], [0])
+
+        self.assertEqual(
+            Article.objects.filter(state=ArticleStates.EDITED.value).count(), 2
+        )
+        self.assertEqual(OutboxEmail.objects.filter(to="autor@example.com").count(), 2)
+
+        messages, _ = self.broker.history(0)
+        self.assertEqual(
+            [(event["id"], event["previous_state"]) for _, event in messages],
+            [(pk, ArticleStates.REVISION.value) for pk in ids],
+        )
+
+        response = self.transition(ids, ArticleStates.EDITED.value)
+        self.assertEqual(response.json()["unchanged"], ids)
+
+    def test_cambio_rechazado_o_invalido(self):
+        """
+        Sin cambios permitidos se responde 403, y 400 si la solicitud es inválida
+        """
+
+        response = self.transition([self.draft.pk], ArticleStates.PUBLISHED.value)
+        self.assertEqual(response.status_code, 403)
+        self.draft.refresh_from_db()
+        self.assertEqual(self.draft.state, ArticleStates.DRAFT.value)
+
+        self.assertEqual(self.transition([self.draft.pk], "x").status_code, 400)
+        self.assertEqual(self.transition([], "d").status_code, 400)
+        self.assertEqual(self.transition("1", "d").status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse("article-transition")).status_code, 405
+        )
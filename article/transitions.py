@@ -0,0 +1,180 @@
+from django.db import transaction
+from django.utils import timezone
+
+from article.cache import bump_content_version
+from article.events import article_event, publish_article_events
+from article.models import Article, ArticleStates
+from article.search import bump_autocomplete_version
+from notification.utils import send_emails
+from roles.utils import PermissionEnum
+
+
+DRAFT = ArticleStates.DRAFT.value
+REVISION = ArticleStates.REVISION.value
+EDITED = ArticleStates.EDITED.value
+PUBLISHED = ArticleStates.PUBLISHED.value
+INACTIVE = ArticleStates.INACTIVE.value
+
+# Estado actual comodín en las tablas de transiciones
+ANY_STATE = "*"
+
+# Estados destino permitidos por (rol, estado actual)
+TRANSITIONS = {
+    ("admin", ANY_STATE): {REVISION, DRAFT, INACTIVE},
+    ("autor", DRAFT): {REVISION},
+    ("autor", ANY_STATE): {INACTIVE},
+    ("editor", REVISION): {EDITED, DRAFT},
+    ("publisher", EDITED): {PUBLISHED},
+}
+
+# Transiciones adicionales en categorías no moderadas
+UNMODERATED_TRANSITIONS = {
+    ("admin", ANY_STATE): {PUBLISHED},
+    ("autor", ANY_STATE): {PUBLISHED},
+    ("publisher", ANY_STATE): {PUBLISHED},
+}
+
+# Cantidad máxima de artículos por cambio de estado masivo
+MAX_BULK_TRANSITION = 200
+
+
+def user_roles(user):
+    """
+    Obtiene los roles del usuario que intervienen en los cambios de estado.
+
+    Los administradores también son editores y publicadores.
+
+    Args:
+        user (User): El usuario autenticado.
+
+    Returns:
+        frozenset: Roles entre `admin`, `autor`, `editor` y `publisher`.
+    """
+
+    roles = set()
+
+    if user.is_admin:
+        roles |= {"admin", "editor", "publisher"}
+    if user.tiene_permisos([PermissionEnum.EDITAR_ARTICULOS]):
+        roles.add("editor")
+    if user.tiene_permisos([PermissionEnum.MODERAR_ARTICULOS]):
+        roles.add("publisher")
+    if user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS]):
+        roles.add("autor")
+
+    return frozenset(roles)
+
+
+def allowed_targets(roles, state, is_moderated):
+    """
+    Obtiene los estados a los que se puede pasar un artículo.
+
+    Args:
+        roles (frozenset): Roles obtenidos con `user_roles`.
+        state (str): Estado actual del artículo.
+        is_moderated (bool): Si la categoría del artículo es moderada.
+
+    Returns:
+        set: Los estados destino permitidos.
+    """
+
+    tables = [TRANSITIONS] if is_moderated else [TRANSITIONS, UNMODERATED_TRANSITIONS]
+    targets = set()
+
+    for table in tables:
+        for role in roles:
+            targets |= table.get((role, state), set())
+            targets |= table.get((role, ANY_STATE), set())
+
+    return targets
+
+
+def can_transition(roles, article, new_state):
+    """
+    Indica si se puede cambiar el estado de un artículo.
+
+    Args:
+        roles (frozenset): Roles obtenidos con `user_roles`.
+        article (Article): El artículo, con su categoría.
+        new_state (str): El nuevo estado.
+
+    Returns:
+        bool: Si el cambio está permitido.
+    """
+
+    return new_state in allowed_targets(
+        roles, article.state, article.category.is_moderated
+    )
+
+
+def transition_articles(user, article_ids, new_state):
+    """
+    Cambia el estado de varios artículos en una sola actualización.
+
+    Los artículos se bloquean mientras se verifican los permisos, los avisos
+    a los autores se encolan en la bandeja de salida y los tableros abiertos
+    reciben el cambio al confirmarse la transacción.
+
+    Args:
+        user (User): El usuario que realiza el cambio.
+        article_ids (Iterable[int]): IDs de los artículos.
+        new_state (str): El nuevo estado.
+
+    Returns:
+        dict: IDs de los artículos `updated`, `unchanged` (ya estaban en el
+            estado), `forbidden` y `not_found`.
+    """
+
+    article_ids = set(article_ids)
+    roles = user_roles(user)
+    now = timezone.now()
+
+    with transaction.atomic():
+        articles = list(
+            Article.objects.select_for_update(of=("self",))
+            .select_related("autor", "category")
+            .filter(pk__in=article_ids)
+            .order_by("pk")
+        )
+
+        updated, unchanged, forbidden = [], [], []
+        for article in articles:
+            if article.state == new_state:
+                unchanged.append(article)
+            elif can_transition(roles, article, new_state):
+                updated.append(article)
+            else:
+                forbidden.append(article)
+
+        if updated:
+            send_emails(article.state_change_email(new_state) for article in updated)
+
+            fields = {"state": new_state}
+            if new_state == PUBLISHED:
+                fields["published_at"] = now
+            Article.objects.filter(pk__in=[article.pk for article in updated]).update(
+                **fields
+            )
+
+            events = []
+            for article in updated:
+                previous_state = article.state
+                for name, value in fields.items():
+                    setattr(article, name, value)
+                events.append(
+                    article_event(article, "updated", previous_state=previous_state)
+                )
+            publish_article_events(events)
+
+            # La actualización masiva no emite post_save
+            bump_content_version()
+            bump_autocomplete_version()
+
+    found = {article.pk for article in articles}
+
+    return {
+        "updated": [article.pk for article in updated],
+        "unchanged": [article.pk for article in unchanged],
+        "forbidden": [article.pk for article in forbidden],
+        "not_found": sorted(article_ids - found),
+    }
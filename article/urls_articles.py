@@ -4,6 +4,7 @@ from article import views
 urlpatterns = [
     path("", views.article_list, name="article-list"),
     path("create/", views.article_create, name="article-create"),
+    path("autocomplete/", views.article_autocomplete, name="article-autocomplete"),
     path("<int:pk>/update/", views.article_update, name="article-update"),
     path(
         "<int:pk>/update/history/",
@@ -11,6 +12,7 @@ urlpatterns = [
         name="article-update-history",
     ),
     path("<int:pk>/detail/", views.article_detail, name="article-detail"),
+    path("update/state/", views.article_transition, name="article-transition"),
     path(
         "<int:pk>/update/state/revision/",
         views.article_to_revision,
@@ -58,6 +60,23 @@ urlpatterns = [
         views.download_sold_categories_suscriptor,
         name="download-sold-categories-suscriptor",
     ),
+    path(
+        "sold-categories/export/",
+        views.export_payments,
+        name="export-payments",
+    ),
+    path(
+        "likes-dislikes-chart/export/",
+        views.export_article_stats,
+        name="export-article-stats",
+    ),
+    path("exports/", views.create_export_job, name="export-job-create"),
+    path("exports/<int:pk>/", views.export_job_status, name="export-job-status"),
+    path(
+        "exports/<int:pk>/download/",
+        views.download_export_job,
+        name="export-job-download",
+    ),
 
      path("manage-featured-articles/", views.manage_featured_articles, name="manage-featured-articles"),
 ]
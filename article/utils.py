@@ -1,7 +1,24 @@
 import os
+import re
+import math
+import html
+import mistune
 import cloudinary.uploader
 
 from django.core.files.storage import default_storage
+from django.utils.html import strip_tags
+
+# Primera imagen en formato markdown: ![alt](url.ext "título opcional"); la
+# URL termina en el primer espacio o paréntesis de cierre
+IMAGE_URL_REGEX = re.compile(
+    r"!\[[^\]]*\]\(([^)\s]+?\.(?:jpg|jpeg|png|gif|webp|bmp|svg|tiff|ico))"
+    r"(?:\s[^)]*)?\)"
+)
+# Largo máximo de la URL de portada, el de `Article.cover_image_url`
+COVER_IMAGE_MAX_LENGTH = 500
+DEFAULT_COVER_IMAGE = "static/images/noimage.png"
+EXCERPT_LENGTH = 300
+WORDS_PER_MINUTE = 200
 
 
 def mdeditor_upload_handler(filename, content):
@@ -27,3 +44,89 @@ def mdeditor_upload_handler(filename, content):
 
     # Return the Cloudinary URL
     return result["url"]
+
+
+def extract_cover_image(body):
+    """
+    Obtiene la URL de la primera imagen del contenido markdown.
+
+    params:
+        body -- Contenido markdown del artículo.
+
+    return:
+        URL de la imagen o None si el contenido no tiene imágenes o la URL
+        supera `COVER_IMAGE_MAX_LENGTH`.
+    """
+
+    match = IMAGE_URL_REGEX.search(str(body or ""))
+    if match is None or len(match.group(1)) > COVER_IMAGE_MAX_LENGTH:
+        return None
+
+    return match.group(1)
+
+
+def markdown_to_text(body):
+    """
+    Convierte el contenido markdown a texto plano.
+
+    params:
+        body -- Contenido markdown del artículo.
+
+    return:
+        Texto plano sin etiquetas ni espacios repetidos.
+    """
+
+    text = html.unescape(strip_tags(mistune.html(str(body or ""))))
+    return " ".join(text.split())
+
+
+def build_excerpt(text, length=EXCERPT_LENGTH):
+    """
+    Recorta un texto plano sin cortar palabras.
+
+    params:
+        text -- Texto plano.
+        length -- Longitud máxima del extracto.
+
+    return:
+        Extracto del texto.
+    """
+
+    if len(text) <= length:
+        return text
+
+    return text[:length].rsplit(" ", 1)[0] + "…"
+
+
+def extract_content_metadata(body):
+    """
+    Calcula los metadatos que se guardan junto al artículo para los listados.
+
+    params:
+        body -- Contenido markdown del artículo.
+
+    return:
+        Diccionario con `cover_image_url`, `excerpt` y `word_count`.
+    """
+
+    text = markdown_to_text(body)
+
+    return {
+        "cover_image_url": extract_cover_image(body),
+        "excerpt": build_excerpt(text),
+        "word_count": len(text.split()),
+    }
+
+
+def reading_time(word_count):
+    """
+    Calcula el tiempo de lectura estimado.
+
+    params:
+        word_count -- Cantidad de palabras del contenido.
+
+    return:
+        Minutos de lectura (mínimo 1).
+    """
+
+    return max(1, math.ceil(word_count / WORDS_PER_MINUTE))
@@ -1,12 +1,8 @@
-import mistune
 import stripe
 import os
-import openpyxl
-import re
-from openpyxl.utils import get_column_letter
+import tempfile
 
 from datetime import datetime
-from collections import defaultdict
 from datetime import timedelta
 
 from article.models import (
@@ -14,10 +10,11 @@ from article.models import (
     ArticleContent,
     Article,
     ArticleStates,
-    CategoryType,
     ArticleVote,
     ArticlesToPublish,
     Payment,
+    ExportJob,
+    ExportJobStates,
     FavoriteCategory,
 )
 from article.forms import (
@@ -26,34 +23,78 @@ from article.forms import (
     CategorySearchForm,
     ArticleFilterForm,
 )
+from article.entitlements import (
+    split_categories,
+    can_access_category,
+    has_purchased_category,
+)
+from article.cache import cache_anonymous_page, skip_page_cache
+from article.exports import stream_export
+from article.counters import increment_shares, increment_views
+from article.sales import (
+    build_sales_report,
+    complete_payment,
+    filter_payments,
+    filter_purchases,
+    parse_sales_range,
+    sales_rows,
+    write_purchases_xlsx,
+    write_sales_xlsx,
+)
+from article.export_jobs import EXPORT_KINDS, request_export_job
+from article.pagination import DEFAULT_PAGE_SIZE, KeysetPage, paginate_keyset
+from article.transitions import (
+    MAX_BULK_TRANSITION,
+    can_transition,
+    transition_articles,
+    user_roles,
+)
+from article.search import (
+    AUTOCOMPLETE_LIMIT,
+    autocomplete,
+    filter_by_tag,
+    render_headline,
+    search_articles,
+)
 from roles.utils import PermissionEnum
+from roles.permissions import get_user_permissions
 from notification.utils import send_email
 
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseForbidden,
     JsonResponse,
     HttpResponseBadRequest,
+    HttpResponseNotAllowed,
 )
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg
-from django.db.models import Q
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import NullIf
 from django.utils import timezone
-from django.db.models import Count
-from django.db.models import Sum
+from django.utils.functional import SimpleLazyObject
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
 from user.models import CustomUser
 import json
 from django.views.decorators.csrf import csrf_exempt
-from openpyxl import Workbook
 
 
 # Configura Stripe con la clave secreta
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Campos por los que se puede ordenar el inicio
+HOME_ORDER_FIELDS = (
+    "published_at",
+    "views_number",
+    "likes_number",
+    "dislikes_number",
+    "shares_number",
+)
+
 
 def global_permissions(request):
     """
@@ -61,8 +102,9 @@ def global_permissions(request):
     Esta vista se encarga de agregar los permisos del usuario al contexto de la plantilla,
     permitiendo que el usuario acceda a funciones y contenido específicos según sus roles y permisos.
 
-    Si el usuario está autenticado, se obtiene la lista de permisos asociados a sus roles.
-    En caso contrario, se retorna una lista vacía de permisos para los usuarios no autenticados.
+    Los permisos se resuelven de forma perezosa: solo se consultan si la
+    plantilla usa `permisos`, y se reutilizan si la vista ya los resolvió
+    durante la misma solicitud. Para usuarios no autenticados es una lista vacía.
 
     Args:
         request (HttpRequest): La solicitud HTTP.
@@ -70,17 +112,13 @@ def global_permissions(request):
     Returns:
         dict: Un diccionario con la lista de permisos bajo la clave 'permisos'.
     """
-    if request.user.is_authenticated:
-        permissions = [
-            permiso.name
-            for rol in request.user.roles.all()
-            for permiso in rol.permissions.all()
-        ]
-        return {'permisos': permissions}
-    
-    # Return an empty list of permissions for anonymous users
-    return {'permisos': []}
 
+    return {
+        "permisos": SimpleLazyObject(lambda: list(get_user_permissions(request.user)))
+    }
+
+
+@cache_anonymous_page()
 def home(request):
     """
     Vista que muestra la página de inicio.
@@ -97,60 +135,18 @@ def home(request):
         HttpResponse: Renderiza la plantilla 'article/home.html'.
     """
 
-    categories = Category.objects.all()
+    permissions = list(get_user_permissions(request.user))
 
-    if not request.user.is_authenticated:
-        permissions = []
-
-        permited_categories = [
-            category
-            for category in categories
-            if category.type == CategoryType.FREE.value
-        ]
-
-        not_permited_categories = [
-            {"name": category.name, "type": category.type}
-            for category in categories
-            if category.type != CategoryType.FREE.value
-        ]
-    else:
-        user_payments = Payment.objects.filter(user=request.user)
-
-        payment_status_by_category = defaultdict(lambda: None)
-        for payment in user_payments:
-            payment_status_by_category[payment.category_id] = payment.status
-
-        permissions = [
-            permiso.name
-            for rol in request.user.roles.all()
-            for permiso in rol.permissions.all()
-        ]
-
-        permited_categories = [
-            category
-            for category in categories
-            if category.type
-            in (CategoryType.FREE.value, CategoryType.SUSCRIPTION.value)
-            or Payment.objects.filter(
-                category=category, user=request.user, status="completed"
-            ).exists()
-        ]
-
-        not_permited_categories = [
-            {"name": category.name, "type": category.type}
-            for category in categories
-            if category.type == CategoryType.PAY.value
-            and not Payment.objects.filter(
-                category=category, user=request.user, status="completed"
-            ).exists()
-        ]
+    permited_categories, not_permited_categories = split_categories(request.user)
 
     permited_categories_ids = [category.id for category in permited_categories]
 
     if request.user.is_authenticated:
-        favorite_categories_ids = FavoriteCategory.objects.filter(
-            user=request.user, category_id__in=permited_categories_ids
-        ).values_list("category_id", flat=True)
+        favorite_categories_ids = list(
+            FavoriteCategory.objects.filter(
+                user=request.user, category_id__in=permited_categories_ids
+            ).values_list("category_id", flat=True)
+        )
     else:
         favorite_categories_ids = []
 
@@ -161,28 +157,18 @@ def home(request):
     ]
 
     # Filtrar artículos por conjunto
-    favorite_articles = Article.objects.filter(
-        state=ArticleStates.PUBLISHED.value, category__id__in=favorite_categories_ids
-    )
+    published_articles = Article.objects.filter(
+        state=ArticleStates.PUBLISHED.value
+    ).select_related("autor")
 
-    normal_articles = Article.objects.filter(
-        state=ArticleStates.PUBLISHED.value, category__id__in=normal_categories_ids
+    visible_articles = published_articles.filter(
+        category_id__in=permited_categories_ids
     )
 
-    featured_articles = Article.objects.filter(
-        is_featured=True, state=ArticleStates.PUBLISHED.value, category_id__in=permited_categories_ids
+    featured_articles = visible_articles.filter(is_featured=True).prefetch_related(
+        "tags"
     )
 
-    img_url_reg = r'!\[.*]\((.*\.(?:jpg|jpeg|png|gif|webp|bmp|svg|tiff|ico)).*\)'
-    for fa in featured_articles:
-        fa_content = ArticleContent.objects.filter(article=fa).last()
-        fa.image_url = re.findall(img_url_reg, str(fa_content.body))
-        if not fa.image_url:
-            fa.image_url = "static/images/noimage.png"
-        else:
-            fa.image_url = fa.image_url[0]
-
-
     # Aplicar los filtros y ordenamiento a ambos conjuntos
     form = ArticleFilterForm(request.GET or None)
     search_query = request.GET.get("search", "")
@@ -198,20 +184,15 @@ def home(request):
 
         if selected_tag:
             filter_active = True
-            favorite_articles = favorite_articles.filter(tags__name__in=[selected_tag])
-            normal_articles = normal_articles.filter(tags__name__in=[selected_tag])
+            visible_articles = filter_by_tag(visible_articles, selected_tag)
 
         if selected_category:
             filter_active = True
-            favorite_articles = favorite_articles.filter(category=selected_category)
-            normal_articles = normal_articles.filter(category=selected_category)
+            visible_articles = visible_articles.filter(category=selected_category)
 
         if selected_category_type and selected_category_type != "all":
             filter_active = True
-            favorite_articles = favorite_articles.filter(
-                category__type=selected_category_type
-            )
-            normal_articles = normal_articles.filter(
+            visible_articles = visible_articles.filter(
                 category__type=selected_category_type
             )
 
@@ -225,88 +206,71 @@ def home(request):
             "365d": now - timedelta(days=365),
         }
         if time_range in time_filters:
-            favorite_articles = favorite_articles.filter(
-                published_at__gte=time_filters[time_range]
-            )
-            normal_articles = normal_articles.filter(
+            visible_articles = visible_articles.filter(
                 published_at__gte=time_filters[time_range]
             )
 
     if search_query:
         filter_active = True
-        favorite_articles = favorite_articles.filter(
-            Q(title__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(tags__name__icontains=search_query)
-        ).distinct()
-
-        normal_articles = normal_articles.filter(
-            Q(title__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(tags__name__icontains=search_query)
-        ).distinct()
-
-    if order_by == "published_at" and order_direction == "desc":
-        order_by = "-published_at"
-    elif order_direction == "desc":
-        order_by = f"-{order_by}"
-
-    favorite_articles = favorite_articles.order_by(order_by)
-    normal_articles = normal_articles.order_by(order_by)
-
-    for article in favorite_articles:
-        # Calcular la calificación promedio
-        ratings = ArticleVote.objects.filter(article=article)
-        avg_rating = ratings.aggregate(Avg("rating"))["rating__avg"]
-
-        # Asignar el promedio de calificación como un atributo del artículo
-        article.avg_rating = round(avg_rating, 1) if avg_rating is not None else None
-
-    for article in normal_articles:
-        # Calcular la calificación promedio
-        ratings = ArticleVote.objects.filter(article=article)
-        avg_rating = ratings.aggregate(Avg("rating"))["rating__avg"]
+        visible_articles = search_articles(visible_articles, search_query)
 
-        # Asignar el promedio de calificación como un atributo del artículo
-        article.avg_rating = round(avg_rating, 1) if avg_rating is not None else None
+        # Sin un orden explícito, los resultados se ordenan por relevancia
+        if "order_by" not in request.GET:
+            order_by = "search_rank"
 
+    if order_by not in HOME_ORDER_FIELDS and not (
+        search_query and order_by == "search_rank"
+    ):
+        order_by = "published_at"
 
+    if order_direction == "desc":
+        order_by = f"-{order_by}"
 
-    
-    img_url_reg = r'!\[.*]\((.*\.(?:jpg|jpeg|png|gif|webp|bmp|svg|tiff|ico)).*\)'
-    for fa in normal_articles:
-        fa_content = ArticleContent.objects.filter(article=fa).last()
-        fa.image_url = re.findall(img_url_reg, str(fa_content.body))
-        if not fa.image_url:
-            fa.image_url = "static/images/noimage.png"
-        else:
-            fa.image_url = fa.image_url[0]
+    visible_articles = visible_articles.prefetch_related("tags")
+    page_size = getattr(settings, "HOME_PAGE_SIZE", DEFAULT_PAGE_SIZE)
 
-    for fa in favorite_articles:
-        fa_content = ArticleContent.objects.filter(article=fa).last()
-        fa.image_url = re.findall(img_url_reg, str(fa_content.body))
-        if not fa.image_url:
-            fa.image_url = "static/images/noimage.png"
-        else:
-            fa.image_url = fa.image_url[0]
+    # Cada lista se pagina por cursor con su propio parámetro en la query string
+    favorite_articles = paginate_keyset(
+        visible_articles.filter(category_id__in=favorite_categories_ids),
+        order_by,
+        cursor=request.GET.get("favorite_cursor"),
+        page_size=page_size,
+    )
 
-    for fa in favorite_articles:
-        print(fa.image_url)
+    if filter_active:
+        all_articles = paginate_keyset(
+            visible_articles,
+            order_by,
+            cursor=request.GET.get("cursor"),
+            page_size=page_size,
+        )
+        normal_articles = KeysetPage([])
+    else:
+        all_articles = KeysetPage([])
+        normal_articles = paginate_keyset(
+            visible_articles.filter(category_id__in=normal_categories_ids),
+            order_by,
+            cursor=request.GET.get("cursor"),
+            page_size=page_size,
+        )
 
-    # Crear una lista con todos los articulos
-    all_articles = favorite_articles.union(normal_articles)
-    #all_articles = all_articles.order_by(order_by)
+    for article in all_articles:
+        headline = getattr(article, "search_headline", None)
+        article.search_snippet = render_headline(headline) if headline else None
 
-    for fa in all_articles:
-        fa_content = ArticleContent.objects.filter(article=fa).last()
-        fa.image_url = re.findall(img_url_reg, str(fa_content.body))
-        if not fa.image_url:
-            fa.image_url = "static/images/noimage.png"
-        else:
-            fa.image_url = fa.image_url[0]
+    next_page_query = None
+    if all_articles.has_next or normal_articles.has_next:
+        query = request.GET.copy()
+        query["cursor"] = all_articles.next_cursor or normal_articles.next_cursor
+        query.pop("favorite_cursor", None)
+        next_page_query = query.urlencode()
 
-    for fa in all_articles:
-        print(fa.image_url)
+    next_favorite_page_query = None
+    if favorite_articles.has_next:
+        query = request.GET.copy()
+        query["favorite_cursor"] = favorite_articles.next_cursor
+        query.pop("cursor", None)
+        next_favorite_page_query = query.urlencode()
 
     return render(
         request,
@@ -327,10 +291,32 @@ def home(request):
             "normal_categories": normal_categories_ids,
             "favorite_categories": favorite_categories_ids,
             "filter_active": filter_active,
+            "next_page_query": next_page_query,
+            "next_favorite_page_query": next_favorite_page_query,
         },
     )
 
-    
+
+def article_autocomplete(request):
+    """
+    Vista que sugiere etiquetas y títulos de artículos a partir de un prefijo.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP, con el prefijo en el parámetro
+            `q` y opcionalmente la cantidad de sugerencias en `limit`.
+
+    Returns:
+        JsonResponse: Las sugerencias bajo las claves "tags" y "titles".
+    """
+
+    try:
+        limit = int(request.GET.get("limit", AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+
+    limit = max(1, min(limit, AUTOCOMPLETE_LIMIT))
+
+    return JsonResponse(autocomplete(request.GET.get("q", ""), limit))
 
 
 def forbidden(request):
@@ -414,7 +400,7 @@ def article_update(request, pk):
     ) and not request.user.tiene_permisos([PermissionEnum.EDITAR_ARTICULOS_BORRADOR]):
         return redirect("forbidden")
 
-    article = get_object_or_404(Article, pk=pk)
+    article = get_object_or_404(Article.objects.select_related("current_content"), pk=pk)
 
     if request.method == "POST":
         form = ArticleForm(request.POST, instance=article)
@@ -431,7 +417,7 @@ def article_update(request, pk):
     else:
         form = ArticleForm(instance=article)
 
-        last_content = ArticleContent.objects.filter(article=article).last()
+        last_content = article.current_content
         if last_content:
             form.initial["body"] = last_content.body
 
@@ -492,7 +478,7 @@ def article_update_history(request, pk):
             "id": article_content.id,
             "autor": article_content.autor,
             "created_at": article_content.created_at,
-            "body": mistune.html(article_content.body),
+            "body": article_content.get_rendered_body(),
         }
         for article_content in article_contents_ref
     ]
@@ -546,6 +532,20 @@ def article_list(request):
     )
 
 
+def count_article_view(request, pk):
+    """
+    Cuenta una visualización de un artículo publicado cuya página se sirvió
+    desde la caché.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        pk (int): El ID del artículo.
+    """
+
+    increment_views(pk, published_only=True)
+
+
+@cache_anonymous_page(on_hit=count_article_view)
 def article_detail(request, pk):
     """
     Vista que muestra los detalles de un artículo.
@@ -563,45 +563,39 @@ def article_detail(request, pk):
     """
 
     # Fetch the article and its content
-    article = get_object_or_404(Article, pk=pk)
-    article_content = ArticleContent.objects.filter(article=article).last()
+    article = get_object_or_404(
+        Article.objects.select_related("current_content", "category"), pk=pk
+    )
+    article_content = article.current_content
 
     to_publish_date = ArticlesToPublish.objects.filter(article=article).first()
 
     if not article_content:
         return HttpResponse("No content for this article", status=404)
 
-    # Check if the article's category is "free"
-    is_free = article.category.type == CategoryType.FREE.value
+    # Check if the user can access the article's category ("free" for guests)
+    can_access = can_access_category(request.user, article.category)
     authenticated = request.user.is_authenticated
     shares_number = request.GET.get("shared", "false") == "true"
 
     # Handle unauthenticated users (unknown users)
     if not authenticated:
-        if is_free:
+        if can_access:
             # Unknown user can only view the article without interactions
             if article.state == ArticleStates.PUBLISHED.value:
+                increment_views(article.pk)
                 article.views_number += 1
-                article.save()
-
-            # Calculate the average rating for the article
-            ratings = ArticleVote.objects.filter(article=article)
-            avg_rating = ratings.aggregate(Avg("rating"))["rating__avg"]
-
-            # Check if the average rating is None before rounding
-            if avg_rating is not None:
-                avg_rating = round(avg_rating, 1)
 
-            # Convert article content body using mistune
-            article_render_content = mistune.html(article_content.body)
+            # Rendered HTML is stored per revision
+            article_render_content = article_content.get_rendered_body()
 
-            return render(
+            response = render(
                 request,
                 "article/article_detail.html",
                 {
                     "article": article,
                     "article_render_content": article_render_content,
-                    "avg_rating": avg_rating,
+                    "avg_rating": article.avg_rating,
                     "to_publish_date": None,
                     # Unauthenticated users cannot edit, like, dislike, or publish
                     "can_edit_as_editor": False,
@@ -614,6 +608,12 @@ def article_detail(request, pk):
                     "authenticated": authenticated,
                 },
             )
+
+            # Solo se guardan en caché las páginas de artículos publicados
+            if article.state != ArticleStates.PUBLISHED.value:
+                skip_page_cache(response)
+
+            return response
         else:
             # If the article is not free, redirect to login
             return redirect("login")
@@ -626,13 +626,13 @@ def article_detail(request, pk):
 
         # Increment view count
         if article.state == ArticleStates.PUBLISHED.value:
+            increment_views(article.pk)
             article.views_number += 1
-            article.save()
 
         # Increment shared count
         if shares_number:
+            increment_shares(article.pk)
             article.shares_number += 1
-            article.save()
 
         # Fetch the user's vote and rating for the article
         user_vote = ArticleVote.objects.filter(
@@ -645,11 +645,15 @@ def article_detail(request, pk):
                 if "rating" in request.POST:
                     # Rating submission logic
                     rating_value = int(request.POST.get("rating"))
+                    if rating_value not in dict(ArticleVote.RATING_CHOICES):
+                        return HttpResponse("Invalid rating", status=400)
+
                     if user_vote:
+                        user_vote.article = article
                         user_vote.rating = rating_value
                         user_vote.save()
                     else:
-                        ArticleVote.objects.create(
+                        user_vote = ArticleVote.objects.create(
                             user=request.user, article=article, rating=rating_value
                         )
 
@@ -685,18 +689,10 @@ def article_detail(request, pk):
                             )
                             article.dislikes_number += 1
 
-                    article.save()
-
-        # Calculate the average rating for the article
-        ratings = ArticleVote.objects.filter(article=article)
-        avg_rating = ratings.aggregate(Avg("rating"))["rating__avg"]
-
-        # Check if the average rating is None before rounding
-        if avg_rating is not None:
-            avg_rating = round(avg_rating, 1)
+                    article.save(update_fields=["likes_number", "dislikes_number"])
 
         # Check if the user is an admin
-        is_admin = request.user.roles.filter(name="Administrador").exists()
+        is_admin = request.user.is_admin
 
         # Check if the user is the author of the article
         is_author = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
@@ -725,8 +721,8 @@ def article_detail(request, pk):
         # Check if the category requires moderation
         is_moderated_category = article.category.is_moderated
 
-        # Convert article content body using mistune
-        article_render_content = mistune.html(article_content.body)
+        # Rendered HTML is stored per revision
+        article_render_content = article_content.get_rendered_body()
 
         favorite_categories = FavoriteCategory.objects.filter(
             user=request.user
@@ -745,7 +741,7 @@ def article_detail(request, pk):
                 "can_publish": can_publish,
                 "can_inactivate": can_inactivate,
                 "is_moderated_category": is_moderated_category,
-                "avg_rating": avg_rating,
+                "avg_rating": article.avg_rating,
                 "user_vote": user_vote,  # Pass both vote and rating information to the template
                 "shares_number": article.shares_number,
                 "authenticated": authenticated,
@@ -756,35 +752,41 @@ def article_detail(request, pk):
         )
 
 
-@login_required
-def article_to_revision(request, pk):
+def change_article_state(request, pk, new_state):
     """
-    Vista que cambia el estado de un artículo a Revisión.
-
+    Cambia el estado de un artículo si la tabla de transiciones lo permite.
 
     Args:
         request (HttpRequest): La solicitud HTTP.
         pk (int): El ID del artículo.
-    """
+        new_state (str): El nuevo estado del artículo.
 
-    article = get_object_or_404(Article, pk=pk)
+    Returns:
+        HttpResponse: Redirección al detalle del artículo, o prohibido.
+    """
 
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    is_autor = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
-    # is_editor = request.user.tiene_permisos([PermissionEnum.EDITAR_ARTICULOS])
-    # is_publisher = request.user.tiene_permisos([PermissionEnum.MODERAR_ARTICULOS])
+    article = get_object_or_404(Article.objects.select_related("category"), pk=pk)
 
-    # Solo el autor (cuando el estado es DRAFT) o el admin puede cambiar a REVISIÓN
-    if (
-        is_admin or (is_autor and article.state == ArticleStates.DRAFT.value)
-        # or ((is_editor or is_publisher) and article.state == ArticleStates.EDITED.value)
-    ):
-        article.change_state(ArticleStates.REVISION.value)
+    if can_transition(user_roles(request.user), article, new_state):
+        article.change_state(new_state)
         return redirect("article-detail", pk=pk)
 
     return HttpResponseForbidden("No puedes editar este contenido")
 
 
+@login_required
+def article_to_revision(request, pk):
+    """
+    Vista que cambia el estado de un artículo a Revisión.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        pk (int): El ID del artículo.
+    """
+
+    return change_article_state(request, pk, ArticleStates.REVISION.value)
+
+
 @login_required
 def article_to_published(request, pk):
     """
@@ -794,26 +796,8 @@ def article_to_published(request, pk):
         request (HttpRequest): La solicitud HTTP.
         pk (int): El ID del artículo.
     """
-    article = get_object_or_404(Article, pk=pk)
-
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    can_publish = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.MODERAR_ARTICULOS]
-    )
-    is_moderated = article.category.is_moderated
-    is_author = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
-
-    # Solo el publicador o el admin puede cambiar a PUBLICADO
-    if is_moderated:
-        if can_publish and article.state == ArticleStates.EDITED.value:
-            article.change_state(ArticleStates.PUBLISHED.value)
-            return redirect("article-detail", pk=pk)
-    else:
-        if is_author or is_admin or can_publish:
-            article.change_state(ArticleStates.PUBLISHED.value)
-            return redirect("article-detail", pk=pk)
 
-    return HttpResponseForbidden("No puedes editar este contenido")
+    return change_article_state(request, pk, ArticleStates.PUBLISHED.value)
 
 
 @login_required
@@ -831,30 +815,14 @@ def article_to_publish_schedule(request, pk):
 
     to_publish_date = request.POST.get("to_publish_date")
 
-    article = get_object_or_404(Article, pk=pk)
+    article = get_object_or_404(Article.objects.select_related("category"), pk=pk)
 
     ArticlesToPublish.objects.filter(article=article).delete()
 
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    can_publish = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.MODERAR_ARTICULOS]
-    )
-    is_moderated = article.category.is_moderated
-    is_author = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
-
-    # Solo el publicador o el admin puede cambiar a PUBLICADO
-    if is_moderated:
-        if can_publish and article.state == ArticleStates.EDITED.value:
-            ArticlesToPublish.objects.create(
-                article=article, to_publish_at=to_publish_date
-            )
-            return redirect("article-detail", pk=pk)
-    else:
-        if is_author or is_admin or can_publish:
-            ArticlesToPublish.objects.create(
-                article=article, to_publish_at=to_publish_date
-            )
-            return redirect("article-detail", pk=pk)
+    # Se programa con los mismos permisos que la publicación inmediata
+    if can_transition(user_roles(request.user), article, ArticleStates.PUBLISHED.value):
+        ArticlesToPublish.objects.create(article=article, to_publish_at=to_publish_date)
+        return redirect("article-detail", pk=pk)
 
     return HttpResponseForbidden("No puedes editar este contenido")
 
@@ -868,19 +836,8 @@ def article_to_edited(request, pk):
         request (HttpRequest): La solicitud HTTP.
         pk (int): El ID del artículo.
     """
-    article = get_object_or_404(Article, pk=pk)
 
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    is_editor = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.EDITAR_ARTICULOS]
-    )
-
-    # Solo el editor o el admin pueden cambiar a EDITADO y el estado actual debe ser REVISIÓN
-    if is_editor and article.state == ArticleStates.REVISION.value:
-        article.change_state(ArticleStates.EDITED.value)
-        return redirect("article-detail", pk=pk)
-
-    return HttpResponseForbidden("No puedes editar este contenido")
+    return change_article_state(request, pk, ArticleStates.EDITED.value)
 
 
 @login_required
@@ -892,19 +849,8 @@ def article_to_draft(request, pk):
         request (HttpRequest): La solicitud HTTP.
         pk (int): El ID del artículo.
     """
-    article = get_object_or_404(Article, pk=pk)
-
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    is_editor = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.EDITAR_ARTICULOS]
-    )
-
-    # Solo el autor (cuando el estado es REVISION) o el admin puede cambiar a DRAFT
-    if is_admin or (is_editor and article.state == ArticleStates.REVISION.value):
-        article.change_state(ArticleStates.DRAFT.value)
-        return redirect("article-detail", pk=pk)
 
-    return HttpResponseForbidden("No puedes editar este contenido")
+    return change_article_state(request, pk, ArticleStates.DRAFT.value)
 
 
 @login_required
@@ -916,17 +862,53 @@ def article_to_inactive(request, pk):
         request (HttpRequest): La solicitud HTTP.
         pk (int): El ID del artículo.
     """
-    article = get_object_or_404(Article, pk=pk)
 
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-    is_autor = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
+    return change_article_state(request, pk, ArticleStates.INACTIVE.value)
 
-    # Solo el autor o el admin puede cambiar a INACTIVO
-    if is_admin or is_autor:
-        article.change_state(ArticleStates.INACTIVE.value)
-        return redirect("article-detail", pk=pk)
 
-    return HttpResponseForbidden("No puedes editar este contenido")
+@login_required
+def article_transition(request):
+    """
+    Vista que cambia el estado de uno o varios artículos.
+
+    Recibe un JSON con los IDs de los artículos (`ids`) y el nuevo estado
+    (`state`). Los cambios permitidos por la tabla de transiciones se aplican
+    en una sola actualización y el resto se informa en la respuesta.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+
+    Returns:
+        JsonResponse: El estado y los IDs `updated`, `unchanged`, `forbidden`
+            y `not_found`. Si no se pudo cambiar ningún artículo el código es
+            403, o 404 si no existe ninguno.
+    """
+
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        data = json.loads(request.body)
+        new_state = ArticleStates(data["state"]).value
+        if not isinstance(data["ids"], list):
+            raise TypeError
+        article_ids = [int(article_id) for article_id in data["ids"]]
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest("Solicitud inválida")
+
+    if not article_ids or len(article_ids) > MAX_BULK_TRANSITION:
+        return HttpResponseBadRequest(
+            f"Se deben indicar entre 1 y {MAX_BULK_TRANSITION} artículos"
+        )
+
+    result = transition_articles(request.user, article_ids, new_state)
+
+    status = 200
+    if not result["updated"] and not result["unchanged"]:
+        status = 403 if result["forbidden"] else 404
+
+    return JsonResponse({"state": new_state, **result}, status=status)
+
 
 def manage_featured_articles(request):
     """
@@ -965,7 +947,7 @@ def manage_featured_articles(request):
                 article.is_featured = True
             elif action == "remove":
                 article.is_featured = False
-            article.save()
+            article.save(update_fields=["is_featured"])
 
     # Separar los artículos destacados de los no destacados
     featured_articles = articles.filter(is_featured=True)
@@ -981,7 +963,6 @@ def manage_featured_articles(request):
     )
 
 
-
 # =============================================================================
 # Category views
 # =============================================================================
@@ -1020,31 +1001,7 @@ def category_list(request):
         user=request.user
     ).values_list("category_id", flat=True)
 
-    user_payments = Payment.objects.filter(user=request.user)
-
-    payment_status_by_category = defaultdict(lambda: None)
-    for payment in user_payments:
-        payment_status_by_category[payment.category_id] = payment.status
-
-
-    permited_categories = [
-        category
-        for category in categories
-        if category.type
-        in (CategoryType.FREE.value, CategoryType.SUSCRIPTION.value)
-        or Payment.objects.filter(
-            category=category, user=request.user, status="completed"
-        ).exists()
-    ]
-
-    not_permited_categories = [
-            category
-            for category in categories
-            if category.type == CategoryType.PAY.value
-            and not Payment.objects.filter(
-                category=category, user=request.user, status="completed"
-            ).exists()
-        ]
+    permited_categories, not_permited_categories = split_categories(request.user)
 
     if form.is_valid():
         search_term = form.cleaned_data.get("search_term")
@@ -1303,7 +1260,7 @@ def like_article(request, pk):
         # If this is the first time the user liked the article
         article.likes_number += 1
 
-    article.save()
+    article.save(update_fields=["likes_number", "dislikes_number"])
     return redirect("article-detail", pk=pk)
 
 
@@ -1342,7 +1299,7 @@ def dislike_article(request, pk):
         # If this is the first time the user disliked the article
         article.dislikes_number += 1
 
-    article.save()
+    article.save(update_fields=["likes_number", "dislikes_number"])
     return redirect("article-detail", pk=pk)
 
 
@@ -1364,9 +1321,7 @@ def stripe_checkout(request, pk):
     """
     try:
         # Verifica si existe un pago completado
-        payment_exists = Payment.objects.filter(
-            user=request.user, category=pk, status="completed"
-        ).exists()
+        payment_exists = has_purchased_category(request.user, pk)
 
         if payment_exists:
             print("Pago ya existe, redirigiendo a exists.html")  # Verificar condición
@@ -1436,21 +1391,18 @@ def checkout_page(request, pk):
     Returns:
         HttpResponse: Renderiza la plantilla 'article/checkout.html' o 'article/exists.html'.
     """
-    try:
-        Payment.objects.filter(
-            user=request.user, category=pk, status="completed"
-        ).latest("date_paid")
+    if has_purchased_category(request.user, pk):
         # Si se encuentra el pago y tiene estado "completed", ir a exists
         return render(request, "article/exists.html")
-    except ObjectDoesNotExist:
-        return render(
-            request,
-            "article/checkout.html",
-            {
-                "STRIPE_PUBLISHABLE_KEY": settings.STRIPE_PUBLIC_KEY,
-                "category_id": pk,  # Pasar el ID de la categoría
-            },
-        )
+
+    return render(
+        request,
+        "article/checkout.html",
+        {
+            "STRIPE_PUBLISHABLE_KEY": settings.STRIPE_PUBLIC_KEY,
+            "category_id": pk,  # Pasar el ID de la categoría
+        },
+    )
 
 
 def payment_success(request, pk):
@@ -1479,9 +1431,8 @@ def payment_success(request, pk):
         intent = stripe.checkout.Session.retrieve(payment.stripe_payment_id)
 
         if intent.status == "complete":
-            # Actualizar el estado del pago en la base de datos
-            payment.status = "completed"
-            payment.save()
+            # Actualizar el estado del pago y el acumulado diario de ventas
+            complete_payment(payment)
 
             # Send confirmation email to the purchaser
             subject = f"Confirmacion de compra por la categoria: {category.name}"
@@ -1577,77 +1528,26 @@ def sold_categories(request):
     category_name = request.GET.get("category_name", "")
     username = request.GET.get("username", "")
 
-    # Set the filter for the date range
-    filter_kwargs = {}
-    if date_range == "24h":
-        filter_kwargs["date_paid__gte"] = timezone.now() - timedelta(hours=24)
-    elif date_range == "7d":
-        filter_kwargs["date_paid__gte"] = timezone.now() - timedelta(days=7)
-    elif date_range == "30d":
-        filter_kwargs["date_paid__gte"] = timezone.now() - timedelta(days=30)
-    elif date_range == "365d":
-        filter_kwargs["date_paid__gte"] = timezone.now() - timedelta(days=365)
-
-    if start_date_str and end_date_str:
-        try:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            # Set end_date to include the end of the day (23:59:59)
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d") + timedelta(
-                hours=23, minutes=59, seconds=59
-            )
-            filter_kwargs["date_paid__range"] = (start_date, end_date)
-        except ValueError:
-            # Handle invalid date format
-            return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+    # Set the date range; since is inclusive and until is exclusive
+    try:
+        since, until = parse_sales_range(date_range, start_date_str, end_date_str)
+    except ValueError:
+        # Handle invalid date format
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
 
-    # Filter payments based on the selected date range and status 'completed'
-    payments = Payment.objects.filter(status="completed", **filter_kwargs)
+    # Filter payments based on the selected filters and status 'completed'
+    payments = filter_payments(since, until, category_name, username)
 
-    if category_name:
-        payments = payments.filter(
-            category__name__iexact=category_name
-        )
-    if username:
-        payments = payments.filter(
-            user__username__iexact=username
-        )
-
-    # Group by category name and count the number of payments associated with each category
-    categories_sales = (
-        payments.values("category__name")
-        .annotate(
-            total_sales=Count("category"), total_earnings=Sum("price")
+    if username or view_type == "list":
+        # El detalle por comprador necesita los pagos individuales
+        report = build_sales_report(payments)
+    else:
+        # Los gráficos leen el acumulado diario y solo calculan hoy sobre los pagos
+        report = build_sales_report(
+            payments,
+            rows=sales_rows(category_name, since, until),
+            include_purchases=False,
         )
-        .order_by("-total_sales")
-    )
-
-    # Extract category names and corresponding sales for the graph
-    categories = [item["category__name"] for item in categories_sales]
-    sales = [item["total_sales"] for item in categories_sales]
-    earnings = [item["total_earnings"] for item in categories_sales]
-
-    # New variables to track earnings by date for the bar chart
-    date_sales = (
-        payments.values("date_paid__date")
-        .annotate(total_earnings=Sum("price"))
-        .order_by("date_paid__date")
-    )
-
-    # Extract dates and total earnings for new chart
-    dates = [item["date_paid__date"] for item in date_sales]
-    dates = [item.strftime("%Y-%m-%d") for item in dates]
-    total_earnings_by_date = [item["total_earnings"] for item in date_sales]
-
-    # Get the list of users who bought each category
-    buyers_per_category = {
-        category["category__name"]: [
-            f"{purchase['user__username']} - Costo: ${purchase['price']:.2f} (Fecha: {purchase['date_paid'].strftime('%Y-%m-%d')} Hora: {purchase['date_paid'].strftime('%H:%M:%S')})"
-            for purchase in payments.filter(
-                category__name=category["category__name"]
-            ).values("user__username", "price", "date_paid")
-        ]
-        for category in categories_sales
-    }
 
     all_categories = Category.objects.filter(payment__status="completed").distinct()
     all_users = CustomUser.objects.filter(payment__status="completed").distinct()
@@ -1658,65 +1558,29 @@ def sold_categories(request):
         else "article/sold_categories.html"
     )
 
-    # Cálculo del total general de ganancias
-    total_general = sum(item["total_earnings"] for item in categories_sales)
-
-    category_data = zip(
-        [item["category__name"] for item in categories_sales],
-        [item["total_sales"] for item in categories_sales],
-        [item["total_earnings"] for item in categories_sales],
-        [
-            [
-                f"{purchase['user__username']} - Costo: ${purchase['price']:.2f} (Fecha: {purchase['date_paid'].strftime('%Y-%m-%d')} Hora: {purchase['date_paid'].strftime('%H:%M:%S')})"
-                for purchase in payments.filter(
-                    category__name=item["category__name"]
-                ).values("user__username", "price", "date_paid")
-            ]
-            for item in categories_sales
-        ],
-        ["Tarjeta de crédito"] * len(categories_sales)  # New column value
-    )
-    
-    category_sales_by_date = {}
-    for category in categories:
-        category_sales_by_date[category] = [
-            payments.filter(category__name=category, date_paid__date=date).aggregate(Sum('price'))['price__sum'] or 0
-            for date in dates
-        ]
-        
-    detailed_category_data = [
-    {
-        "category": item["category__name"],
-        "buyer": purchase['user__username'],  # Comprador
-        "cost": purchase['price'],            # Costo
-        "datetime": purchase['date_paid'].strftime('%Y-%m-%d %H:%M:%S'),  # Formatted date and time
-        "medio_pago": "Tarjeta de crédito"    # Existing column for payment method
-    }
-    for item in categories_sales
-    for purchase in payments.filter(category__name=item["category__name"]).values("user__username", "price", "date_paid")
-]
-
     return render(
         request,
         template_name,
         {
-            "categories": categories,
-            "sales": sales,
-            "earnings": earnings,
-            "dates_json": json.dumps(dates),  # Serialize dates to JSON format
-            "total_earnings_by_date_json": json.dumps(total_earnings_by_date),  # Serialize earnings data
-            "buyers_per_category": buyers_per_category,
-            "category_data": category_data,
+            "categories": report["categories"],
+            "sales": report["sales"],
+            "earnings": report["earnings"],
+            "dates_json": json.dumps(report["dates"]),  # Serialize dates to JSON format
+            "total_earnings_by_date_json": json.dumps(
+                report["total_earnings_by_date"]
+            ),  # Serialize earnings data
+            "buyers_per_category": report["buyers_per_category"],
+            "category_data": report["category_data"],
             "date_range": date_range,
             "start_date": start_date_str,
             "end_date": end_date_str,
-            "total_general": total_general,
+            "total_general": report["total_general"],
             "category_name": category_name,
             "username": username,
             "all_categories": all_categories,
             "all_users": all_users,
-            "category_sales_by_date_json": json.dumps(category_sales_by_date),
-            "detailed_category_data": detailed_category_data,  # New variable with additional details
+            "category_sales_by_date_json": json.dumps(report["category_sales_by_date"]),
+            "detailed_category_data": report["detailed_category_data"],
         },
     )
 
@@ -1801,59 +1665,51 @@ def sold_categories_suscriptor(request):
     )
 
 
-@csrf_exempt
 @login_required
 def download_sold_categories(request):
     """
-    View to download an Excel file containing detailed sales information.
-    Processes the data from the frontend and generates a file with the formatted details.
+    Vista que descarga un archivo Excel con el detalle de las ventas.
+
+    Aplica los mismos filtros que el reporte de categorías vendidas y genera
+    el archivo en el servidor, escribiéndolo en un archivo temporal que se
+    envía por partes.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+
+    Returns:
+        FileResponse: El archivo Excel para descarga.
     """
-    if request.method == "POST":
-        data = json.loads(request.body).get("category_data", [])
-
-        # Create an Excel workbook and worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Ventas por Categoría"
-
-        # Write headers
-        headers = ["Categoría", "Comprador", "Costo", "Fecha y Hora", "Medio de Pago"]
-        ws.append(headers)
-
-        # Variable to accumulate total earnings
-        total_earnings = 0
-
-        # Add rows based on the detailed_category_data sent from the frontend
-        for item in data:
-            total_earnings += item['costo']  # Accumulate cost for total earnings
-            ws.append([
-                item["categoria"],
-                item["comprador"],
-                f"${item['costo']:.2f}",
-                item["fechaHora"],  # Already formatted as 'YYYY-MM-DD HH:MM:SS'
-                item["medioPago"]
-            ])
-
-        # Add a blank row for separation
-        ws.append([])
-
-        # Write total earnings at the end of the sheet
-        ws.append(["Total de Ganancias", "", f"${total_earnings:.2f}"])
-
-        # Adjust column widths for better readability
-        for col in ws.columns:
-            max_length = max(len(str(cell.value)) for cell in col)
-            ws.column_dimensions[get_column_letter(col[0].column)].width = max_length
-
-        # Create the response for the Excel file download
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    if not request.user.tiene_permisos([PermissionEnum.VER_CATEGORIAS_PAGO]):
+        return redirect("forbidden")
+
+    try:
+        since, until = parse_sales_range(
+            request.GET.get("date_range", "all"),
+            request.GET.get("start_date"),
+            request.GET.get("end_date"),
         )
-        response["Content-Disposition"] = 'attachment; filename="categorias_vendidas.xlsx"'
-        wb.save(response)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+
+    payments = filter_payments(
+        since,
+        until,
+        request.GET.get("category_name", ""),
+        request.GET.get("username", ""),
+    )
+
+    # FileResponse cierra (y elimina) el archivo temporal al terminar el envío
+    file = tempfile.TemporaryFile()
+    write_sales_xlsx(payments, file)
+    file.seek(0)
 
-        return response
-    return JsonResponse({"error": "Invalid request"}, status=400)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename="categorias_vendidas.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
 
 @login_required
@@ -1871,64 +1727,42 @@ def download_sold_categories_suscriptor(request):
         return redirect("forbidden")
 
     # Obtener filtros de la solicitud
-    start_date_str = request.GET.get("start_date", None)
-    end_date_str = request.GET.get("end_date", None)
-
-    # Construir los filtros de usuarios y fechas para la lista de compradores filtrados
-    filter_kwargs = {"status": "completed", "user": request.user}
-    if start_date_str and end_date_str:
-        try:
-            start_date = datetime.strptime(start_date_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_date_str, "%Y-%m-%d")
-            filter_kwargs["date_paid__range"] = (start_date, end_date)
-        except ValueError:
-            return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
-
-    payments = Payment.objects.filter(**filter_kwargs).order_by("date_paid")
-
-    # using mayment make a query to get the price and the category
-    payments_prices = [payment.price for payment in payments]
-
-    total_general = sum(payments_prices)
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-
-    ws.title = "Compras por categoría"
-
-    headers = ["Categoría", "Medio de pago", "Precio", "Compradores (Fecha y Hora)"]
-    ws.append(headers)
-
-    for payment in payments:
-        ws.append(
-            [
-                payment.category.name,
-                "Tarjeta",
-                f"${payment.price:.2f}",
-                f"{payment.date_paid.strftime('%Y-%m-%d %H:%M:%S')}",
-            ]
+    try:
+        since, until = parse_sales_range(
+            "all", request.GET.get("start_date"), request.GET.get("end_date")
         )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
 
-    ws.append([])
-    ws.append(["Total gastado", f"${total_general:.2f}"])
-
-    # Ajustar ancho de columnas para mejor legibilidad
-    for col in ws.columns:
-        max_length = max(len(str(cell.value)) for cell in col)
-        ws.column_dimensions[get_column_letter(col[0].column)].width = max_length
+    payments = filter_purchases(request.user, since, until)
 
     # Crear la respuesta como archivo Excel
     response = HttpResponse(
         content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
     response["Content-Disposition"] = 'attachment; filename="categorias_compradas.xlsx"'
-    wb.save(response)
+    write_purchases_xlsx(payments, response)
 
     return response
 
-def article_stats(request):
+
+def article_stats_queryset(request):
+    """
+    Obtiene los artículos publicados que cumplen los filtros de las estadísticas.
+
+    Los usuarios que no son administradores solo ven sus propios artículos.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP con los filtros `start_date`,
+            `end_date`, `author` y `category`.
+
+    Returns:
+        QuerySet: Los artículos filtrados.
+
+    Raises:
+        ValueError: Si alguna de las fechas no tiene el formato `YYYY-MM-DD`.
+    """
     current_user = request.user
-    is_admin = current_user.roles.filter(name="Administrador").exists()
     # Get filter parameters from the request
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
@@ -1937,12 +1771,10 @@ def article_stats(request):
 
     # Base query for published articles
     articles_query = Article.objects.filter(state=ArticleStates.PUBLISHED.value)
-    
-    if is_admin:  # Check if the user is an admin
-        articles_query = Article.objects.filter(state=ArticleStates.PUBLISHED.value)
-    else:
+
+    if not current_user.is_admin:
         # Non-admin users can only see their own articles
-        articles_query = Article.objects.filter(state=ArticleStates.PUBLISHED.value, autor_id=current_user.id)
+        articles_query = articles_query.filter(autor_id=current_user.id)
 
     # Apply date filter with full day range
     if start_date:
@@ -1960,10 +1792,25 @@ def article_stats(request):
     if category_id:
         articles_query = articles_query.filter(category_id=category_id)
 
+    return articles_query
+
+
+def article_stats(request):
+    is_admin = request.user.is_admin
+
+    try:
+        articles_query = article_stats_queryset(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+
     # Prepare data for charts (filter articles with likes, dislikes, etc.)
     articles_with_likes = articles_query.filter(likes_number__gt=0).order_by('-likes_number')
     articles_with_dislikes = articles_query.filter(dislikes_number__gt=0).order_by('-dislikes_number')
-    articles_with_ratings = articles_query.annotate(avg_rating=Avg('articlevote__rating')).filter(avg_rating__isnull=False).order_by('-avg_rating')
+    articles_with_ratings = articles_query.filter(rating_count__gt=0).annotate(
+        rating_average=ExpressionWrapper(
+            F("rating_sum") * 1.0 / F("rating_count"), output_field=FloatField()
+        )
+    ).order_by("-rating_average")
     articles_with_views = articles_query.filter(views_number__gt=0).order_by('-views_number')
     articles_with_shares = articles_query.filter(shares_number__gt=0).order_by('-shares_number')
 
@@ -2001,3 +1848,215 @@ def article_stats(request):
         "is_admin": is_admin,
     })
 
+
+@login_required
+def export_article_stats(request):
+    """
+    Vista que exporta las métricas de los artículos como CSV o NDJSON.
+
+    Acepta los mismos filtros que las estadísticas de artículos, además del
+    parámetro `format` (`csv` o `ndjson`).
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+
+    Returns:
+        StreamingHttpResponse: Las métricas de cada artículo.
+    """
+    try:
+        articles = article_stats_queryset(request)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+
+    columns = [
+        "id",
+        "title",
+        "author",
+        "category",
+        "published_at",
+        "views",
+        "likes",
+        "dislikes",
+        "shares",
+        "rating_count",
+        "rating_average",
+    ]
+    rows = (
+        articles.annotate(
+            rating_average=ExpressionWrapper(
+                F("rating_sum") * 1.0 / NullIf(F("rating_count"), 0),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("id")
+        .values_list(
+            "id",
+            "title",
+            "autor__username",
+            "category__name",
+            "published_at",
+            "views_number",
+            "likes_number",
+            "dislikes_number",
+            "shares_number",
+            "rating_count",
+            "rating_average",
+        )
+    )
+
+    return stream_export(request, rows, columns, "estadisticas_articulos")
+
+
+@login_required
+def export_payments(request):
+    """
+    Vista que exporta los pagos completados como CSV o NDJSON.
+
+    Acepta los mismos filtros que el reporte de categorías vendidas, además
+    del parámetro `format` (`csv` o `ndjson`).
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+
+    Returns:
+        StreamingHttpResponse: Los pagos filtrados.
+    """
+    if not request.user.tiene_permisos([PermissionEnum.VER_CATEGORIAS_PAGO]):
+        return redirect("forbidden")
+
+    try:
+        since, until = parse_sales_range(
+            request.GET.get("date_range", "all"),
+            request.GET.get("start_date"),
+            request.GET.get("end_date"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest("Invalid date format. Use YYYY-MM-DD.")
+
+    payments = filter_payments(
+        since,
+        until,
+        request.GET.get("category_name", ""),
+        request.GET.get("username", ""),
+    )
+
+    columns = ["id", "category", "buyer", "price", "date_paid", "status"]
+    rows = payments.order_by("id").values_list(
+        "id", "category__name", "user__username", "price", "date_paid", "status"
+    )
+
+    return stream_export(request, rows, columns, "pagos")
+
+
+def export_job_payload(job):
+    """
+    Describe el estado de una exportación para las respuestas JSON.
+
+    Args:
+        job (ExportJob): La exportación.
+
+    Returns:
+        dict: Estado, progreso y, si terminó, la URL de descarga.
+    """
+
+    payload = {
+        "id": job.pk,
+        "kind": job.kind,
+        "state": job.state,
+        "progress": job.progress,
+        "total": job.total,
+        "status_url": reverse("export-job-status", args=[job.pk]),
+        "download_url": None,
+    }
+
+    if job.state == ExportJobStates.DONE.value:
+        payload["download_url"] = reverse("export-job-download", args=[job.pk])
+    if job.state == ExportJobStates.FAILED.value:
+        payload["error"] = job.error
+
+    return payload
+
+
+@login_required
+def create_export_job(request):
+    """
+    Vista que solicita una exportación en segundo plano.
+
+    Recibe por POST el tipo de exportación (`kind`) y los mismos filtros del
+    reporte correspondiente, y responde de inmediato con el trabajo creado o
+    con el que ya estaba en curso para los mismos filtros.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+
+    Returns:
+        JsonResponse: El estado del trabajo, con código 202.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=405)
+
+    kind = request.POST.get("kind", "")
+    if kind not in EXPORT_KINDS:
+        return JsonResponse({"error": "Invalid export kind"}, status=400)
+
+    if not request.user.tiene_permisos([EXPORT_KINDS[kind]["permission"]]):
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    params = {
+        name: request.POST.get(name, "")
+        for name in EXPORT_KINDS[kind]["params"]
+        if request.POST.get(name)
+    }
+
+    try:
+        parse_sales_range(
+            params.get("date_range", "all"),
+            params.get("start_date"),
+            params.get("end_date"),
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+    job, _ = request_export_job(request.user, kind, params)
+
+    return JsonResponse(export_job_payload(job), status=202)
+
+
+@login_required
+def export_job_status(request, pk):
+    """
+    Vista que informa el estado y el progreso de una exportación.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        pk (int): ID de la exportación.
+
+    Returns:
+        JsonResponse: El estado del trabajo.
+    """
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+
+    return JsonResponse(export_job_payload(job))
+
+
+@login_required
+def download_export_job(request, pk):
+    """
+    Vista que descarga el archivo de una exportación terminada.
+
+    Args:
+        request (HttpRequest): La solicitud HTTP.
+        pk (int): ID de la exportación.
+
+    Returns:
+        FileResponse: El archivo generado.
+    """
+    job = get_object_or_404(
+        ExportJob, pk=pk, user=request.user, state=ExportJobStates.DONE.value
+    )
+
+    return FileResponse(
+        job.file.open("rb"),
+        as_attachment=True,
+        filename=EXPORT_KINDS[job.kind]["filename"],
+    )
@@ -1,5 +1,5 @@
 """
-ASGI config for cmd_py project.
+ASGI config for cms_py project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
@@ -11,6 +11,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cmd_py.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cms_py.settings")
 
 application = get_asgi_application()
+
+from article.counters import start_counter_flusher  # noqa: E402
+from article.events import start_event_listener  # noqa: E402
+
+start_counter_flusher()
+start_event_listener()
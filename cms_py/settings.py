@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Own apps
     "user",
     "article",
@@ -64,7 +65,6 @@ INSTALLED_APPS = [
     # Third party apps
     "mdeditor",
     "cloudinary",
-    "django_crontab",
     "taggit",
 ]
 
@@ -165,6 +165,13 @@ else:
 
 AUTH_USER_MODEL = "user.CustomUser"
 
+# Carga los roles y permisos junto con el usuario de la sesión. ModelBackend
+# sigue listado para que las sesiones iniciadas con él no se cierren
+AUTHENTICATION_BACKENDS = [
+    "user.backends.RolesBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -242,8 +249,65 @@ MDEDITOR_CONFIGS = {
     }
 }
 
-CRONJOBS = [
-    ("*/1 * * * *", "article.cron.publish_schedule_articles", ">> /tmp/cms_py.log")
-]
+# Caché
+# El alias "pages" guarda las páginas para usuarios anónimos. Su backend se
+# puede cambiar por variables de entorno, por ejemplo a
+# "django.core.cache.backends.filebased.FileBasedCache" con una carpeta, o a
+# "django.core.cache.backends.redis.RedisCache" con "redis://localhost:6379".
+# El alias "shared" guarda las versiones que invalidan las demás cachés, por
+# lo que debe ser compartido por todos los procesos (workers y run_scheduler):
+# por defecto es una tabla de la base de datos (`manage.py createcachetable`),
+# y se puede cambiar a Redis con las variables SHARED_CACHE_*.
+SHARED_CACHE_BACKEND = os.environ.get(
+    "SHARED_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"
+)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "pages": {
+        "BACKEND": os.environ.get(
+            "PAGE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("PAGE_CACHE_LOCATION", "pages"),
+    },
+    "shared": {
+        "BACKEND": SHARED_CACHE_BACKEND,
+        "LOCATION": os.environ.get("SHARED_CACHE_LOCATION", "cms_shared_cache"),
+    },
+}
+if SHARED_CACHE_BACKEND.endswith("DatabaseCache"):
+    CACHES["shared"]["OPTIONS"] = {"MAX_ENTRIES": 10000}
+PAGE_CACHE_ALIAS = "pages"
+SHARED_CACHE_ALIAS = "shared"
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 60 * 5))
+
+# Contadores de visualizaciones y compartidos (ver article/counters.py)
+ARTICLE_COUNTERS = {
+    "FLUSH_INTERVAL": int(os.environ.get("ARTICLE_COUNTERS_FLUSH_INTERVAL", 5)),
+    "MAX_PENDING": int(os.environ.get("ARTICLE_COUNTERS_MAX_PENDING", 500)),
+    "DRAIN_ON_SHUTDOWN": True,
+}
+
+# Segundos que se conservan los archivos de exportación (ver article/export_jobs.py)
+EXPORT_JOB_TTL = int(os.environ.get("EXPORT_JOB_TTL", 60 * 60 * 24))
+
+# Distribuidor de los eventos del kanban (ver article/events.py); el de
+# PostgreSQL alcanza a los clientes de todos los procesos y el local solo a los
+# conectados al mismo proceso
+ARTICLE_EVENTS_BACKEND = os.environ.get(
+    "ARTICLE_EVENTS_BACKEND", "article.events.PostgresEventBroker"
+)
+
+# Tareas periódicas de `manage.py run_scheduler` (ver article/scheduler.py)
+SCHEDULER = {
+    "PUBLISH_MIN_POLL": int(os.environ.get("SCHEDULER_PUBLISH_MIN_POLL", 1)),
+    "PUBLISH_MAX_POLL": int(os.environ.get("SCHEDULER_PUBLISH_MAX_POLL", 30)),
+    "OUTBOX_INTERVAL": int(os.environ.get("SCHEDULER_OUTBOX_INTERVAL", 5)),
+    "RATINGS_INTERVAL": int(os.environ.get("SCHEDULER_RATINGS_INTERVAL", 60 * 60)),
+    "SALES_ROLLUP_INTERVAL": int(
+        os.environ.get("SCHEDULER_SALES_ROLLUP_INTERVAL", 60 * 60 * 24)
+    ),
+}
 STRIPE_PUBLIC_KEY = "pk_test_51Q3IEOFWDLOQpTHGvvQ2a6Kpf2z9JdbMp5NpnMtBFtzUqTNRjLPVxWl1bbd2kvDRslXnEhtI2oCNOHCdktGdW6Zm00fnnxrBgX"
 STRIPE_SECRET_KEY = "sk_test_51Q3IEOFWDLOQpTHGSIl5aIIdgXNzbHsLLKwcOCWYW93Xi48zval6iIPDoWTGRRSm8o89MOHANtDUwn10FVMfGAGS008xqK2zw9"
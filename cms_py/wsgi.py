@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cms_py.settings")
 
 application = get_wsgi_application()
+
+from article.counters import start_counter_flusher  # noqa: E402
+
+start_counter_flusher()
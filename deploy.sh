@@ -25,11 +25,32 @@ pip install -r requirements.txt
 echo "-------------------------------------------------------"
 echo "Running database migrations..."
 python manage.py migrate
+python manage.py createcachetable
+
+echo "-------------------------------------------------------"
+echo "Removing django_crontab jobs (replaced by run_scheduler)..."
+(crontab -l 2>/dev/null | grep -v "django-cronjobs for cms_py" | crontab -) || true
 
 echo "-------------------------------------------------------"
 echo "Restarting Gunicorn..."
 sudo systemctl restart gunicorn
 
+echo "-------------------------------------------------------"
+echo "Restarting events server..."
+sudo systemctl restart cms-events
+
+echo "-------------------------------------------------------"
+echo "Restarting scheduler..."
+sudo systemctl restart cms-scheduler
+
+echo "-------------------------------------------------------"
+echo "Restarting export jobs..."
+sudo systemctl restart cms-export-jobs
+
+echo "-------------------------------------------------------"
+echo "Restarting outbox..."
+sudo systemctl restart cms-outbox
+
 echo "-------------------------------------------------------"
 echo "Restarting Nginx..."
 sudo systemctl restart nginx
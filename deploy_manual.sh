@@ -212,6 +212,10 @@ pip install -r requirements.txt
 
 echo "Running database migrations..."
 python manage.py migrate
+python manage.py createcachetable
+
+echo "Removing django_crontab jobs (replaced by run_scheduler)..."
+(crontab -l 2>/dev/null | grep -v "django-cronjobs for cms_py" | crontab -) || true
 
 # ?fin ============================================================================
 # ?================================================================================
@@ -244,6 +248,18 @@ server {
         alias /root/ls2-cms-py/static/;
     }
 
+    # Los tableros en vivo (Server-Sent Events) se atienden con ASGI; el
+    # resto del sitio sigue en WSGI
+    location /kanban/events/ {
+        include proxy_params;
+        proxy_pass http://unix:/root/ls2-cms-py/cms_py_events.sock;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
+        proxy_buffering off;
+        proxy_cache off;
+        proxy_read_timeout 1h;
+    }
+
     location / {
         include proxy_params;
         proxy_pass http://unix:/root/ls2-cms-py/cms_py.sock;
@@ -267,14 +283,101 @@ ExecStart=/root/ls2-cms-py/env/bin/gunicorn --workers 3 --bind unix:/root/ls2-cm
 WantedBy=multi-user.target
 EOF
 
+# Un único proceso ASGI para los eventos del kanban: los IDs de los eventos
+# son propios de cada proceso (ver article/events.py)
+cat > /etc/systemd/system/cms-events.service << 'EOF'
+[Unit]
+Description=uvicorn daemon for CMS Py kanban events
+After=network.target postgresql.service
+
+[Service]
+User=root
+Group=www-data
+UMask=007
+WorkingDirectory=/root/ls2-cms-py
+ExecStart=/root/ls2-cms-py/env/bin/uvicorn --uds /root/ls2-cms-py/cms_py_events.sock cms_py.asgi:application
+Restart=always
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/cms-scheduler.service << 'EOF'
+[Unit]
+Description=scheduler daemon for CMS Py
+After=network.target postgresql.service
+
+[Service]
+User=root
+Group=www-data
+WorkingDirectory=/root/ls2-cms-py
+ExecStart=/root/ls2-cms-py/env/bin/python manage.py run_scheduler
+Restart=always
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/cms-export-jobs.service << 'EOF'
+[Unit]
+Description=export jobs daemon for CMS Py
+After=network.target postgresql.service
+
+[Service]
+User=root
+Group=www-data
+WorkingDirectory=/root/ls2-cms-py
+ExecStart=/root/ls2-cms-py/env/bin/python manage.py run_export_jobs
+Restart=always
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+cat > /etc/systemd/system/cms-outbox.service << 'EOF'
+[Unit]
+Description=outbox email daemon for CMS Py
+After=network.target postgresql.service
+
+[Service]
+User=root
+Group=www-data
+WorkingDirectory=/root/ls2-cms-py
+ExecStart=/root/ls2-cms-py/env/bin/python manage.py drain_outbox --loop
+Restart=always
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
 sudo systemctl daemon-reload
 sudo systemctl start gunicorn
 sudo systemctl enable gunicorn
+sudo systemctl start cms-events
+sudo systemctl enable cms-events
+sudo systemctl start cms-scheduler
+sudo systemctl enable cms-scheduler
+sudo systemctl start cms-export-jobs
+sudo systemctl enable cms-export-jobs
+sudo systemctl start cms-outbox
+sudo systemctl enable cms-outbox
 
 # Restart services
 echo "Restarting Gunicorn..."
 sudo systemctl restart gunicorn
 
+echo "Restarting events server..."
+sudo systemctl restart cms-events
+
+echo "Restarting scheduler..."
+sudo systemctl restart cms-scheduler
+
+echo "Restarting export jobs..."
+sudo systemctl restart cms-export-jobs
+
+echo "Restarting outbox..."
+sudo systemctl restart cms-outbox
+
 echo "Restarting Nginx..."
 sudo systemctl restart nginx
 
@@ -0,0 +1,229 @@
+from django.db.models import Count
+
+from article.models import Article, ArticleStates
+from article.pagination import encode_cursor, paginate_keyset
+from article.transitions import user_roles
+
+
+# Tarjetas por columna en la carga inicial y en cada página siguiente
+KANBAN_PAGE_SIZE = 20
+
+# Columnas del tablero, en orden
+KANBAN_COLUMNS = [
+    {"slug": "draft", "state": ArticleStates.DRAFT.value, "title": "Borrador"},
+    {"slug": "revision", "state": ArticleStates.REVISION.value, "title": "Revisión"},
+    {"slug": "edited", "state": ArticleStates.EDITED.value, "title": "Editado"},
+    {
+        "slug": "published",
+        "state": ArticleStates.PUBLISHED.value,
+        "title": "Publicado",
+    },
+    {"slug": "inactive", "state": ArticleStates.INACTIVE.value, "title": "Inactivo"},
+]
+
+# Campos que usa cada tarjeta
+CARD_FIELDS = (
+    "id",
+    "title",
+    "state",
+    "autor__username",
+    "category__name",
+    "category__is_moderated",
+)
+
+
+def kanban_roles(user):
+    """
+    Obtiene los roles del usuario que determinan qué tarjetas puede mover.
+
+    Args:
+        user (User): El usuario autenticado.
+
+    Returns:
+        dict: `is_admin`, `is_editor`, `is_publisher` e `is_autor`.
+    """
+
+    roles = user_roles(user)
+
+    return {
+        "is_admin": "admin" in roles,
+        "is_editor": "editor" in roles,
+        "is_publisher": "publisher" in roles,
+        "is_autor": "autor" in roles,
+    }
+
+
+def column_can_drag(slug, roles):
+    """
+    Indica si el usuario puede mover las tarjetas de una columna de categorías
+    moderadas; las de categorías no moderadas se pueden mover siempre, salvo
+    en la columna de inactivos.
+
+    Args:
+        slug (str): Identificador de la columna.
+        roles (dict): Roles obtenidos con `kanban_roles`.
+
+    Returns:
+        bool | None: Si puede moverlas, o None si la columna no admite cambios.
+    """
+
+    return {
+        "draft": roles["is_autor"] or roles["is_admin"],
+        "revision": roles["is_editor"] or roles["is_admin"],
+        "edited": roles["is_admin"] or roles["is_publisher"] or roles["is_editor"],
+        "published": roles["is_admin"] or roles["is_autor"],
+    }.get(slug)
+
+
+def sees_only_own(roles):
+    """
+    Indica si el usuario solo ve sus propios artículos en el tablero, como
+    los autores sin otro rol.
+
+    Args:
+        roles (dict): Roles obtenidos con `kanban_roles`.
+
+    Returns:
+        bool: Si solo ve sus artículos.
+    """
+
+    return roles["is_autor"] and not (
+        roles["is_admin"] or roles["is_editor"] or roles["is_publisher"]
+    )
+
+
+def board_queryset(user, roles):
+    """
+    Obtiene los artículos visibles en el tablero con los datos de sus tarjetas.
+
+    Args:
+        user (User): El usuario autenticado.
+        roles (dict): Roles obtenidos con `kanban_roles`.
+
+    Returns:
+        QuerySet: Los artículos, con autor y categoría en la misma consulta.
+    """
+
+    articles = Article.objects.select_related("autor", "category").only(*CARD_FIELDS)
+
+    if sees_only_own(roles):
+        articles = articles.filter(autor=user)
+
+    return articles
+
+
+def mark_draggable(articles, can_drag):
+    """
+    Marca en cada artículo si su tarjeta se puede mover (`article.can_drag`).
+
+    Args:
+        articles (Iterable[Article]): Los artículos de una columna.
+        can_drag (bool | None): Resultado de `column_can_drag`.
+
+    Returns:
+        list[Article]: Los mismos artículos.
+    """
+
+    articles = list(articles)
+
+    for article in articles:
+        article.can_drag = can_drag is not None and (
+            can_drag or not article.category.is_moderated
+        )
+
+    return articles
+
+
+def build_board(user, page_size=KANBAN_PAGE_SIZE):
+    """
+    Construye las columnas del tablero con la primera página de cada una.
+
+    Las primeras tarjetas de todas las columnas se obtienen con una única
+    consulta (`UNION ALL` de un `LIMIT` por estado, resuelto cada uno con el
+    índice sobre `(state, -id)`), y la cantidad por columna con una
+    agregación, por lo que armar el tablero no depende de cuántas tarjetas
+    tenga cada columna.
+
+    Args:
+        user (User): El usuario autenticado.
+        page_size (int, optional): Tarjetas por columna.
+
+    Returns:
+        tuple: `(columns, roles)`, con una lista de diccionarios por columna.
+    """
+
+    roles = kanban_roles(user)
+    articles = board_queryset(user, roles)
+
+    counts = dict(
+        articles.order_by()
+        .values_list("state")
+        .annotate(count=Count("id"))
+        .values_list("state", "count")
+    )
+
+    first_pages = [
+        articles.filter(state=column["state"]).order_by("-id")[:page_size]
+        for column in KANBAN_COLUMNS
+    ]
+
+    cards = {column["state"]: [] for column in KANBAN_COLUMNS}
+    for article in first_pages[0].union(*first_pages[1:], all=True):
+        cards[article.state].append(article)
+
+    # UNION ALL no garantiza el orden de cada parte en el resultado
+    for column_cards in cards.values():
+        column_cards.sort(key=lambda article: article.id, reverse=True)
+
+    columns = []
+    for column in KANBAN_COLUMNS:
+        column_cards = cards[column["state"]]
+        count = counts.get(column["state"], 0)
+
+        next_cursor = None
+        if count > len(column_cards) and column_cards:
+            last = column_cards[-1]
+            next_cursor = encode_cursor(last.id, last.id)
+
+        columns.append(
+            {
+                **column,
+                "count": count,
+                "articles": mark_draggable(
+                    column_cards, column_can_drag(column["slug"], roles)
+                ),
+                "next_cursor": next_cursor,
+            }
+        )
+
+    return columns, roles
+
+
+def column_page(user, slug, cursor=None, page_size=KANBAN_PAGE_SIZE):
+    """
+    Obtiene la página siguiente de una columna del tablero.
+
+    Args:
+        user (User): El usuario autenticado.
+        slug (str): Identificador de la columna.
+        cursor (str, optional): Cursor devuelto por la página anterior.
+        page_size (int, optional): Tarjetas por página.
+
+    Returns:
+        KeysetPage | None: La página, o None si la columna no existe.
+    """
+
+    column = next((c for c in KANBAN_COLUMNS if c["slug"] == slug), None)
+    if column is None:
+        return None
+
+    roles = kanban_roles(user)
+    page = paginate_keyset(
+        board_queryset(user, roles).filter(state=column["state"]),
+        "-id",
+        cursor=cursor,
+        page_size=page_size,
+    )
+    mark_draggable(page.object_list, column_can_drag(slug, roles))
+
+    return page
@@ -5,7 +5,7 @@ from django.conf import settings
 # Create your tests here.
 
 
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from roles.models import Role
@@ -18,6 +18,13 @@ from article.models import (
     Article,
     ArticleStates,
 )
+from article.events import CLOSED, LocalEventBroker, PostgresEventBroker
+from kanban.board import build_board, column_page, kanban_roles
+import asyncio
+import threading
+import time
+import warnings
+from django.db import transaction
 
 User = get_user_model()
 
@@ -305,3 +312,346 @@ class ArticleLikeDislikeTest(TestCase):
 
     #     # Verifica que se redirige a la vista de detalle del artículo
     #     self.assertRedirects(response, reverse('article-detail', args=[self.article.pk]))
+
+
+class TableroKanbanTest(TestCase):
+    """
+    Casos de prueba para el armado del tablero kanban y su paginación por columna
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.admin = User.objects.create_user(username="admin", password="testpassword")
+        self.admin.roles.add(Role.objects.get(name="Administrador"))
+
+        self.autor = User.objects.create_user(username="autor", password="testpassword")
+        role = Role.objects.create(name="Autor kanban")
+        permission, _ = Permission.objects.get_or_create(
+            name=PermissionEnum.CREAR_ARTICULOS
+        )
+        role.permissions.add(permission)
+        self.autor.roles.add(role)
+
+        category = Category.objects.create(
+            name="Kanban", description="Kanban", type=CategoryType.FREE.value
+        )
+        self.published = [
+            Article.objects.create(
+                title=f"Publicado {i}",
+                autor=self.admin,
+                category=category,
+                state=ArticleStates.PUBLISHED.value,
+            )
+            for i in range(5)
+        ]
+        Article.objects.create(
+            title="Borrador del autor",
+            autor=self.autor,
+            category=category,
+            state=ArticleStates.DRAFT.value,
+        )
+
+    def test_primera_pagina_y_cantidades(self):
+        """
+        Cada columna muestra sus primeras tarjetas y la cantidad total
+        """
+
+        kanban_roles(self.admin)
+
+        with self.assertNumQueries(2):
+            columns, _ = build_board(self.admin, page_size=2)
+
+        columns = {column["slug"]: column for column in columns}
+        self.assertEqual(columns["published"]["count"], 5)
+        self.assertEqual(
+            [article.title for article in columns["published"]["articles"]],
+            ["Publicado 4", "Publicado 3"],
+        )
+        self.assertIsNotNone(columns["published"]["next_cursor"])
+        self.assertEqual(columns["draft"]["count"], 1)
+        self.assertIsNone(columns["draft"]["next_cursor"])
+        self.assertEqual(columns["inactive"]["articles"], [])
+
+    def test_paginas_siguientes_de_una_columna(self):
+        """
+        Las páginas de una columna se recorren por cursor hasta agotarlas
+        """
+
+        titles = []
+        cursor = None
+        while True:
+            page = column_page(self.admin, "published", cursor=cursor, page_size=2)
+            titles.extend(article.title for article in page)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(titles, [f"Publicado {i}" for i in reversed(range(5))])
+        self.assertIsNone(column_page(self.admin, "otra"))
+
+    def test_endpoint_de_columna(self):
+        """
+        El endpoint devuelve el HTML de las tarjetas y el cursor siguiente
+        """
+
+        self.client.login(username="admin", password="testpassword")
+
+        data = self.client.get(reverse("kanban-column", args=["published"])).json()
+        self.assertEqual(data["html"].count('class="item'), 5)
+        self.assertIsNone(data["next_cursor"])
+
+        response = self.client.get(reverse("kanban-column", args=["otra"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_autor_solo_ve_sus_articulos(self):
+        """
+        Un autor solo ve sus propios artículos en el tablero
+        """
+
+        self.client.login(username="autor", password="testpassword")
+        response = self.client.get(reverse("kanban"))
+
+        columns = {column["slug"]: column for column in response.context["columns"]}
+        self.assertEqual(columns["published"]["count"], 0)
+        self.assertEqual(columns["draft"]["count"], 1)
+        self.assertContains(response, "Borrador del autor")
+        self.assertTrue(columns["draft"]["articles"][0].can_drag)
+
+
+class EventosKanbanTest(TestCase):
+    """
+    Casos de prueba para los eventos de artículos que reciben los tableros abiertos
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        patcher = patch("article.events._broker", LocalEventBroker())
+        self.broker = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.admin = User.objects.create_user(username="admin", password="testpassword")
+        self.admin.roles.add(Role.objects.get(name="Administrador"))
+
+        self.autor = User.objects.create_user(username="autor", password="testpassword")
+        role = Role.objects.create(name="Autor eventos")
+        permission, _ = Permission.objects.get_or_create(
+            name=PermissionEnum.CREAR_ARTICULOS
+        )
+        role.permissions.add(permission)
+        self.autor.roles.add(role)
+
+        self.category = Category.objects.create(
+            name="Eventos", description="Eventos", type=CategoryType.FREE.value
+        )
+
+    def create_article(self, autor, title="Artículo"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Article.objects.create(
+                title=title,
+                autor=autor,
+                category=self.category,
+                state=ArticleStates.DRAFT.value,
+            )
+
+    def read_events(self, **headers):
+        response = self.client.get(reverse("kanban-events"), headers=headers)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return response, b"".join(response).decode()
+
+    def test_distribuidor_entrega_y_cierra_clientes_lentos(self):
+        """
+        Las suscripciones reciben los eventos y se cierran si no los consumen
+        """
+
+        async def scenario():
+            subscription, complete = self.broker.subscribe()
+            event_id = self.broker.publish({"id": 1})
+            first = await subscription.get(1)
+
+            for i in range(subscription.queue.maxsize + 1):
+                self.broker.publish({"id": i})
+            await asyncio.sleep(0)
+
+            messages = []
+            while not subscription.queue.empty():
+                messages.append(subscription.queue.get_nowait())
+            self.broker.unsubscribe(subscription)
+
+            return complete, event_id, first, messages
+
+        complete, event_id, first, messages = asyncio.run(scenario())
+
+        self.assertTrue(complete)
+        self.assertEqual(first, (event_id, {"id": 1}))
+        self.assertIs(messages[-1], CLOSED)
+
+        _, complete = self.broker.history(0)
+        self.assertFalse(complete)
+
+    def test_cambios_de_articulo_publican_eventos(self):
+        """
+        Crear un artículo y cambiar su estado publica eventos al confirmar
+        """
+
+        article = self.create_article(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            article.change_state(ArticleStates.REVISION.value)
+
+        messages, complete = self.broker.history(0)
+        self.assertTrue(complete)
+        self.assertEqual(
+            [event["type"] for _, event in messages],
+            ["article.created", "article.updated"],
+        )
+        self.assertEqual(messages[-1][1]["state"], ArticleStates.REVISION.value)
+        self.assertEqual(messages[-1][1]["previous_state"], ArticleStates.DRAFT.value)
+
+    def test_reenvia_eventos_pendientes(self):
+        """
+        Al reconectarse se reenvían los eventos posteriores a `Last-Event-ID`
+        """
+
+        response, _ = self.read_events()
+        self.assertEqual(response.status_code, 401)
+
+        self.client.login(username="autor", password="testpassword")
+        _, body = self.read_events()
+        self.assertIn(f"id: {self.broker.last_id}\n", body)
+
+        last_id = self.broker.last_id
+        self.create_article(self.admin, "Ajeno")
+        self.create_article(self.autor, "Propio")
+
+        response, body = self.read_events(**{"Last-Event-ID": str(last_id)})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn("Propio", body)
+        self.assertNotIn("Ajeno", body)
+        self.assertTrue(body.endswith(f"id: {self.broker.last_id}\n\n"))
+
+    async def test_flujo_en_vivo(self):
+        """
+        Con ASGI la conexión queda abierta y recibe los eventos nuevos
+        """
+
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(reverse("kanban-events"))
+        stream = response.streaming_content
+
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        self.assertEqual(await anext(stream), b"id: 0\n\n")
+
+        self.broker.publish({"type": "article.updated", "id": 7, "autor_id": 1})
+        chunk = await anext(stream)
+        await stream.aclose()
+
+        self.assertIn(b"event: article", chunk)
+        self.assertIn(b'"id": 7', chunk)
+
+
+class EventosEntreProcesosTest(TransactionTestCase):
+    """
+    Casos de prueba para la distribución de eventos entre procesos con
+    LISTEN/NOTIFY
+    """
+
+    def setUp(self):
+        """
+        Inicializa dos distribuidores, como si estuvieran en procesos distintos
+        """
+
+        self.channel = "article_events_test"
+        self.listener = PostgresEventBroker(channel=self.channel)
+        self.publisher = PostgresEventBroker(channel=self.channel)
+        self.addCleanup(self.listener.close)
+
+    def test_eventos_llegan_a_otro_proceso(self):
+        """
+        Un evento publicado en un proceso llega a las suscripciones de otro
+        """
+
+        async def subscribe():
+            return self.listener.subscribe()[0]
+
+        self.listener.start_listening()
+        self.assertTrue(self.listener.wait_listening())
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = loop.run_until_complete(subscribe())
+
+        self.publisher.publish({"id": 1})
+        self.publisher.publish({"id": 2})
+
+        messages = [loop.run_until_complete(subscription.get(5)) for _ in range(2)]
+        self.listener.unsubscribe(subscription)
+
+        self.assertEqual(messages, [(1, {"id": 1}), (2, {"id": 2})])
+        self.assertEqual(self.listener.last_id, 2)
+        self.assertEqual(self.publisher._last_id, 0)
+
+    def test_eventos_dentro_de_una_transaccion_llegan_al_confirmarla(self):
+        """
+        Un evento publicado dentro de una transacción se entrega al confirmarla
+        y se descarta si se revierte
+        """
+
+        self.listener.start_listening()
+        self.assertTrue(self.listener.wait_listening())
+
+        with self.assertRaises(ValueError), transaction.atomic():
+            self.publisher.publish({"id": "revertido"})
+            raise ValueError
+
+        with transaction.atomic():
+            self.publisher.publish({"id": "confirmado"})
+
+        for _ in range(50):
+            messages, _ = self.listener.history(0)
+            if messages:
+                break
+            time.sleep(0.1)
+
+        self.assertEqual(messages, [(1, {"id": "confirmado"})])
+
+    def test_suscribirse_sin_conexion_no_bloquea(self):
+        """
+        Suscribirse mientras el canal no se escucha no bloquea el event loop, y
+        al conectarse la suscripción se cierra para que el tablero se recargue
+        """
+
+        connect = self.listener._connect
+        connected = threading.Event()
+
+        def slow_connect():
+            connected.wait(5)
+            return connect()
+
+        async def subscribe():
+            start = time.monotonic()
+            subscription, _ = self.listener.subscribe()
+            last_id = self.listener.last_id
+            return subscription, last_id, time.monotonic() - start
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+
+        with patch.object(self.listener, "_connect", side_effect=slow_connect):
+            subscription, last_id, elapsed = loop.run_until_complete(subscribe())
+            self.assertLess(elapsed, 1)
+            self.assertEqual(last_id, 0)
+
+            connected.set()
+            self.assertTrue(self.listener.wait_listening())
+
+        self.assertIs(loop.run_until_complete(subscription.get(5)), CLOSED)
+        _, complete = self.listener.history(last_id)
+        self.assertFalse(complete)
@@ -3,5 +3,7 @@ from kanban import views
 
 urlpatterns = [
     path("", views.kanban_view, name="kanban"),
+    path("column/<slug:slug>/", views.kanban_column, name="kanban-column"),
+    path("events/", views.kanban_events, name="kanban-events"),
     path("send_message/", views.kanban_send_message, name="kanban-send-message"),
 ]
@@ -1,9 +1,29 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponseNotAllowed, HttpResponse
+from django.http import (
+    Http404,
+    HttpResponseNotAllowed,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.template.loader import get_template
 from django.contrib.auth.decorators import login_required
 from article.models import Article, ArticleStates
 from roles.utils import PermissionEnum
 from notification.utils import send_email
+from article.events import CLOSED, get_event_broker
+from kanban.board import build_board, column_page, kanban_roles, sees_only_own
+
+# Segundos sin eventos tras los que se envía un comentario para mantener la
+# conexión abierta a través de proxies
+SSE_HEARTBEAT_INTERVAL = 15
+
+# Milisegundos que espera el navegador antes de reconectarse
+SSE_RETRY = 3000
 
 
 @login_required
@@ -11,6 +31,9 @@ def kanban_view(request):
     """
     Función que renderiza la vista del kanban.
 
+    Cada columna muestra sus primeras tarjetas; las siguientes se cargan con
+    `kanban_column` al desplazarse.
+
     Args:
         request (HttpRequest): La petición HTTP.
 
@@ -18,52 +41,151 @@ def kanban_view(request):
         HttpResponse: La respuesta HTTP.
     """
 
-    draft_articles = Article.objects.filter(state=ArticleStates.DRAFT.value)
-    revision_articles = Article.objects.filter(state=ArticleStates.REVISION.value)
-    edited_articles = Article.objects.filter(state=ArticleStates.EDITED.value)
-    published_articles = Article.objects.filter(state=ArticleStates.PUBLISHED.value)
-    inactive_articles = Article.objects.filter(state=ArticleStates.INACTIVE.value)
-
-    # Check if the user is an admin
-    is_admin = request.user.roles.filter(name="Administrador").exists()
-
-    # Check if the user is an editor
-    is_editor = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.EDITAR_ARTICULOS]
-    )
-
-    is_publisher = is_admin or request.user.tiene_permisos(
-        [PermissionEnum.MODERAR_ARTICULOS]
-    )
-
-    is_autor = request.user.tiene_permisos([PermissionEnum.CREAR_ARTICULOS])
-
-    # Autors can only see their own articles
-    if is_autor and not is_admin and not is_editor and not is_publisher:
-        draft_articles = draft_articles.filter(autor=request.user)
-        revision_articles = revision_articles.filter(autor=request.user)
-        edited_articles = edited_articles.filter(autor=request.user)
-        published_articles = published_articles.filter(autor=request.user)
-        inactive_articles = inactive_articles.filter(autor=request.user)
+    columns, roles = build_board(request.user)
 
     return render(
         request,
         "kanban/kanban.html",
         {
-            "draft_articles": draft_articles,
-            "revision_articles": revision_articles,
-            "edited_articles": edited_articles,
-            "published_articles": published_articles,
-            "inactive_articles": inactive_articles,
-            "is_admin": is_admin,
-            "is_editor": is_editor,
-            "is_publisher": is_publisher,
-            "is_autor": is_autor,
+            "columns": columns,
+            **roles,
             "ArticleStates": ArticleStates,
         },
     )
 
 
+@login_required
+def kanban_column(request, slug):
+    """
+    Función que devuelve la página siguiente de una columna del kanban.
+
+    Args:
+        request (HttpRequest): La petición HTTP.
+        slug (str): Identificador de la columna.
+
+    Returns:
+        JsonResponse: El HTML de las tarjetas y el cursor de la página siguiente.
+    """
+
+    page = column_page(request.user, slug, cursor=request.GET.get("cursor"))
+    if page is None:
+        raise Http404("Columna inexistente")
+
+    card = get_template("kanban/_card.html")
+
+    return JsonResponse(
+        {
+            "html": "".join(card.render({"article": article}) for article in page),
+            "next_cursor": page.next_cursor,
+        }
+    )
+
+
+def sse_message(event_id, event=None):
+    """
+    Formatea un evento con el protocolo de Server-Sent Events.
+
+    Args:
+        event_id (int): ID del evento, que el navegador reenvía en
+            `Last-Event-ID` al reconectarse.
+        event (dict, optional): Datos del evento; sin datos el mensaje solo
+            actualiza el último ID recibido.
+
+    Returns:
+        str: El mensaje.
+    """
+
+    if event is None:
+        return f"id: {event_id}\n\n"
+
+    return f"id: {event_id}\nevent: article\ndata: {json.dumps(event)}\n\n"
+
+
+async def kanban_events(request):
+    """
+    Función que envía por Server-Sent Events los cambios de artículos a los
+    tableros abiertos.
+
+    Cada conexión es una tarea asíncrona suscrita al distribuidor de eventos,
+    sin un hilo por cliente. Si el servidor se ejecuta con WSGI la respuesta
+    solo incluye los eventos pendientes y el navegador vuelve a consultar
+    pasados `SSE_RETRY` milisegundos.
+
+    Args:
+        request (HttpRequest): La petición HTTP.
+
+    Returns:
+        StreamingHttpResponse: El flujo de eventos.
+    """
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    own_only = sees_only_own(await sync_to_async(kanban_roles)(user))
+
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_event_id = None
+
+    def visible(event):
+        return not own_only or event["autor_id"] == user.pk
+
+    broker = get_event_broker()
+
+    async def live_stream():
+        subscription, complete = broker.subscribe(last_event_id)
+
+        try:
+            yield f"retry: {SSE_RETRY}\n\n"
+
+            if not complete:
+                yield "event: reset\ndata: {}\n\n"
+            if last_event_id is None:
+                yield sse_message(broker.last_id)
+
+            while True:
+                message = await subscription.get(SSE_HEARTBEAT_INTERVAL)
+
+                if message is None:
+                    yield ": ping\n\n"
+                elif message is CLOSED:
+                    break
+                elif visible(message[1]):
+                    yield sse_message(*message)
+        finally:
+            broker.unsubscribe(subscription)
+
+    async def pending_stream():
+        yield f"retry: {SSE_RETRY}\n\n"
+
+        if last_event_id is None:
+            yield sse_message(broker.last_id)
+            return
+
+        messages, complete = broker.history(last_event_id)
+        if not complete:
+            yield "event: reset\ndata: {}\n\n"
+            yield sse_message(broker.last_id)
+
+        for event_id, event in messages:
+            if visible(event):
+                yield sse_message(event_id, event)
+
+        # Los eventos no visibles también avanzan el último ID recibido
+        if messages:
+            yield sse_message(messages[-1][0])
+
+    stream = live_stream if isinstance(request, ASGIRequest) else pending_stream
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+
+    return response
+
+
 @login_required
 def kanban_send_message(request):
     """
@@ -77,7 +199,7 @@ def kanban_send_message(request):
     """
 
     if request.method == "POST":
-        is_admin = request.user.roles.filter(name="Administrador").exists()
+        is_admin = request.user.is_admin
 
         is_editor = is_admin or request.user.tiene_permisos(
             [PermissionEnum.EDITAR_ARTICULOS]
@@ -0,0 +1,105 @@
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from notification.smtp import SMTPConnectionPool, SendMetrics
+from notification.utils import SMTP_TIMEOUT, build_message
+
+
+class Command(BaseCommand):
+    """
+    Compara el envío con una sesión SMTP nueva por mensaje contra el envío
+    con sesiones reutilizadas de un `SMTPConnectionPool`.
+
+    Por defecto levanta un servidor SMTP local que descarta los mensajes, para
+    no enviar correos reales; con `--host` y `--port` se usa otro servidor sin
+    TLS ni autenticación, por ejemplo uno de pruebas.
+    """
+
+    help = "Mide el envío de correos con y sin reutilizar sesiones SMTP"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=200,
+            help="Cantidad de correos a enviar en cada prueba",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Cantidad máxima de sesiones simultáneas del pool",
+        )
+        parser.add_argument("--host", default=None, help="Servidor SMTP a usar")
+        parser.add_argument("--port", type=int, default=25, help="Puerto del servidor")
+
+    def handle(self, *args, **options):
+        controller = None
+        host, port = options["host"], options["port"]
+
+        if host is None:
+            from aiosmtpd.controller import Controller
+            from aiosmtpd.handlers import Sink
+
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                host, port = sock.getsockname()
+
+            controller = Controller(Sink(), hostname=host, port=port)
+            controller.start()
+
+        def connect():
+            return smtplib.SMTP(host, port, timeout=SMTP_TIMEOUT)
+
+        messages = [
+            build_message(f"user{index}@example.com", "Benchmark", "<p>Benchmark</p>")
+            for index in range(options["messages"])
+        ]
+
+        try:
+            elapsed, metrics = self.send_unpooled(connect, messages)
+            self.report("Sesión nueva por correo", elapsed, metrics)
+
+            pool = SMTPConnectionPool(connect, max_size=max(1, options["concurrency"]))
+            try:
+                self.report("Pool de sesiones", *self.send_pooled(pool, messages))
+            finally:
+                pool.close_all()
+        finally:
+            if controller is not None:
+                controller.stop()
+
+    def send_unpooled(self, connect, messages):
+        metrics = SendMetrics()
+        start = time.perf_counter()
+
+        for message in messages:
+            send_start = time.perf_counter()
+            with connect() as server:
+                metrics.record_connection()
+                server.send_message(message)
+            metrics.record_send(time.perf_counter() - send_start)
+
+        return time.perf_counter() - start, metrics
+
+    def send_pooled(self, pool, messages):
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=pool.max_size) as executor:
+            list(executor.map(pool.send, messages))
+
+        return time.perf_counter() - start, pool.metrics
+
+    def report(self, label, elapsed, metrics):
+        snapshot = metrics.snapshot()
+        self.stdout.write(
+            f"{label}: {snapshot['sent']} correos en {elapsed:.2f} s "
+            f"({snapshot['sent'] / elapsed:.1f} correos/s), "
+            f"{snapshot['connections_opened']} sesiones, "
+            f"latencia promedio {snapshot['avg_ms']} ms, "
+            f"p95 {snapshot['p95_ms']} ms, máxima {snapshot['max_ms']} ms"
+        )
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notification.utils import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    drain_outbox,
+    smtp_pool,
+)
+
+
+class Command(BaseCommand):
+    """
+    Envía los correos pendientes de la bandeja de salida.
+
+    Con `--loop` sigue revisando la bandeja cada `--interval` segundos, para
+    ejecutarse como un proceso aparte de los servidores web.
+    """
+
+    help = "Envía los correos pendientes de la bandeja de salida"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help="Cantidad de correos a enviar por lote",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=OUTBOX_MAX_ATTEMPTS,
+            help="Intentos antes de descartar un correo",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Revisa la bandeja continuamente",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la bandeja está vacía",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = drain_outbox(options["batch_size"], options["max_attempts"])
+
+            if any(result.values()):
+                self.stdout.write(
+                    f"{result['sent']} enviados, {result['retried']} reprogramados, "
+                    f"{result['dead']} descartados"
+                )
+
+                if options["verbosity"] > 1:
+                    metrics = smtp_pool.metrics.snapshot()
+                    self.stdout.write(
+                        f"{metrics['connections_opened']} sesiones SMTP abiertas, "
+                        f"latencia promedio {metrics['avg_ms']} ms, "
+                        f"p95 {metrics['p95_ms']} ms"
+                    )
+
+            if not options["loop"]:
+                smtp_pool.close_all()
+                break
+
+            # Si el lote estaba completo puede haber más correos pendientes
+            if sum(result.values()) < options["batch_size"]:
+                time.sleep(options["interval"])
@@ -1 +1,63 @@
-# Create your models here.
+from enum import Enum
+
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxStates(Enum):
+    """
+    Enumeración que define los estados de un correo de la bandeja de salida.
+
+    Los valores posibles son:
+    - PENDING: Correo pendiente de envío (o de reintento).
+    - SENT: Correo enviado.
+    - DEAD: Correo descartado tras agotar los reintentos.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class OutboxEmail(models.Model):
+    """
+    Modelo que representa un correo electrónico en la bandeja de salida.
+
+    `send_email` guarda el correo y el comando `drain_outbox` lo envía,
+    reintentando con espera exponencial hasta agotar los intentos.
+
+    Attributes:
+        to (str): Dirección de correo del destinatario.
+        subject (str): Asunto del correo.
+        html (str): Contenido en formato HTML del correo.
+        state (str): Estado del correo.
+        attempts (int): Cantidad de intentos de envío realizados.
+        next_attempt_at (datetime): Fecha a partir de la cual se puede enviar.
+        last_error (str): Error del último intento fallido.
+        created_at (datetime): Fecha en que se encoló el correo.
+        sent_at (datetime): Fecha en que se envió el correo.
+    """
+
+    to = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255)
+    html = models.TextField()
+    state = models.CharField(
+        max_length=10,
+        choices=[
+            (OutboxStates.PENDING.value, "Pendiente"),
+            (OutboxStates.SENT.value, "Enviado"),
+            (OutboxStates.DEAD.value, "Descartado"),
+        ],
+        default=OutboxStates.PENDING.value,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["state", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.state})"
@@ -0,0 +1,237 @@
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class SendMetrics:
+    """
+    Métricas de los envíos realizados por un `SMTPConnectionPool`.
+
+    Guarda contadores y la latencia de los últimos envíos para calcular
+    percentiles. Es seguro usarla desde varios hilos.
+    """
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self.sent = 0
+        self.failed = 0
+        self.connections_opened = 0
+
+    def record_send(self, latency, ok=True):
+        """
+        Registra un envío.
+
+        Args:
+            latency (float): Segundos que tardó el envío.
+            ok (bool, optional): Si el envío fue exitoso.
+        """
+
+        with self._lock:
+            self._latencies.append(latency)
+            if ok:
+                self.sent += 1
+            else:
+                self.failed += 1
+
+    def record_connection(self):
+        """
+        Registra la apertura de una sesión SMTP.
+        """
+
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self):
+        """
+        Obtiene el estado actual de las métricas.
+
+        Returns:
+            dict: Contadores y latencias (promedio, p50, p95 y máxima) en milisegundos.
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+            snapshot = {
+                "sent": self.sent,
+                "failed": self.failed,
+                "connections_opened": self.connections_opened,
+            }
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            index = min(len(latencies) - 1, int(len(latencies) * fraction))
+            return round(latencies[index] * 1000, 2)
+
+        snapshot.update(
+            {
+                "avg_ms": round(sum(latencies) / len(latencies) * 1000, 2)
+                if latencies
+                else 0.0,
+                "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            }
+        )
+        return snapshot
+
+
+class PooledConnection:
+    """
+    Sesión SMTP abierta junto con los datos que usa el pool para reciclarla.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPConnectionPool:
+    """
+    Pool de sesiones SMTP autenticadas y reutilizables.
+
+    Cada sesión envía varios mensajes seguidos, evitando repetir la conexión
+    TCP, STARTTLS y el inicio de sesión por mensaje. Las sesiones inactivas
+    más de `idle_timeout` segundos o que ya enviaron `max_messages` mensajes
+    se cierran y se reemplazan, y nunca hay más de `max_size` sesiones en uso
+    a la vez.
+
+    Args:
+        connect (callable): Función que abre y devuelve una sesión `smtplib.SMTP`.
+        max_size (int, optional): Cantidad máxima de sesiones simultáneas.
+        idle_timeout (float, optional): Segundos que puede estar inactiva una
+            sesión antes de descartarla.
+        max_messages (int, optional): Mensajes a enviar por sesión antes de
+            reemplazarla.
+        acquire_timeout (float, optional): Segundos a esperar por una sesión libre.
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size=4,
+        idle_timeout=60.0,
+        max_messages=100,
+        acquire_timeout=30.0,
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.acquire_timeout = acquire_timeout
+        self.metrics = SendMetrics()
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []
+
+    def _open(self):
+        connection = PooledConnection(self.connect())
+        self.metrics.record_connection()
+        return connection
+
+    def _take_idle(self):
+        """
+        Obtiene la sesión inactiva usada más recientemente que siga vigente,
+        cerrando las vencidas.
+        """
+
+        expired = []
+
+        with self._lock:
+            connection = None
+            now = time.monotonic()
+
+            while self._idle:
+                candidate = self._idle.pop()
+                if now - candidate.last_used < self.idle_timeout:
+                    connection = candidate
+                    break
+                expired.append(candidate)
+
+        for candidate in expired:
+            candidate.close()
+
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """
+        Toma una sesión del pool y la devuelve al terminar.
+
+        Si el bloque lanza una excepción la sesión se descarta, porque puede
+        haber quedado en un estado inválido.
+
+        Yields:
+            PooledConnection: La sesión a usar.
+        """
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("No hay sesiones SMTP disponibles")
+
+        connection = None
+        try:
+            connection = self._take_idle() or self._open()
+            yield connection
+        except BaseException:
+            if connection is not None:
+                connection.server.close()
+            raise
+        else:
+            connection.messages += 1
+            connection.last_used = time.monotonic()
+
+            if connection.messages >= self.max_messages:
+                connection.close()
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def send(self, message):
+        """
+        Envía un mensaje usando una sesión del pool.
+
+        Si el servidor cerró la sesión mientras estaba inactiva, se reintenta
+        una vez con una sesión nueva.
+
+        Args:
+            message (Message): El mensaje a enviar.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            try:
+                with self.connection() as connection:
+                    connection.server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                with self.connection() as connection:
+                    connection.server.send_message(message)
+        except Exception:
+            self.metrics.record_send(time.perf_counter() - start, ok=False)
+            raise
+
+        self.metrics.record_send(time.perf_counter() - start)
+
+    def close_all(self):
+        """
+        Cierra las sesiones inactivas del pool.
+        """
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for connection in idle:
+            connection.close()
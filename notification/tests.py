@@ -1,49 +1,270 @@
+import smtplib
+import socket
+from datetime import timedelta
+from unittest import mock
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Sink
+from django.core.management import call_command
 from django.test import TestCase
-from unittest import TestCase, mock
-from notification.utils import send_email
+from django.utils import timezone
+
+from notification import utils
+from notification.models import OutboxEmail, OutboxStates
+from notification.smtp import SMTPConnectionPool
+from notification.utils import deliver_email, drain_outbox, send_email
+
+
+class RecordingHandler(Sink):
+    """
+    Servidor SMTP de pruebas que guarda los mensajes recibidos.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    """
+    Obtiene un puerto TCP libre en la máquina local.
+    """
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
 
 
-class SendEmailTestCase(TestCase):
+class SMTPSinkTestCase(TestCase):
+    """
+    Base de las pruebas que envían correos a un servidor SMTP local.
+    """
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.port = free_port()
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+
+        self.smtp_settings = mock.patch.multiple(
+            utils,
+            SMTP_SERVER="127.0.0.1",
+            SMTP_PORT=self.port,
+            SMTP_USERNAME="",
+            SMTP_USE_TLS=False,
+        )
+        self.smtp_settings.start()
+        self.addCleanup(self.smtp_settings.stop)
+
+        # Cada prueba usa un pool propio para no reutilizar sesiones de otra
+        self.pool = SMTPConnectionPool(utils.open_smtp_connection)
+        self.addCleanup(self.pool.close_all)
+        self.smtp_pool = mock.patch.object(utils, "smtp_pool", self.pool)
+        self.smtp_pool.start()
+        self.addCleanup(self.smtp_pool.stop)
+
+
+class SendEmailTestCase(SMTPSinkTestCase):
     """
     Casos de prueba para la función `send_email` de notification.utils.
     """
 
-    @mock.patch("smtplib.SMTP.sendmail")  # Mock the sendmail method
-    def test_send_email_success(self, mock_sendmail):
+    def test_send_email_enqueues(self):
         """
-        Test to verify successful email sending using send_message.
+        El correo se guarda en la bandeja de salida sin conectarse al servidor
         """
-        # Mock sendmail to simulate successful sending
-        mock_sendmail.return_value = True
 
-        # Call the send_email function
-        response = send_email(
+        with mock.patch("smtplib.SMTP") as smtp:
+            response = send_email(
+                "test@example.com", "Test Subject", "<p>Test HTML content</p>"
+            )
+
+        self.assertEqual(response["status"], "queued")
+        smtp.assert_not_called()
+
+        email = OutboxEmail.objects.get(pk=response["id"])
+        self.assertEqual(email.to, "test@example.com")
+        self.assertEqual(email.state, OutboxStates.PENDING.value)
+
+    def test_deliver_email_success(self):
+        """
+        El envío inmediato llega al servidor SMTP
+        """
+
+        response = deliver_email(
             "test@example.com", "Test Subject", "<p>Test HTML content</p>"
         )
 
-        # Assert the response is successful
         self.assertEqual(response["status"], "success")
+        self.assertEqual(len(self.handler.messages), 1)
+        self.assertEqual(self.handler.messages[0].rcpt_tos, ["test@example.com"])
+
+    def test_deliver_email_failure(self):
+        """
+        Un error de conexión se informa con una excepción
+        """
+
+        with mock.patch.object(utils, "SMTP_PORT", free_port()):
+            with self.assertRaises(Exception) as context:
+                deliver_email("test@example.com", "Test Subject", "<p>Test</p>")
+
+        self.assertIn("Email sending failed", str(context.exception))
+
+
+class DrainOutboxTestCase(SMTPSinkTestCase):
+    """
+    Casos de prueba para el envío de la bandeja de salida.
+    """
+
+    def test_drain_sends_pending_emails(self):
+        """
+        Los correos pendientes se envían reutilizando las sesiones del pool y se
+        marcan como enviados
+        """
+
+        for index in range(10):
+            send_email(f"user{index}@example.com", "Asunto", "<p>Hola</p>")
+
+        result = drain_outbox()
+
+        self.assertEqual(result, {"sent": 10, "retried": 0, "dead": 0})
+        self.assertLessEqual(
+            self.pool.metrics.snapshot()["connections_opened"], self.pool.max_size
+        )
+        self.assertEqual(len(self.handler.messages), 10)
+        self.assertFalse(
+            OutboxEmail.objects.exclude(state=OutboxStates.SENT.value).exists()
+        )
+
+        # Los correos enviados no se vuelven a enviar
+        self.assertEqual(drain_outbox(), {"sent": 0, "retried": 0, "dead": 0})
+
+    def test_failed_emails_are_retried_then_dead_lettered(self):
+        """
+        Los envíos fallidos se reprograman y, al agotar los intentos, se descartan
+        """
+
+        send_email("test@example.com", "Asunto", "<p>Hola</p>")
+
+        with mock.patch.object(utils, "SMTP_PORT", free_port()):
+            self.assertEqual(drain_outbox(max_attempts=2)["retried"], 1)
+
+            email = OutboxEmail.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertTrue(email.last_error)
+
+            # Todavía no corresponde reintentar
+            self.assertEqual(drain_outbox(max_attempts=2)["retried"], 0)
+
+            email.next_attempt_at = timezone.now() - timedelta(seconds=1)
+            email.save()
+            self.assertEqual(drain_outbox(max_attempts=2)["dead"], 1)
+
+        email.refresh_from_db()
+        self.assertEqual(email.state, OutboxStates.DEAD.value)
+        self.assertEqual(email.attempts, 2)
 
-        # Ensure sendmail was called once (through send_message)
-        mock_sendmail.assert_called_once()
+    def test_drain_outbox_command(self):
+        """
+        El comando envía los correos pendientes
+        """
+
+        send_email("test@example.com", "Asunto", "<p>Hola</p>")
 
-        # Additional debug information
-        # print(f"sendmail call count: {mock_sendmail.call_count}")
+        call_command("drain_outbox", stdout=mock.MagicMock())
 
-    @mock.patch("smtplib.SMTP.sendmail")  # Mock the sendmail method
-    def test_send_email_failure(self, mock_sendmail):
+        self.assertEqual(len(self.handler.messages), 1)
+
+
+class SMTPConnectionPoolTestCase(SMTPSinkTestCase):
+    """
+    Casos de prueba para el pool de sesiones SMTP de notification.smtp.
+    """
+
+    def send(self, pool, count):
+        for index in range(count):
+            pool.send(
+                utils.build_message(f"user{index}@example.com", "Asunto", "<p>Hola</p>")
+            )
+
+    def test_sessions_are_reused(self):
         """
-        Test to verify email sending failure.
+        Varios envíos seguidos usan una sola sesión y se registran en las métricas
         """
-        # Simulate an exception being raised when sendmail is called
-        mock_sendmail.side_effect = Exception("SMTP Error")
 
-        # Expect an exception to be raised and check the message content
-        with self.assertRaises(Exception) as context:
-            send_email("test@example.com", "Test Subject", "<p>Test HTML content</p>")
+        self.send(self.pool, 5)
 
-        # Check that the raised exception contains the correct message
-        self.assertIn("SMTP Error", str(context.exception))
+        metrics = self.pool.metrics.snapshot()
+        self.assertEqual(len(self.handler.messages), 5)
+        self.assertEqual(metrics["sent"], 5)
+        self.assertEqual(metrics["connections_opened"], 1)
+        self.assertGreater(metrics["p95_ms"], 0)
+
+    def test_idle_and_exhausted_sessions_are_replaced(self):
+        """
+        Se reemplazan las sesiones inactivas o con demasiados envíos
+        """
+
+        idle_pool = SMTPConnectionPool(utils.open_smtp_connection, idle_timeout=0)
+        self.addCleanup(idle_pool.close_all)
+        self.send(idle_pool, 3)
+        self.assertEqual(idle_pool.metrics.snapshot()["connections_opened"], 3)
+
+        short_pool = SMTPConnectionPool(utils.open_smtp_connection, max_messages=2)
+        self.addCleanup(short_pool.close_all)
+        self.send(short_pool, 4)
+        self.assertEqual(short_pool.metrics.snapshot()["connections_opened"], 2)
+
+    def test_reconnects_when_server_closed_session(self):
+        """
+        Si el servidor cerró una sesión inactiva, el envío se reintenta con una nueva
+        """
+
+        self.send(self.pool, 1)
+        self.pool._idle[0].server.sock.shutdown(socket.SHUT_RDWR)
+
+        self.send(self.pool, 1)
+
+        metrics = self.pool.metrics.snapshot()
+        self.assertEqual(len(self.handler.messages), 2)
+        self.assertEqual(metrics["sent"], 2)
+        self.assertEqual(metrics["connections_opened"], 2)
+
+    def test_concurrency_is_capped(self):
+        """
+        No se entregan más sesiones que el máximo del pool
+        """
+
+        pool = SMTPConnectionPool(
+            utils.open_smtp_connection, max_size=1, acquire_timeout=0.1
+        )
+        self.addCleanup(pool.close_all)
+
+        with pool.connection() as connection:
+            self.assertIsInstance(connection.server, smtplib.SMTP)
+
+            with self.assertRaises(TimeoutError):
+                with pool.connection():
+                    pass
+
+    def test_benchmark_command(self):
+        """
+        El comando de rendimiento envía los correos con y sin pool
+        """
+
+        stdout = mock.MagicMock()
+        call_command(
+            "benchmark_smtp",
+            "--messages=5",
+            "--host=127.0.0.1",
+            f"--port={self.port}",
+            stdout=stdout,
+        )
 
-        # Ensure sendmail was called once before the exception occurred
-        mock_sendmail.assert_called_once()
+        self.assertEqual(len(self.handler.messages), 10)
+        self.assertEqual(stdout.write.call_count, 2)
@@ -1,22 +1,46 @@
+import logging
 import os
+import random
 import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from django.db import transaction
+from django.utils import timezone
+
+from notification.models import OutboxEmail, OutboxStates
+from notification.smtp import SMTPConnectionPool
+
+logger = logging.getLogger(__name__)
+
 # Load email configuration from environment variables
 SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.environ.get("SMTP_PORT", 587))
 SMTP_USERNAME = os.environ["SMTP_USERNAME"]
 SMTP_PASSWORD = os.environ["SMTP_PASSWORD"]
+SMTP_USE_TLS = os.environ.get("SMTP_USE_TLS", "true").lower() == "true"
+SMTP_TIMEOUT = int(os.environ.get("SMTP_TIMEOUT", 30))
 DEFAULT_FROM = os.environ.get("DEFAULT_FROM", "CMS PY <cmspyls2@gmail.com>")
 
+# Sesiones SMTP reutilizables: cantidad máxima simultánea, segundos de
+# inactividad antes de reconectar y mensajes enviados por sesión
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", 4))
+SMTP_IDLE_TIMEOUT = int(os.environ.get("SMTP_IDLE_TIMEOUT", 60))
+SMTP_MAX_MESSAGES = int(os.environ.get("SMTP_MAX_MESSAGES", 100))
+
+# Reintentos de la bandeja de salida: espera exponencial desde OUTBOX_BACKOFF_BASE
+# segundos hasta OUTBOX_BACKOFF_MAX, y descarte tras OUTBOX_MAX_ATTEMPTS intentos
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_BACKOFF_BASE = int(os.environ.get("OUTBOX_BACKOFF_BASE", 60))
+OUTBOX_BACKOFF_MAX = int(os.environ.get("OUTBOX_BACKOFF_MAX", 60 * 60))
+OUTBOX_BATCH_SIZE = 50
 
-def send_email(to, subject, html):
-    """
-    Función para enviar un correo electrónico utilizando la API de Resend.
 
-    Esta función toma como parámetros el destinatario, el asunto y el contenido HTML del correo,
-    construye los parámetros necesarios y los envía utilizando la biblioteca Resend.
+def build_message(to, subject, html):
+    """
+    Construye el mensaje MIME de un correo en formato HTML.
 
     Parámetros:
         to (str): Dirección de correo del destinatario.
@@ -24,32 +48,203 @@ def send_email(to, subject, html):
         html (str): Contenido en formato HTML del correo.
 
     Retorna:
-        email (dict): Respuesta de la API de Resend al intentar enviar el correo.
+        MIMEMultipart: El mensaje listo para enviar.
+    """
 
-    Excepciones:
-        En caso de error, se captura la excepción y se imprime un mensaje de error.
+    msg = MIMEMultipart()
+    msg["From"] = DEFAULT_FROM
+    msg["To"] = to
+    msg["Subject"] = subject
+
+    # Attach HTML content
+    msg.attach(MIMEText(html, "html"))
+
+    return msg
+
+
+def open_smtp_connection():
+    """
+    Abre una sesión SMTP autenticada con el servidor configurado.
+
+    STARTTLS y el inicio de sesión se pueden desactivar (`SMTP_USE_TLS` y
+    `SMTP_USERNAME` vacío), por ejemplo para enviar a un servidor SMTP local
+    de pruebas.
+
+    Retorna:
+        smtplib.SMTP: La sesión abierta.
     """
-    
-    try:
-        # Create MIMEMultipart message
-        msg = MIMEMultipart()
-        msg["From"] = DEFAULT_FROM
-        msg["To"] = to
-        msg["Subject"] = subject
 
-        # Attach HTML content
-        msg.attach(MIMEText(html, "html"))
+    server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
 
-        # Create SMTP session
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
+    try:
+        if SMTP_USE_TLS:
             server.starttls()  # Enable TLS
+        if SMTP_USERNAME:
             server.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+
+    return server
+
 
-            # Send email
-            server.send_message(msg)
+smtp_pool = SMTPConnectionPool(
+    open_smtp_connection,
+    max_size=SMTP_POOL_SIZE,
+    idle_timeout=SMTP_IDLE_TIMEOUT,
+    max_messages=SMTP_MAX_MESSAGES,
+)
+
+
+def deliver_email(to, subject, html, connection=None):
+    """
+    Envía un correo electrónico por SMTP de forma inmediata.
+
+    Parámetros:
+        to (str): Dirección de correo del destinatario.
+        subject (str): Asunto del correo.
+        html (str): Contenido en formato HTML del correo.
+        connection (smtplib.SMTP, opcional): Sesión abierta a reutilizar; si
+            no se indica se usa una sesión de `smtp_pool`.
+
+    Retorna:
+        dict: Estado del envío.
+
+    Excepciones:
+        Exception: Si el envío falla.
+    """
+
+    try:
+        msg = build_message(to, subject, html)
+
+        if connection is not None:
+            connection.send_message(msg)
+        else:
+            smtp_pool.send(msg)
 
         return {"status": "success", "message": "Email sent successfully"}
     except Exception as error:
-        # print("Failed to send email")
-        # print(error)
         raise Exception(f"Email sending failed: {str(error)}")
+
+
+def send_email(to, subject, html):
+    """
+    Encola un correo electrónico en la bandeja de salida.
+
+    El correo se guarda en la base de datos y lo envía el comando
+    `drain_outbox`, por lo que la solicitud no espera al servidor SMTP ni
+    falla si este no está disponible. Si la transacción actual se revierte,
+    el correo tampoco se envía.
+
+    Parámetros:
+        to (str): Dirección de correo del destinatario.
+        subject (str): Asunto del correo.
+        html (str): Contenido en formato HTML del correo.
+
+    Retorna:
+        dict: Estado de la operación y el ID del correo encolado.
+    """
+
+    email = OutboxEmail.objects.create(to=to, subject=subject, html=html)
+
+    return {"status": "queued", "message": "Email queued for delivery", "id": email.pk}
+
+
+def send_emails(emails):
+    """
+    Encola varios correos en la bandeja de salida con una sola consulta.
+
+    Parámetros:
+        emails (Iterable[dict]): Correos con las claves `to`, `subject` y `html`.
+
+    Retorna:
+        int: Cantidad de correos encolados.
+    """
+
+    return len(OutboxEmail.objects.bulk_create(OutboxEmail(**email) for email in emails))
+
+
+def retry_delay(attempts):
+    """
+    Calcula la espera antes del siguiente intento de envío.
+
+    Parámetros:
+        attempts (int): Cantidad de intentos ya realizados.
+
+    Retorna:
+        timedelta: La espera, exponencial y con una variación aleatoria para
+            no reintentar todos los correos a la vez.
+    """
+
+    seconds = min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, max_attempts=OUTBOX_MAX_ATTEMPTS):
+    """
+    Envía un lote de correos pendientes de la bandeja de salida.
+
+    Los correos se bloquean con `SELECT ... FOR UPDATE SKIP LOCKED`, por lo
+    que varios procesos pueden vaciar la bandeja a la vez sin enviar dos veces
+    el mismo correo. Los correos del lote se envían en paralelo usando las
+    sesiones de `smtp_pool`. Los envíos fallidos se reintentan con espera
+    exponencial y, al agotar los intentos, el correo queda descartado.
+
+    Parámetros:
+        batch_size (int, opcional): Cantidad máxima de correos a enviar.
+        max_attempts (int, opcional): Intentos antes de descartar un correo.
+
+    Retorna:
+        dict: Cantidad de correos enviados, reprogramados y descartados.
+    """
+
+    result = {"sent": 0, "retried": 0, "dead": 0}
+
+    def deliver(email):
+        try:
+            deliver_email(email.to, email.subject, email.html)
+        except Exception as error:
+            return error
+        return None
+
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                state=OutboxStates.PENDING.value, next_attempt_at__lte=timezone.now()
+            )
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+
+        if not emails:
+            return result
+
+        # Solo el envío SMTP ocurre en los hilos; las filas se actualizan en
+        # este hilo, dentro de la transacción que las bloquea
+        workers = min(len(emails), smtp_pool.max_size)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(deliver, emails))
+
+        for email, error in zip(emails, errors):
+            email.attempts += 1
+
+            if error is not None:
+                logger.warning("No se pudo enviar el correo %s: %s", email.pk, error)
+                email.last_error = str(error)
+
+                if email.attempts >= max_attempts:
+                    email.state = OutboxStates.DEAD.value
+                    result["dead"] += 1
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                    result["retried"] += 1
+            else:
+                email.state = OutboxStates.SENT.value
+                email.sent_at = timezone.now()
+                result["sent"] += 1
+
+        OutboxEmail.objects.bulk_update(
+            emails, ["state", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+
+    return result
@@ -0,0 +1,208 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from roles.models import Role
+
+
+# Nombre del rol con acceso total al sistema
+ADMIN_ROLE = "Administrador"
+
+# Clave de la versión global de roles y permisos
+ROLE_VERSION_KEY = "roles:version"
+
+PERMISSIONS_CACHE_TIMEOUT = 60 * 60
+
+
+class UserPermissions:
+    """
+    Conjunto de permisos y roles de un usuario.
+
+    Attributes:
+        permission_names (frozenset): Nombres de los permisos del usuario.
+        role_names (frozenset): Nombres de los roles del usuario.
+    """
+
+    def __init__(self, permission_names=(), role_names=()):
+        self.permission_names = frozenset(permission_names)
+        self.role_names = frozenset(role_names)
+
+    @property
+    def is_admin(self):
+        return ADMIN_ROLE in self.role_names
+
+    def has_all(self, permisos):
+        """
+        Verifica si el conjunto incluye todos los permisos indicados.
+
+        Args:
+            permisos (list[str | PermissionEnum]): Permisos a verificar.
+
+        Returns:
+            bool: True si están todos los permisos.
+        """
+
+        return all(
+            getattr(permiso, "value", permiso) in self.permission_names
+            for permiso in permisos
+        )
+
+    def __iter__(self):
+        return iter(sorted(self.permission_names))
+
+    def __contains__(self, permiso):
+        return getattr(permiso, "value", permiso) in self.permission_names
+
+    def __len__(self):
+        return len(self.permission_names)
+
+
+EMPTY_PERMISSIONS = UserPermissions()
+
+
+def get_permissions_cache():
+    """
+    Obtiene el backend de caché de los permisos.
+
+    Es la caché compartida por todos los procesos, para que un cambio de roles
+    hecho en un worker invalide los permisos guardados por los demás.
+
+    Returns:
+        BaseCache: El backend de caché.
+    """
+
+    return caches[getattr(settings, "SHARED_CACHE_ALIAS", "default")]
+
+
+def get_role_version():
+    """
+    Obtiene la versión global de roles y permisos.
+
+    Returns:
+        str: La versión actual.
+    """
+
+    return get_permissions_cache().get_or_set(
+        ROLE_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None
+    )
+
+
+def bump_role_version():
+    """
+    Invalida los permisos en caché de todos los usuarios.
+
+    Se guarda una versión nueva en lugar de incrementar la anterior porque no
+    todos los backends incrementan de forma atómica.
+    """
+
+    get_permissions_cache().set(ROLE_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def permissions_cache_key(user_id):
+    """
+    Construye la clave de caché de los permisos de un usuario.
+
+    Args:
+        user_id (int): ID del usuario.
+
+    Returns:
+        str: La clave de caché.
+    """
+
+    return f"roles:permissions:{user_id}"
+
+
+def invalidate_user_permissions(user_ids):
+    """
+    Invalida los permisos en caché de los usuarios indicados.
+
+    Args:
+        user_ids (Iterable[int]): IDs de los usuarios.
+    """
+
+    get_permissions_cache().delete_many(
+        [permissions_cache_key(user_id) for user_id in user_ids]
+    )
+
+
+def load_user_permissions(user):
+    """
+    Carga los permisos y roles de un usuario con una única consulta.
+
+    Args:
+        user (User): El usuario.
+
+    Returns:
+        UserPermissions: Los permisos y roles del usuario.
+    """
+
+    permission_names = set()
+    role_names = set()
+
+    rows = Role.objects.filter(customuser=user).values_list("name", "permissions__name")
+    for role_name, permission_name in rows:
+        role_names.add(role_name)
+        if permission_name is not None:
+            permission_names.add(permission_name)
+
+    return UserPermissions(permission_names, role_names)
+
+
+def set_user_permissions(user, permissions):
+    """
+    Guarda los permisos resueltos en la instancia del usuario, para que el
+    resto de la solicitud no vuelva a resolverlos.
+
+    Args:
+        user (User): El usuario.
+        permissions (UserPermissions): Sus permisos y roles.
+    """
+
+    user._user_permissions = permissions
+
+
+def get_user_permissions(user):
+    """
+    Obtiene los permisos y roles de un usuario.
+
+    Se resuelven una vez por solicitud (guardados en la instancia del usuario)
+    y se comparten entre solicitudes mediante la caché compartida. Cada entrada
+    guarda la versión global de roles con la que se resolvió, y se lee junto
+    con la versión actual en una sola operación.
+
+    Args:
+        user (User): El usuario (puede ser anónimo).
+
+    Returns:
+        UserPermissions: Los permisos y roles del usuario.
+    """
+
+    if not user.is_authenticated:
+        return EMPTY_PERMISSIONS
+
+    permissions = getattr(user, "_user_permissions", None)
+    if permissions is not None:
+        return permissions
+
+    cache = get_permissions_cache()
+    key = permissions_cache_key(user.pk)
+    values = cache.get_many([ROLE_VERSION_KEY, key])
+    version = values.get(ROLE_VERSION_KEY)
+    cached = values.get(key)
+
+    if version is not None and cached is not None and cached[0] == version:
+        permissions = UserPermissions(*cached[1:])
+    else:
+        if version is None:
+            version = get_role_version()
+
+        permissions = load_user_permissions(user)
+        cache.set(
+            key,
+            (version, permissions.permission_names, permissions.role_names),
+            PERMISSIONS_CACHE_TIMEOUT,
+        )
+
+    set_user_permissions(user, permissions)
+    return permissions
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from roles.models import Permission, Role
+from roles.permissions import bump_role_version, invalidate_user_permissions
+
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_all_permissions(sender, **kwargs):
+    """
+    Invalida los permisos en caché de todos los usuarios al cambiar un rol o
+    sus permisos.
+    """
+
+    action = kwargs.get("action")
+    if action is None or action in ("post_add", "post_remove", "post_clear"):
+        bump_role_version()
+
+
+@receiver(m2m_changed, sender=User.roles.through)
+def invalidate_users_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Invalida los permisos en caché de los usuarios cuyos roles cambiaron.
+    """
+
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+
+    if isinstance(instance, User):
+        invalidate_user_permissions([instance.pk])
+        instance.__dict__.pop("_user_permissions", None)
+    elif action == "pre_clear":
+        # Al vaciar los usuarios de un rol no se informan sus IDs
+        bump_role_version()
+    elif pk_set:
+        invalidate_user_permissions(pk_set)
@@ -1,10 +1,23 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from roles.models import Role, Permission
+from roles.permissions import get_permissions_cache
 
 User = get_user_model()
 
+# Caché compartida en memoria, como Redis en producción: sus lecturas no
+# cuentan como consultas a la base de datos
+MEMORY_SHARED_CACHES = {
+    **settings.CACHES,
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "permisos-compartidos",
+    },
+}
+
 
 class RoleAssignmentViewTest(TestCase):
     """
@@ -81,3 +94,108 @@ class RoleModelTest(TestCase):
         self.assertEqual(self.role.name, "Administrador")
         self.assertIn(self.permission, self.role.permissions.all())
         self.assertEqual(str(self.role), "Administrador")
+
+
+@override_settings(CACHES=MEMORY_SHARED_CACHES)
+class UserPermissionsResolverTest(TestCase):
+    """
+    Casos de prueba para la resolución de permisos de usuario
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        cache.clear()
+        get_permissions_cache().clear()
+        self.permission = Permission.objects.create(name="permiso_prueba", description="")
+        self.role = Role.objects.create(name="Rol de prueba", description="")
+        self.role.permissions.add(self.permission)
+        self.user = User.objects.create_user(username="resolver", password="testpassword")
+        self.user.roles.add(self.role)
+
+    def test_permisos_se_resuelven_una_vez(self):
+        """
+        Varias verificaciones sobre el mismo usuario hacen una sola consulta
+        """
+
+        user = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(user.tiene_permisos(["permiso_prueba"]))
+            self.assertFalse(user.tiene_permisos(["permiso_prueba", "otro"]))
+            self.assertFalse(user.is_admin)
+
+        # Otra solicitud reutiliza la caché
+        other_request_user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(other_request_user.tiene_permisos(["permiso_prueba"]))
+
+    def test_cambios_de_roles_invalidan_la_cache(self):
+        """
+        Quitar un permiso del rol o asignar un rol al usuario se refleja de inmediato
+        """
+
+        self.assertTrue(User.objects.get(pk=self.user.pk).tiene_permisos(["permiso_prueba"]))
+
+        self.role.permissions.remove(self.permission)
+        self.assertFalse(User.objects.get(pk=self.user.pk).tiene_permisos(["permiso_prueba"]))
+
+        self.user.roles.add(Role.objects.get(name="Administrador"))
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_admin)
+
+
+class PermisosCompartidosTest(TestCase):
+    """
+    Casos de prueba para los permisos guardados en la caché compartida
+    """
+
+    def setUp(self):
+        """
+        Inicializa la configuración de las pruebas
+        """
+
+        self.permission = Permission.objects.create(
+            name="permiso_prueba", description=""
+        )
+        self.role = Role.objects.create(name="Rol de prueba", description="")
+        self.role.permissions.add(self.permission)
+        self.user = User.objects.create_user(
+            username="compartido", password="testpassword"
+        )
+        self.user.roles.add(self.role)
+
+    def other_process_caches(self):
+        """
+        Configuración de cachés de otro proceso: memoria local propia y la
+        caché compartida en común.
+        """
+
+        return {
+            **settings.CACHES,
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "otro-proceso",
+            },
+        }
+
+    def test_cambios_en_otro_proceso_invalidan_los_permisos(self):
+        """
+        Un cambio de roles hecho en otro proceso se refleja en los permisos que
+        este proceso ya tenía en caché
+        """
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.tiene_permisos(["permiso_prueba"]))
+
+        with self.settings(CACHES=self.other_process_caches()):
+            self.role.permissions.remove(self.permission)
+
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.tiene_permisos(["permiso_prueba"]))
+
+        with self.settings(CACHES=self.other_process_caches()):
+            self.user.roles.add(Role.objects.get(name="Administrador"))
+
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_admin)
@@ -27,25 +27,28 @@ function getCookie(name) {
 }
 
 /**
- * Cambia el estado de un artículo
- * @param {number} articleId Id del artículo
- * @param {string} articleNewState Nuevo estado del artículo
- * @returns {Promise<Response>}
+ * Cambia el estado de uno o varios artículos
+ * @param {string} url URL del cambio de estado
+ * @param {number[]} articleIds Ids de los artículos
+ * @param {string} articleNewState Nuevo estado de los artículos
+ * @returns {Promise<object>} Ids de los artículos actualizados y rechazados
  * @throws {Error}
  */
-async function changeState(articleId, articleNewState) {
-  const response = await fetch(
-    `/article/${articleId}/update/state/${articleNewState}`,
-    {
-      method: "GET",
-    }
-  );
+async function changeState(url, articleIds, articleNewState) {
+  const response = await fetch(url, {
+    method: "POST",
+    body: JSON.stringify({ ids: articleIds, state: articleNewState }),
+    headers: {
+      "Content-Type": "application/json",
+      "X-CSRFToken": getCookie("csrftoken"),
+    },
+  });
 
   if (!response.ok) {
     throw new Error("Error updating article state");
   }
 
-  return response;
+  return response.json();
 }
 
 /**
@@ -105,6 +108,140 @@ function showErrorToast(text) {
     .showToast();
 }
 
+/**
+ * Carga la página siguiente de tarjetas de una columna
+ * @param {HTMLElement} container Contenedor de las tarjetas de la columna
+ * @returns {Promise<void>}
+ */
+async function loadNextPage(container) {
+  const url = container.dataset.nextUrl;
+  if (!url || container.dataset.loading) return;
+
+  container.dataset.loading = "true";
+
+  try {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error("Error loading cards");
+
+    const page = await response.json();
+    container.insertAdjacentHTML("beforeend", page.html);
+
+    if (page.next_cursor) {
+      const nextUrl = new URL(url, window.location.origin);
+      nextUrl.searchParams.set("cursor", page.next_cursor);
+      container.dataset.nextUrl = nextUrl.pathname + nextUrl.search;
+    } else {
+      delete container.dataset.nextUrl;
+    }
+  } catch {
+    showErrorToast("No se pudieron cargar más artículos");
+  } finally {
+    delete container.dataset.loading;
+  }
+
+  // Si la columna todavía no tiene desplazamiento no habrá evento de scroll
+  if (container.scrollHeight <= container.clientHeight) loadNextPage(container);
+}
+
+/**
+ * Suma una cantidad al contador de tarjetas de una columna
+ * @param {string} state Estado de la columna
+ * @param {number} amount Cantidad a sumar
+ */
+function updateCount(state, amount) {
+  const count = document.querySelector(`.count[data-state="${state}"]`);
+  if (count) count.textContent = Number(count.textContent) + amount;
+}
+
+/**
+ * Crea la tarjeta de un artículo recibido por eventos
+ * @param {object} event Evento del artículo
+ * @returns {HTMLElement}
+ */
+function buildCard(event) {
+  const card = document.createElement("div");
+  card.className = "item";
+  card.dataset.id = event.id;
+  card.innerHTML = `
+    <a target="_blank"><p class="title"></p></a>
+    <div class="line">
+      <i class="fa-regular fa-user"></i>
+      <p class="autor"></p>
+    </div>
+    <div class="line">
+      <i class="fa-solid fa-layer-group"></i>
+      <p class="category"></p>
+    </div>
+  `;
+  card.querySelector("a").href = `/article/${event.id}/detail/?from=article-list`;
+  return card;
+}
+
+/**
+ * Actualiza el contenido de una tarjeta con los datos de un evento
+ * @param {HTMLElement} card Tarjeta del artículo
+ * @param {object} event Evento del artículo
+ * @param {string} state Columna en la que queda la tarjeta
+ */
+function fillCard(card, event, state) {
+  const [title, autor, category] = card.querySelectorAll("p");
+  title.textContent = event.title;
+  autor.textContent = event.autor;
+  category.textContent = `${event.category} - `;
+
+  const moderation = document.createElement("b");
+  moderation.textContent = event.is_moderated ? "Moderado" : "No moderado";
+  category.appendChild(moderation);
+
+  const canDrag =
+    state !== "inactive" && (canDraggValues[state] || !event.is_moderated);
+  card.setAttribute("draggable", canDrag ? "true" : "false");
+  card.classList.toggle("clickable", canDrag);
+}
+
+/**
+ * Aplica al tablero un cambio de artículo hecho por otro usuario
+ * @param {object} event Evento del artículo
+ */
+function applyArticleEvent(event) {
+  const columnFor = (value) =>
+    document.querySelector(`.items[data-state-value="${value}"]`);
+
+  const card = document.querySelector(`.item[data-id="${event.id}"]`);
+  const target = columnFor(event.state);
+
+  if (event.type === "article.deleted") {
+    if (card) card.remove();
+    if (target) updateCount(target.dataset.state, -1);
+    return;
+  }
+
+  if (!target) return;
+
+  if (card) {
+    const source = card.parentElement;
+    fillCard(card, event, target.dataset.state);
+
+    if (source !== target) {
+      target.prepend(card);
+      updateCount(source.dataset.state, -1);
+      updateCount(target.dataset.state, 1);
+    }
+    return;
+  }
+
+  // Sin tarjeta solo se sabe de qué columna sale si el estado cambió
+  const source = event.previous_state && columnFor(event.previous_state);
+  if (event.type === "article.created" || (source && source !== target)) {
+    const newCard = buildCard(event);
+    fillCard(newCard, event, target.dataset.state);
+    target.prepend(newCard);
+
+    if (source) updateCount(source.dataset.state, -1);
+    updateCount(target.dataset.state, 1);
+  }
+}
+
 function showModal(modal) {
   modal.style.display = "block";
 }
@@ -115,7 +252,7 @@ function closeModal(modal) {
 
 document.addEventListener("DOMContentLoaded", () => {
   const states = document.querySelectorAll(".state");
-  const items = document.querySelectorAll(".item");
+  const containers = document.querySelectorAll(".items");
 
   const modalMessage = document.getElementById("modalMessage");
   const closeBtnMessage = document.getElementById("closeModal");
@@ -130,25 +267,73 @@ document.addEventListener("DOMContentLoaded", () => {
   const confirmBtn = document.getElementById("confirm");
   const dontConfirmBtn = document.getElementById("dontConfirm");
 
-  let draggedItem = null;
+  const board = document.querySelector(".kanban");
+
+  let draggedItems = [];
   let firstState = null;
   let firstItemContainer = null;
-  let lastArticleToSend = null;
+  let lastArticlesToSend = [];
 
   let itemsContainer = null;
-  let articleId = null;
+  let articleIds = [];
   let articleNewState = null;
 
-  // Add draggable attribute to items
-  items.forEach((item) => {
-    item.addEventListener("dragstart", () => {
-      draggedItem = item;
-      firstState = item.parentElement.getAttribute("data-state");
-      firstItemContainer = item.parentElement;
-      item.classList.add("dragging");
+  // Devuelve las tarjetas arrastradas a su columna original
+  const restoreItems = (items, container = firstItemContainer) => {
+    items.forEach((item) => container.appendChild(item));
+  };
+
+  const clearDrag = () => {
+    draggedItems.forEach((item) => item.classList.remove("selected"));
+    draggedItems = [];
+    firstState = null;
+    firstItemContainer = null;
+  };
+
+  // Los eventos se escuchan en las columnas para incluir las tarjetas cargadas después
+  containers.forEach((container) => {
+    // Ctrl/Cmd + clic selecciona varias tarjetas para moverlas juntas
+    container.addEventListener("click", (e) => {
+      const item = e.target.closest(".item");
+      if (!item || !(e.ctrlKey || e.metaKey)) return;
+      if (item.getAttribute("draggable") !== "true") return;
+
+      e.preventDefault();
+      item.classList.toggle("selected");
     });
 
-    item.addEventListener("dragend", () => item.classList.remove("dragging"));
+    container.addEventListener("dragstart", (e) => {
+      const item = e.target.closest(".item");
+      if (!item) return;
+
+      // Al arrastrar una tarjeta seleccionada se mueven todas las de la columna
+      draggedItems = item.classList.contains("selected")
+        ? [...container.querySelectorAll(".item.selected")]
+        : [item];
+
+      document.querySelectorAll(".item.selected").forEach((selected) => {
+        if (!draggedItems.includes(selected)) selected.classList.remove("selected");
+      });
+
+      firstState = container.getAttribute("data-state");
+      firstItemContainer = container;
+      draggedItems.forEach((dragged) => dragged.classList.add("dragging"));
+    });
+
+    container.addEventListener("dragend", () => {
+      draggedItems.forEach((dragged) => dragged.classList.remove("dragging"));
+    });
+
+    container.addEventListener("scroll", () => {
+      if (
+        container.scrollTop + container.clientHeight >=
+        container.scrollHeight - 50
+      ) {
+        loadNextPage(container);
+      }
+    });
+
+    if (container.scrollHeight <= container.clientHeight) loadNextPage(container);
   });
 
   // Add event listeners to states
@@ -156,19 +341,20 @@ document.addEventListener("DOMContentLoaded", () => {
     // Prevent default behavior
     state.addEventListener("dragover", (e) => e.preventDefault());
 
-    // Save the necessary data to change the state of the article
+    // Save the necessary data to change the state of the articles
     state.addEventListener("drop", async (e) => {
       e.preventDefault();
 
-      if (draggedItem) {
+      if (draggedItems.length) {
         itemsContainer = state.querySelector(".items");
 
-        articleId = draggedItem.getAttribute("data-id");
+        articleIds = draggedItems.map((item) => Number(item.dataset.id));
         articleNewState = itemsContainer.getAttribute("data-state");
 
-        itemsContainer.appendChild(draggedItem);
+        draggedItems.forEach((item) => itemsContainer.appendChild(item));
 
         if (firstState !== articleNewState) showModal(modalConfirmation);
+        else clearDrag();
       }
     });
   });
@@ -177,55 +363,86 @@ document.addEventListener("DOMContentLoaded", () => {
   closeBtnMessage.addEventListener("click", () => closeModal(modalMessage));
 
   closeBtnConfirmation.addEventListener("click", () => {
-    itemsContainer.removeChild(draggedItem);
-    firstItemContainer.appendChild(draggedItem);
+    restoreItems(draggedItems);
+    clearDrag();
     closeModal(modalConfirmation);
   });
 
   sendMessageBtn.addEventListener("click", () => {
-    sendMessage(lastArticleToSend, messageInput.value)
+    Promise.all(
+      lastArticlesToSend.map((id) => sendMessage(id, messageInput.value))
+    )
       .then(() => showSuccessToast("Mensaje enviado correctamente"))
       .catch(() => showErrorToast("Error al enviar el mensaje"))
       .finally(() => {
-        lastArticleToSend = null;
+        lastArticlesToSend = [];
         closeModal(modalMessage);
       });
   });
 
   confirmBtn.addEventListener("click", () => {
-    // If the article is in revision state and the new state is draft, show modal to send message
+    // If the articles are in revision state and the new state is draft, show modal to send message
     if (firstState === "revision" && articleNewState === "draft") {
-      lastArticleToSend = articleId;
+      lastArticlesToSend = articleIds;
       showModal(modalMessage);
     }
 
     if (firstState === articleNewState) return;
 
-    changeState(articleId, articleNewState)
-      .then(() => {
-        const canDrag = canDraggValues[articleNewState] || defaultCanDrag;
-        draggedItem.setAttribute("draggable", canDrag ? "true" : "false");
-        showSuccessToast("Estado del artículo actualizado correctamente");
+    const items = draggedItems;
+    const source = firstItemContainer;
+    const fromState = firstState;
+    const toState = articleNewState;
+    clearDrag();
+
+    changeState(
+      board.dataset.transitionUrl,
+      articleIds,
+      itemsContainer.dataset.stateValue
+    )
+      .then((result) => {
+        const canDrag = canDraggValues[toState] || defaultCanDrag;
+        const rejected = items.filter(
+          (item) => !result.updated.includes(Number(item.dataset.id))
+        );
+
+        items.forEach((item) => {
+          if (rejected.includes(item)) return;
+          item.setAttribute("draggable", canDrag ? "true" : "false");
+        });
+        updateCount(fromState, rejected.length - items.length);
+        updateCount(toState, items.length - rejected.length);
+        restoreItems(rejected, source);
+
+        if (rejected.length) {
+          showErrorToast(
+            `No puedes modificar el estado de ${rejected.length} artículo(s)`
+          );
+        } else {
+          showSuccessToast("Estado del artículo actualizado correctamente");
+        }
       })
       .catch(() => {
-        itemsContainer.removeChild(draggedItem);
-        firstItemContainer.appendChild(draggedItem);
+        restoreItems(items, source);
         showErrorToast("No puedes modificar el estado de este artículo");
-      })
-      .finally(() => {
-        draggedItem = null;
-        firstState = null;
-        firstItemContainer = null;
       });
 
     closeModal(modalConfirmation);
   });
 
   dontConfirmBtn.addEventListener("click", () => {
-    itemsContainer.removeChild(draggedItem);
-    firstItemContainer.appendChild(draggedItem);
+    restoreItems(draggedItems);
+    clearDrag();
     closeModal(modalConfirmation);
   });
 
   dontSendMessageBtn.addEventListener("click", () => closeModal(modalMessage));
+
+  // Cambios hechos por otros usuarios
+  const events = new EventSource(board.dataset.eventsUrl);
+
+  events.addEventListener("article", (e) => applyArticleEvent(JSON.parse(e.data)));
+
+  // Se perdieron eventos: se vuelve a cargar el tablero completo
+  events.addEventListener("reset", () => window.location.reload());
 });
@@ -0,0 +1,21 @@
+from django.contrib.auth.backends import ModelBackend
+
+from roles.permissions import get_user_permissions
+
+
+class RolesBackend(ModelBackend):
+    """
+    Backend de autenticación que carga los roles y permisos junto con el usuario.
+
+    Al obtener el usuario de la sesión se resuelven también sus permisos (desde
+    la caché o con una única consulta), de modo que `tiene_permisos` e
+    `is_admin` no vuelvan a consultar la base de datos durante la solicitud.
+    """
+
+    def get_user(self, user_id):
+        user = super().get_user(user_id)
+
+        if user is not None:
+            get_user_permissions(user)
+
+        return user
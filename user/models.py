@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from roles.models import Role
+from roles.permissions import get_user_permissions
 
 
 class CustomUser(AbstractUser):
@@ -36,20 +37,26 @@ class CustomUser(AbstractUser):
         related_query_name="customuser",
     )
 
+    @property
+    def is_admin(self) -> bool:
+        """
+        Indica si el usuario tiene el rol de Administrador.
+        """
+
+        return get_user_permissions(self).is_admin
+
     def tiene_permisos(self, permisos: list[str]) -> bool:
         """
         Verifica si el usuario tiene todos los permisos especificados.
 
+        Los permisos del usuario se resuelven una sola vez por solicitud y se
+        comparten entre solicitudes mediante la caché.
+
         Args:
             permisos (list[str]): Lista de nombres de permisos a verificar.
 
         Returns:
             bool: Retorna `True` si el usuario tiene todos los permisos, de lo contrario `False`.
         """
-        con_permiso = True
-
-        for permiso in permisos:
-            if not self.roles.filter(permissions__name=permiso).exists():
-                con_permiso = False
 
-        return con_permiso
+        return get_user_permissions(self).has_all(permisos)
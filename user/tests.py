@@ -1,8 +1,14 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.core.cache import cache
 import copy
 
+from roles.models import Permission, Role
+from roles.permissions import get_permissions_cache
+from roles.tests import MEMORY_SHARED_CACHES
+from user.backends import RolesBackend
+
 User = get_user_model()
 
 
@@ -101,3 +107,71 @@ class RegisterViewTestCase(TestCase):
         response = self.client.post(self.register_url, self.user_data)
 
         self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=MEMORY_SHARED_CACHES)
+class RolesBackendTestCase(TestCase):
+    def setUp(self):
+        """
+        Creamos un usuario con un rol y un permiso, y limpiamos la caché de permisos
+        """
+
+        cache.clear()
+        get_permissions_cache().clear()
+        self.permission = Permission.objects.create(
+            name="create_article", description="Crear artículos"
+        )
+        self.role = Role.objects.create(name="Autor", description="Autor")
+        self.role.permissions.add(self.permission)
+        self.user = User.objects.create_user(username="autor", password="autorpass")
+        self.user.roles.add(self.role)
+
+    def test_get_user_carga_permisos(self):
+        """
+        El usuario de la sesión se obtiene con sus permisos en dos consultas y
+        luego no se vuelven a consultar los roles
+        """
+
+        with self.assertNumQueries(2):
+            user = RolesBackend().get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user.tiene_permisos(["create_article"]))
+            self.assertFalse(user.tiene_permisos(["delete_article"]))
+            self.assertFalse(user.is_admin)
+
+    def test_get_user_usa_cache(self):
+        """
+        Con los permisos en caché solo se consulta el usuario
+        """
+
+        RolesBackend().get_user(self.user.pk)
+
+        with self.assertNumQueries(1):
+            user = RolesBackend().get_user(self.user.pk)
+
+        self.assertTrue(user.tiene_permisos(["create_article"]))
+
+    def test_sesion_usa_backend(self):
+        """
+        Al iniciar sesión se registra el backend que carga los permisos
+        """
+
+        self.client.login(username="autor", password="autorpass")
+
+        self.assertEqual(
+            self.client.session["_auth_user_backend"], "user.backends.RolesBackend"
+        )
+
+    def test_sesiones_de_model_backend_siguen_activas(self):
+        """
+        Las sesiones iniciadas antes con ModelBackend no se cierran
+        """
+
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.wsgi_request.user, self.user)
@@ -11,6 +11,7 @@ from .forms import (
 )
 from django.contrib.auth.mixins import UserPassesTestMixin
 from roles.utils import PermissionEnum
+from roles.permissions import ADMIN_ROLE
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import update_session_auth_hash
 
@@ -91,7 +92,7 @@ class UserListView(UserPassesTestMixin, ListView):
         queryset = super().get_queryset()
         form = UserSearchForm(self.request.GET or None)
 
-        administradores = Role.objects.filter(name="Administrador")
+        administradores = Role.objects.filter(name=ADMIN_ROLE)
         queryset = queryset.exclude(roles__in=administradores)
 
         if form.is_valid():
@@ -175,7 +176,7 @@ def register(request):
             user.save()  # Save the user with the new role
 
             # Log the user in after registration
-            login(request, user)
+            login(request, user, backend="user.backends.RolesBackend")
             return redirect("home")
     else:
         form = CustomUserCreationForm()